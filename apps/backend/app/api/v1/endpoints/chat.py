@@ -2,13 +2,46 @@
 
 import json
 import re
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from dataclasses import replace
+import asyncio
+import time
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional
 
 from app.services.llm_service import LLMService
-from app.services.gemini_provider import LLMMessage
+from app.services.agenda_digest import agenda_digests
+from app.services.batch import (
+    BATCH_ITEMS,
+    background_lane,
+    wait_for_batch,
+)
+from app.services.agent_loop import BACKEND_TOOLS
+from app.services.confirmation_flow import answer_turn
+from app.services.deadlines import (
+    REQUEST_TIMEOUT_HEADER,
+    ClientDisconnected,
+    request_deadline,
+    until_disconnected,
+)
+from app.services.event_compaction import slim_tool_results
+from app.services.idempotency import (
+    MAX_KEY_LENGTH,
+    IdempotencyConflict,
+    idempotency_cache,
+    request_fingerprint,
+)
+from app.services.provider_router import DEFAULT_TARGETS, RouteOptions
+from app.services.base_provider import LLMMessage, LLMResponse, tool_call_arguments
 from app.services.tools import get_tools_for_provider
+from app.services.metrics import FALLBACK_RESPONSES
+from app.services.user_locale import resolve_locale
+from app.core import fast_json
+from app.core.config import settings
+from app.core.fast_json import FastJSONResponse, FastJSONRoute
+from app.core.user_signature import USER_SIGNATURE_HEADER, verified_user_id
 
 
 def clean_confirmation_format(content: str) -> str:
@@ -36,13 +69,14 @@ def get_context_aware_response(tool_calls):
 
     if not tool_calls:
         print("🔍 DEBUG: No tool calls, using default fallback")
+        FALLBACK_RESPONSES.inc(reason="no_tool_calls")
         return "I didn't quite catch that. Could you please rephrase your question or try asking again? I'm here to help with your calendar and any other questions you might have!"
 
     # Check for handleEventConfirmation tool calls
     for tool_call in tool_calls:
         if tool_call.get("function", {}).get("name") == "handleEventConfirmation":
             try:
-                args = json.loads(tool_call.get("function", {}).get("arguments", "{}"))
+                args = tool_call_arguments(tool_call)
                 action = args.get("action", "")
                 event_details = args.get("eventDetails", {})
                 print(f"🔍 DEBUG: Found handleEventConfirmation with action: {action}")
@@ -57,6 +91,7 @@ def get_context_aware_response(tool_calls):
                     print(
                         f"🔍 DEBUG: Returning personalized confirm response for: {event_title}"
                     )
+                    FALLBACK_RESPONSES.inc(reason="confirm")
                     return f"{event_title} has been created successfully! Is there anything else I can help you with?"
                 elif action == "modify":
                     # Extract event title for more personalized response
@@ -68,28 +103,33 @@ def get_context_aware_response(tool_calls):
                     print(
                         f"🔍 DEBUG: Returning personalized modify response for: {event_title}"
                     )
+                    FALLBACK_RESPONSES.inc(reason="modify")
                     return f"{event_title} has been updated successfully! Is there anything else I can help you with?"
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"🔍 DEBUG: Error parsing handleEventConfirmation args: {e}")
                 # Fallback to generic response
+                FALLBACK_RESPONSES.inc(reason="confirmation_parse_error")
                 return "Event operation completed successfully! Is there anything else I can help you with?"
 
     # Check for getEvents tool calls
     for tool_call in tool_calls:
         if tool_call.get("function", {}).get("name") == "getEvents":
             print("🔍 DEBUG: Found getEvents, returning 'Here are your events:'")
+            FALLBACK_RESPONSES.inc(reason="get_events")
             return "📅 Here are your events:"
 
     # Check for webSearch tool calls
     for tool_call in tool_calls:
         if tool_call.get("function", {}).get("name") == "webSearch":
             try:
-                args = json.loads(tool_call.get("function", {}).get("arguments", "{}"))
+                args = tool_call_arguments(tool_call)
                 query = args.get("query", "")
                 print(f"🔍 DEBUG: Found webSearch for query: {query}")
+                FALLBACK_RESPONSES.inc(reason="web_search")
                 return f"🔍 I found information about '{query}'. Let me know if you'd like to create an event based on this!"
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"🔍 DEBUG: Error parsing webSearch args: {e}")
+                FALLBACK_RESPONSES.inc(reason="web_search_parse_error")
                 return "🔍 I found some information for you. Let me know if you'd like to create an event based on this!"
 
     # Note: createEvent tool is not available - all event creation goes through handleEventConfirmation
@@ -98,20 +138,44 @@ def get_context_aware_response(tool_calls):
     for tool_call in tool_calls:
         if tool_call.get("function", {}).get("name") == "updateEvent":
             print("🔍 DEBUG: Found updateEvent, returning update response")
+            FALLBACK_RESPONSES.inc(reason="update_event")
             return "Event updated successfully! Is there anything else I can help you with?"
 
     # Check for deleteEvent tool calls (if any)
     for tool_call in tool_calls:
         if tool_call.get("function", {}).get("name") == "deleteEvent":
             print("🔍 DEBUG: Found deleteEvent, returning deletion response")
+            FALLBACK_RESPONSES.inc(reason="delete_event")
             return "Event deleted successfully! Is there anything else I can help you with?"
 
     # Default fallback
     print("🔍 DEBUG: No matching tool calls, using default fallback")
+    FALLBACK_RESPONSES.inc(reason="unmatched")
     return "I didn't quite catch that. Could you please rephrase your question or try asking again? I'm here to help with your calendar and any other questions you might have!"
 
 
-router = APIRouter()
+def collect_tool_results(messages: List[LLMMessage]) -> List[Dict[str, Any]]:
+    """All tool results posted after the last user message, in order.
+
+    A turn may carry several tool messages, each holding a JSON list of
+    results keyed by ``tool_call_id``.
+    """
+    last_user = max(
+        (i for i, msg in enumerate(messages) if msg.role == "user"), default=-1
+    )
+    results = []
+    for msg in messages[last_user + 1 :]:
+        if msg.role != "tool":
+            continue
+        if msg.tool_results is None:
+            print(f"🔍 DEBUG: Tool message is not a result list: {msg.content[:200]}")
+            continue
+        results.extend(msg.tool_results)
+    return results
+
+
+# Chat payloads carry whole conversations; decode and encode them with orjson
+router = APIRouter(route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 # Initialize LLM service
 llm_service = LLMService()
@@ -122,6 +186,30 @@ class Message(BaseModel):
 
     role: str
     content: str
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+
+
+def to_llm_messages(messages: List[Message]) -> List[LLMMessage]:
+    return [
+        LLMMessage(role=msg.role, content=msg.content, tool_calls=msg.tool_calls)
+        for msg in messages
+    ]
+
+
+class RoutingOptions(BaseModel):
+    """Per-request overrides for model_provider="auto"."""
+
+    max_cost_per_mtok: Optional[float] = None
+    providers: Optional[List[str]] = None
+    models: Optional[List[str]] = None
+
+
+class AgentOptions(BaseModel):
+    """Per-request overrides for the agent loop budgets."""
+
+    max_steps: Optional[int] = Field(default=None, ge=1, le=10)
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    max_seconds: Optional[float] = Field(default=None, gt=0, le=120)
 
 
 class GenerateRequest(BaseModel):
@@ -130,6 +218,13 @@ class GenerateRequest(BaseModel):
     messages: List[Message]
     model_provider: str
     model_name: str
+    routing: Optional[RoutingOptions] = None
+    agent: Optional[AgentOptions] = None
+    # Enables precomputed agenda digests for this user
+    user_id: Optional[str] = None
+    # IANA zone and BCP 47 tag from the browser, e.g. "America/New_York", "en-US"
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
 
 
 class GenerateResponse(BaseModel):
@@ -140,17 +235,180 @@ class GenerateResponse(BaseModel):
     model: str
     usage: Optional[Dict[str, Any]] = None
     tool_calls: Optional[List[Dict[str, Any]]] = None
+    # Results of tool calls the backend already executed, keyed by tool_call_id
+    tool_results: Optional[List[Dict[str, Any]]] = None
+    agent_trace: Optional[Dict[str, Any]] = None
+    # Window the frontend should snapshot to /chat/agenda/sync so agenda
+    # questions can be answered from a precomputed digest
+    agenda_sync: Optional[Dict[str, str]] = None
+
+
+def answer_from_agenda_digest(
+    request: GenerateRequest, llm_messages: List[LLMMessage]
+) -> Optional[GenerateResponse]:
+    """Answer a today/tomorrow agenda question from the user's cached digest.
+
+    Also records event changes from posted tool results. Returns None when the
+    turn needs the model.
+    """
+    user_id = request.user_id
+    agenda_digests.touch(user_id, resolve_locale(request.timezone, request.locale).tz)
+    last = request.messages[-1] if request.messages else None
+    if last is None:
+        return None
+
+    if last.role == "tool":
+        calls_by_id = {
+            call.get("id"): call
+            for msg in request.messages
+            for call in msg.tool_calls or []
+        }
+        agenda_digests.apply_tool_results(
+            user_id, calls_by_id, collect_tool_results(llm_messages)
+        )
+        return None
+
+    if last.role != "user":
+        return None
+    digest = agenda_digests.lookup(user_id, last.content)
+    if digest is None:
+        return None
+    print(f"🔍 DEBUG: Answered from {digest.label} agenda digest for {user_id}")
+    return GenerateResponse(
+        content=digest.text,
+        provider=request.model_provider,
+        model=request.model_name,
+        usage={},
+        tool_calls=None,
+        agent_trace={
+            "stop_reason": "agenda_digest",
+            "digest_age_s": round(time.time() - digest.built_at, 1),
+            "steps": [],
+        },
+    )
+
+
+def answer_from_confirmation_flow(
+    request: GenerateRequest, llm_messages: List[LLMMessage]
+) -> Optional[GenerateResponse]:
+    """Answer confirm/modify/cancel replies to an open card without the model.
+
+    Returns None when the turn needs the model.
+    """
+    turn = answer_turn(llm_messages, resolve_locale(request.timezone, request.locale))
+    if turn is None:
+        return None
+    return GenerateResponse(
+        # The same text the model path falls back to for a bare tool call
+        content=turn.content or get_context_aware_response(turn.tool_calls),
+        provider=request.model_provider,
+        model=request.model_name,
+        usage={},
+        tool_calls=turn.tool_calls or None,
+        agent_trace={
+            "stop_reason": "confirmation_flow",
+            "outcome": turn.outcome,
+            "steps": [],
+        },
+    )
 
 
 @router.post("/generate", response_model=GenerateResponse)
-async def generate_llm_response(request: GenerateRequest):
+async def generate_llm_response(request: GenerateRequest, http_request: Request):
     """Generate LLM response without any database operations."""
+    # Picked up by the metrics middleware to label request latency per model
+    http_request.state.metrics_model = request.model_name
+    # Digests are keyed by user_id, so only a signed one is used
+    signed_user_id = verified_user_id(
+        request.user_id, http_request.headers.get(USER_SIGNATURE_HEADER)
+    )
+    if request.user_id and signed_user_id is None:
+        print("🔍 DEBUG: Ignoring unsigned user_id; agenda digests are off")
+    request.user_id = signed_user_id
+    deadline = request_deadline(
+        http_request.headers.get(REQUEST_TIMEOUT_HEADER),
+        settings.REQUEST_TIMEOUT_SECONDS,
+    )
+    work = respond(request, http_request, deadline)
+    if not settings.CANCEL_ON_DISCONNECT_ENABLED:
+        return await work
+    try:
+        # A closed tab stops the model call and searches instead of
+        # finishing an answer nobody will read
+        return await until_disconnected(http_request, work, deadline)
+    except ClientDisconnected:
+        # nginx's "client closed request"; nobody receives it
+        return FastJSONResponse({"detail": "Client closed request"}, status_code=499)
+
+
+async def respond(request: GenerateRequest, http_request: Request, deadline: float):
+    """The /chat/generate response, replayed or shared per Idempotency-Key."""
+    key = http_request.headers.get("Idempotency-Key")
+    if not key or not settings.IDEMPOTENCY_ENABLED:
+        return await run_generate(request, deadline)
+
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    async def compute() -> Dict[str, Any]:
+        return (await run_generate(request, deadline)).model_dump()
+
+    try:
+        response, outcome = await idempotency_cache.run(
+            f"{request.user_id or ''}:{key}",
+            request_fingerprint(await http_request.body()),
+            compute,
+            cacheable=lambda response: (
+                (response.get("agent_trace") or {}).get("stop_reason") != "error"
+            ),
+        )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    if outcome != "new":
+        print(f"🔍 DEBUG: Idempotency-Key {key[:16]}: {outcome}")
+    return FastJSONResponse(
+        response, headers={"Idempotent-Replayed": str(outcome != "new").lower()}
+    )
+
+
+async def run_generate(
+    request: GenerateRequest, deadline: Optional[float] = None
+) -> GenerateResponse:
+    """One /chat/generate turn: agenda digest answer, confirmation flow or the model."""
+    # Converted once; tool result payloads parsed on these are reused below
+    llm_messages = to_llm_messages(request.messages)
+    use_digests = settings.AGENDA_DIGEST_ENABLED and request.user_id
+    response = answer_from_agenda_digest(request, llm_messages) if use_digests else None
+    if response is None and settings.CONFIRMATION_FLOW_ENABLED:
+        response = answer_from_confirmation_flow(request, llm_messages)
+    if response is None:
+        # Batch work on the background lane holds off while interactive load is high
+        async with background_lane.interactive():
+            response = await generate_chat_response(request, llm_messages, deadline)
+    if use_digests:
+        window = agenda_digests.sync_window(request.user_id)
+        response.agenda_sync = window.to_dict() if window else None
+    return response
+
+
+async def generate_chat_response(
+    request: GenerateRequest,
+    llm_messages: Optional[List[LLMMessage]] = None,
+    deadline: Optional[float] = None,
+) -> GenerateResponse:
+    """Run one conversation turn; shared by the interactive and batch endpoints.
+
+    ``deadline`` is the interactive request's ``time.monotonic()`` deadline.
+    """
     try:
+        locale = resolve_locale(request.timezone, request.locale)
 
         # Convert messages to LLM format
-        llm_messages = [
-            LLMMessage(role=msg.role, content=msg.content) for msg in request.messages
-        ]
+        if llm_messages is None:
+            llm_messages = to_llm_messages(request.messages)
 
         # Check if provider is available
         if not llm_service.is_provider_available(request.model_provider):
@@ -161,42 +419,66 @@ async def generate_llm_response(request: GenerateRequest):
 
         # Get tools for the provider
         tools = get_tools_for_provider(request.model_provider)
+        routing = (
+            RouteOptions(**request.routing.model_dump()) if request.routing else None
+        )
 
         # Check if this is a request with tool results from frontend
         has_tool_results = any(msg.role == "tool" for msg in llm_messages)
 
         if has_tool_results:
             # Extract tool results to check for confirmation cards
-            tool_message = next(msg for msg in llm_messages if msg.role == "tool")
-            try:
-                tool_results = json.loads(tool_message.content)
-                print(f"🔍 DEBUG: Processing tool results: {tool_results}")
-
-                # Look for handleEventConfirmation results with confirmation card content
-                for result in tool_results:
-                    if result.get("success") and result.get("content"):
-                        content = result.get("content", "")
-                        # Check if this looks like a confirmation card
-                        if "**Title:**" in content and "**Date & Time:**" in content:
-                            print(f"🔍 DEBUG: Found confirmation card in tool results")
-                            return GenerateResponse(
-                                content=content,
-                                provider="gemini",
-                                model=request.model_name,
-                                usage={},
-                                tool_calls=None,
-                            )
-            except (json.JSONDecodeError, KeyError, StopIteration) as e:
-                print(f"🔍 DEBUG: Error processing tool results: {e}")
-                # Continue with normal processing
-
-        # Use unified response generation for all queries
-        llm_response = await llm_service.generate_response(
+            tool_results = collect_tool_results(llm_messages)
+            print(f"🔍 DEBUG: Processing tool results: {tool_results}")
+
+            # Look for handleEventConfirmation results with confirmation card content
+            for result in tool_results:
+                if result.get("success") and result.get("content"):
+                    content = result.get("content", "")
+                    # Check if this looks like a confirmation card
+                    if "**Title:**" in content and "**Date & Time:**" in content:
+                        print(f"🔍 DEBUG: Found confirmation card in tool results")
+                        return GenerateResponse(
+                            content=content,
+                            provider=request.model_provider,
+                            model=request.model_name,
+                            usage={},
+                            tool_calls=None,
+                        )
+
+        if has_tool_results and settings.TOOL_RESULT_SLIMMING_ENABLED:
+            # Raw calendar JSON is mostly fields the model never uses
+            llm_messages, slim_stats = slim_tool_results(
+                llm_messages, max_events=settings.GET_EVENTS_MAX_EVENTS, tz=locale.tz
+            )
+            if slim_stats["results"]:
+                print(f"🔍 DEBUG: Slimmed getEvents results: {slim_stats}")
+
+        budget = llm_service.agent.budget
+        if request.agent:
+            budget = replace(
+                budget,
+                **{
+                    key: value
+                    for key, value in request.agent.model_dump().items()
+                    if value is not None
+                },
+            )
+
+        # Run backend tools (webSearch) in a bounded loop until the model
+        # answers or asks for a tool only the frontend can run
+        agent_result = await llm_service.agent.run(
             provider=request.model_provider,
             messages=llm_messages,
             model=request.model_name,
             tools=tools,
+            routing=routing,
+            budget=budget,
+            locale=locale,
+            deadline=deadline,
         )
+        llm_response = agent_result.response
+        agent_trace = agent_result.trace()
 
         print("🔍 DEBUG: LLM Response received:")
         print(f"🔍 DEBUG: - Content: '{llm_response.content[:200]}...'")
@@ -204,112 +486,86 @@ async def generate_llm_response(request: GenerateRequest):
         print(f"🔍 DEBUG: - Model: {llm_response.model}")
         print(f"🔍 DEBUG: - Tool calls: {llm_response.tool_calls}")
         print(f"🔍 DEBUG: - Number of tool calls: {len(llm_response.tool_calls)}")
+        print(f"🔍 DEBUG: - Agent trace: {agent_trace}")
+
+        if agent_result.executed_tool_calls:
+            # Backend tools ran; answer directly, passing along any frontend
+            # tools still pending plus the backend results for them to reuse
+            pending_calls = agent_result.pending_tool_calls
+            content = llm_response.content.strip() if llm_response.content else ""
+            if not content:
+                content = get_context_aware_response(
+                    pending_calls or agent_result.executed_tool_calls
+                )
+            content = clean_confirmation_format(content)
+
+            final_response_obj = GenerateResponse(
+                content=content,
+                provider=llm_response.provider,
+                model=llm_response.model,
+                usage=agent_result.usage,
+                tool_calls=agent_result.executed_tool_calls
+                + pending_calls,  # Include executed calls for frontend optimistic messaging
+                tool_results=agent_result.tool_results,
+                agent_trace=agent_trace,
+            )
+
+            print("🔍 DEBUG: Final response (with web search):")
+            print(f"🔍 DEBUG: - Content: '{final_response_obj.content[:200]}...'")
+            print(f"🔍 DEBUG: - Tool calls: {final_response_obj.tool_calls}")
+
+            return final_response_obj
 
-        # Handle webSearch tool calls internally, others by frontend
         if llm_response.tool_calls:
-            web_search_calls = [
+            # Only frontend tool calls, return them for frontend handling
+            other_calls = [
                 call
                 for call in llm_response.tool_calls
-                if call["function"]["name"] == "webSearch"
+                if call["function"]["name"] not in BACKEND_TOOLS
             ]
-
-            if web_search_calls:
-                # Execute webSearch tool calls and generate response in one step
-                tool_results = []
-                for tool_call in web_search_calls:
-                    try:
-                        result = await llm_service.execute_tool_call(tool_call)
-                        tool_results.append(result)
-                    except NotImplementedError:
-                        pass
-
-                # Build updated messages efficiently
-                updated_messages = llm_messages + [
-                    LLMMessage(
-                        role="assistant",
-                        content=llm_response.content,
-                        tool_calls=llm_response.tool_calls,
-                    ),
-                    LLMMessage(role="tool", content=json.dumps(tool_results)),
-                ]
-
-                # Generate final response
-                final_response = await llm_service.generate_response(
-                    provider=request.model_provider,
-                    messages=updated_messages,
-                    model=request.model_name,
-                    tools=tools,
-                )
-
-                # Ensure content exists
-                content = (
-                    final_response.content.strip()
-                    if final_response.content
-                    else get_context_aware_response(llm_response.tool_calls)
-                )
-                content = clean_confirmation_format(content)
-
-                final_response_obj = GenerateResponse(
-                    content=content,
-                    provider=final_response.provider,
-                    model=final_response.model,
-                    usage=final_response.usage,
-                    tool_calls=llm_response.tool_calls,  # Include original tool calls for frontend optimistic messaging
-                )
-
-                print("🔍 DEBUG: Final response (with web search):")
-                print(f"🔍 DEBUG: - Content: '{final_response_obj.content[:200]}...'")
-                print(f"🔍 DEBUG: - Tool calls: {final_response_obj.tool_calls}")
-
-                return final_response_obj
-            else:
-                # Only non-webSearch tool calls, return them for frontend handling
-                other_calls = [
-                    call
+            # Ensure we never return empty content
+            content = llm_response.content.strip() if llm_response.content else ""
+            if not content:
+                # Only use context-aware response if there are tool calls that would trigger optimistic messages
+                if any(
+                    call.get("function", {}).get("name")
+                    in [
+                        "handleEventConfirmation",
+                        "getEvents",
+                        "createEvent",
+                        "updateEvent",
+                        "deleteEvent",
+                    ]
                     for call in llm_response.tool_calls
-                    if call["function"]["name"] != "webSearch"
-                ]
-                # Ensure we never return empty content
-                content = llm_response.content.strip() if llm_response.content else ""
-                if not content:
-                    # Only use context-aware response if there are tool calls that would trigger optimistic messages
-                    if llm_response.tool_calls and any(
-                        call.get("function", {}).get("name")
-                        in [
-                            "handleEventConfirmation",
-                            "getEvents",
-                            "createEvent",
-                            "updateEvent",
-                            "deleteEvent",
-                        ]
-                        for call in llm_response.tool_calls
-                    ):
-                        print(
-                            "🔍 DEBUG: Empty content with tool calls, using context-aware fallback"
-                        )
-                        content = get_context_aware_response(llm_response.tool_calls)
-                    else:
-                        print(
-                            "🔍 DEBUG: Empty content without relevant tool calls, using generic fallback"
-                        )
-                        content = "I didn't quite catch that. Could you please rephrase your question or try asking again? I'm here to help with your calendar and any other questions you might have!"
-
-                # Clean up any remaining old confirmation format elements
-                content = clean_confirmation_format(content)
-
-                final_response_obj = GenerateResponse(
-                    content=content,
-                    provider=llm_response.provider,
-                    model=llm_response.model,
-                    usage=llm_response.usage,
-                    tool_calls=other_calls,
-                )
+                ):
+                    print(
+                        "🔍 DEBUG: Empty content with tool calls, using context-aware fallback"
+                    )
+                    content = get_context_aware_response(llm_response.tool_calls)
+                else:
+                    print(
+                        "🔍 DEBUG: Empty content without relevant tool calls, using generic fallback"
+                    )
+                    FALLBACK_RESPONSES.inc(reason="generic")
+                    content = "I didn't quite catch that. Could you please rephrase your question or try asking again? I'm here to help with your calendar and any other questions you might have!"
+
+            # Clean up any remaining old confirmation format elements
+            content = clean_confirmation_format(content)
+
+            final_response_obj = GenerateResponse(
+                content=content,
+                provider=llm_response.provider,
+                model=llm_response.model,
+                usage=llm_response.usage,
+                tool_calls=other_calls,
+                agent_trace=agent_trace,
+            )
 
-                print("🔍 DEBUG: Final response (no web search):")
-                print(f"🔍 DEBUG: - Content: '{final_response_obj.content[:200]}...'")
-                print(f"🔍 DEBUG: - Tool calls: {final_response_obj.tool_calls}")
+            print("🔍 DEBUG: Final response (no web search):")
+            print(f"🔍 DEBUG: - Content: '{final_response_obj.content[:200]}...'")
+            print(f"🔍 DEBUG: - Tool calls: {final_response_obj.tool_calls}")
 
-                return final_response_obj
+            return final_response_obj
 
         # Ensure we never return empty content
         content = llm_response.content.strip() if llm_response.content else ""
@@ -334,6 +590,7 @@ async def generate_llm_response(request: GenerateRequest):
                 print(
                     "🔍 DEBUG: Empty content without relevant tool calls, using generic fallback"
                 )
+                FALLBACK_RESPONSES.inc(reason="generic")
                 content = "I didn't quite catch that. Could you please rephrase your question or try asking again? I'm here to help with your calendar and any other questions you might have!"
 
         # Clean up any remaining old confirmation format elements
@@ -345,6 +602,7 @@ async def generate_llm_response(request: GenerateRequest):
             model=llm_response.model,
             usage=llm_response.usage,
             tool_calls=llm_response.tool_calls,
+            agent_trace=agent_trace,
         )
 
         print("🔍 DEBUG: Final response (no tool calls):")
@@ -384,27 +642,304 @@ async def generate_llm_response(request: GenerateRequest):
         # Return a 200 response with the user-friendly error message instead of raising an exception
         return GenerateResponse(
             content=user_friendly_message,
-            provider="gemini",
-            model="gemini-2.5-flash",
+            provider=request.model_provider,
+            model=request.model_name,
             usage={},
             tool_calls=[],
+            # Not stored for Idempotency-Key replay, so a retry runs again
+            agent_trace={"stop_reason": "error"},
+        )
+
+
+class BatchItem(BaseModel):
+    """One independent conversation in a batch."""
+
+    id: Optional[str] = None
+    messages: List[Message]
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request structure for batch generation."""
+
+    items: List[BatchItem]
+    model_provider: str
+    model_name: str
+    routing: Optional[RoutingOptions] = None
+    agent: Optional[AgentOptions] = None
+    # "lane": run each conversation through the normal pipeline on the
+    # background lane. "provider": submit through the provider's batch API
+    mode: Literal["lane", "provider"] = "lane"
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
+
+
+def _ndjson(record: Dict[str, Any]) -> bytes:
+    return fast_json.dumps(record) + b"\n"
+
+
+async def _stream_lane_batch(request: BatchGenerateRequest) -> AsyncIterator[bytes]:
+    """Run conversations on the background lane, yielding each as it completes."""
+    started = time.perf_counter()
+    limit = asyncio.Semaphore(request.max_concurrency or background_lane.concurrency)
+
+    async def run_item(index: int, item: BatchItem) -> Dict[str, Any]:
+        async with limit, background_lane.slot():
+            item_started = time.perf_counter()
+            try:
+                response = await generate_chat_response(
+                    GenerateRequest(
+                        messages=item.messages,
+                        model_provider=request.model_provider,
+                        model_name=request.model_name,
+                        routing=request.routing,
+                        agent=request.agent,
+                        timezone=request.timezone,
+                        locale=request.locale,
+                    )
+                )
+                record = {"status": "ok", "response": response.model_dump()}
+            except Exception as e:
+                record = {"status": "error", "error": str(e)}
+        BATCH_ITEMS.inc(mode="lane", status=record["status"])
+        return {
+            "index": index,
+            "id": item.id,
+            "duration_ms": round((time.perf_counter() - item_started) * 1000, 1),
+            **record,
+        }
+
+    tasks = [
+        asyncio.create_task(run_item(index, item))
+        for index, item in enumerate(request.items)
+    ]
+    errors = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            errors += record["status"] != "ok"
+            yield _ndjson(record)
+    finally:
+        # Client went away: stop the rest of the batch
+        for task in tasks:
+            task.cancel()
+    yield _ndjson(
+        {
+            "done": True,
+            "mode": "lane",
+            "items": len(tasks),
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    )
+
+
+async def _stream_provider_batch(
+    request: BatchGenerateRequest,
+) -> AsyncIterator[bytes]:
+    """Submit through the provider batch API and stream results when done."""
+    started = time.perf_counter()
+    try:
+        job_id, poll = await llm_service.submit_batch(
+            provider=request.model_provider,
+            conversations=[to_llm_messages(item.messages) for item in request.items],
+            model=request.model_name,
+            tools=get_tools_for_provider(request.model_provider),
+            locale=resolve_locale(request.timezone, request.locale),
+        )
+    except Exception as e:
+        yield _ndjson({"done": True, "mode": "provider", "error": str(e)})
+        return
+
+    status = None
+    async for status in wait_for_batch(
+        poll,
+        job_id,
+        poll_interval=settings.BATCH_POLL_INTERVAL_SECONDS,
+        timeout=settings.BATCH_PROVIDER_TIMEOUT_SECONDS,
+    ):
+        yield _ndjson({"job": job_id, "state": status.state, "error": status.error})
+
+    errors = 0
+    results = (status.results if status else None) or []
+    for index, item in enumerate(request.items):
+        result = results[index] if index < len(results) else None
+        if isinstance(result, LLMResponse):
+            content = result.content.strip() if result.content else ""
+            if not content:
+                content = get_context_aware_response(result.tool_calls)
+            record = {
+                "status": "ok",
+                "response": GenerateResponse(
+                    content=clean_confirmation_format(content),
+                    provider=result.provider,
+                    model=result.model,
+                    usage=result.usage,
+                    tool_calls=result.tool_calls,
+                ).model_dump(),
+            }
+        else:
+            errors += 1
+            error = str(result) if result else (status.error if status else None)
+            record = {"status": "error", "error": error or "No result"}
+        BATCH_ITEMS.inc(mode="provider", status=record["status"])
+        yield _ndjson({"index": index, "id": item.id, **record})
+
+    yield _ndjson(
+        {
+            "done": True,
+            "mode": "provider",
+            "job": job_id,
+            "items": len(request.items),
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    )
+
+
+@router.post("/batch")
+async def generate_batch(request: BatchGenerateRequest):
+    """Run many independent conversations for non-interactive jobs.
+
+    Results stream back as NDJSON, one line per conversation as it completes,
+    followed by a summary line with ``"done": true``.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(request.items)} items; the limit is {settings.BATCH_MAX_ITEMS}",
         )
+    if not llm_service.is_provider_available(request.model_provider):
+        raise HTTPException(
+            status_code=400,
+            detail=f"LLM provider {request.model_provider} is not available",
+        )
+
+    stream = (
+        _stream_provider_batch(request)
+        if request.mode == "provider"
+        else _stream_lane_batch(request)
+    )
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+
+class IntentRequest(BaseModel):
+    """Request structure for calendar intent detection."""
+
+    message: str
+    timezone: Optional[str] = None
+
+
+class IntentResponse(BaseModel):
+    """Detected calendar intent and the getEvents window worth prefetching."""
+
+    kind: str
+    confidence: float
+    window: Optional[Dict[str, str]] = None
+
+
+@router.post("/intent", response_model=IntentResponse)
+async def detect_intent(request: IntentRequest):
+    """Classify a message so the frontend can prefetch events while the model runs."""
+    intent = llm_service.detect_calendar_intent(
+        request.message, resolve_locale(request.timezone)
+    )
+    print(f"🔍 DEBUG: Calendar intent: {intent.to_dict()}")
+    return IntentResponse(**intent.to_dict())
+
+
+class AgendaSyncRequest(BaseModel):
+    """Calendar events pushed by the frontend for agenda digests.
+
+    With ``timeMin``/``timeMax`` the events are a full snapshot of that window
+    (recurring events expanded); without, they are individual upserts.
+    """
+
+    user_id: str
+    timezone: Optional[str] = None
+    timeMin: Optional[str] = None
+    timeMax: Optional[str] = None
+    events: List[Dict[str, Any]] = Field(default_factory=list)
+    deleted_ids: List[str] = Field(default_factory=list)
+
+
+@router.post("/agenda/sync")
+async def sync_agenda(request: AgendaSyncRequest, http_request: Request):
+    """Update a user's events and rebuild the agenda digests they affect."""
+    signature = http_request.headers.get(USER_SIGNATURE_HEADER)
+    if verified_user_id(request.user_id, signature) is None:
+        raise HTTPException(status_code=401, detail="user_id is not signed")
+    tz = resolve_locale(request.timezone).tz
+    if (request.timeMin is None) != (request.timeMax is None):
+        raise HTTPException(
+            status_code=400, detail="timeMin and timeMax must be given together"
+        )
+    if request.timeMin is None:
+        agenda_digests.touch(request.user_id, tz)
+        rebuilt = agenda_digests.apply_changes(
+            request.user_id, request.events, request.deleted_ids
+        )
+        return {"rebuilt": rebuilt}
+
+    try:
+        time_min = datetime.fromisoformat(request.timeMin.replace("Z", "+00:00"))
+        time_max = datetime.fromisoformat(request.timeMax.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="timeMin/timeMax must be RFC3339")
+    if time_min.tzinfo is None or time_max.tzinfo is None:
+        raise HTTPException(status_code=400, detail="timeMin/timeMax need a UTC offset")
+    digests = agenda_digests.sync(
+        request.user_id, time_min, time_max, request.events, tz
+    )
+    return {
+        "digests": [
+            {
+                "day": digest.day.isoformat(),
+                "label": digest.label,
+                "events": digest.event_count,
+            }
+            for digest in digests
+        ]
+    }
 
 
 @router.get("/providers")
 async def get_available_providers():
     """Get list of available LLM providers."""
-    return {
-        "available_providers": ["gemini"],
-        "providers": {
-            "gemini": {
-                "available": llm_service.is_provider_available("gemini"),
-                "models": [
-                    "gemini-2.5-flash-lite",
-                    "gemini-2.0-flash-lite",
-                    "gemini-2.5-flash",
-                    "gemini-2.0-flash",
-                ],
-            },
+    providers = {
+        "gemini": {
+            "available": llm_service.is_provider_available("gemini"),
+            "models": [
+                "gemini-2.5-flash-lite",
+                "gemini-2.0-flash-lite",
+                "gemini-2.5-flash",
+                "gemini-2.0-flash",
+            ],
         },
     }
+    for name in ("openai", "anthropic"):
+        if llm_service.is_provider_available(name):
+            providers[name] = {
+                "available": True,
+                "models": [t.model for t in DEFAULT_TARGETS if t.provider == name],
+            }
+    if llm_service.is_provider_available("fake"):
+        providers["fake"] = {"available": True, "models": ["fake-model"]}
+    if llm_service.is_provider_available("auto"):
+        providers["auto"] = {
+            "available": True,
+            "models": ["auto"],
+            "backends": llm_service.router.snapshot(),
+        }
+    if llm_service.is_provider_available("cascade"):
+        providers["cascade"] = {
+            "available": True,
+            "models": ["cascade"],
+            **llm_service.cascade.snapshot(),
+        }
+    return {
+        "available_providers": list(providers.keys()),
+        "providers": providers,
+    }
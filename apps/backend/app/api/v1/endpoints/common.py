@@ -1,6 +1,7 @@
 """Common endpoints."""
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
 from app.schemas.common import (
     EchoRequest,
@@ -8,6 +9,7 @@ from app.schemas.common import (
     SuggestRequest,
     SuggestResponse,
 )
+from app.services.metrics import registry
 
 router = APIRouter()
 
@@ -18,6 +20,14 @@ def health():
     return {"status": "ok"}
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.post("/echo", response_model=EchoResponse)
 def echo(body: EchoRequest):
     """Echo endpoint."""
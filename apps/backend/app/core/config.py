@@ -1,6 +1,7 @@
 """Application configuration."""
 
 import os
+import tempfile
 from typing import List, Optional
 from dotenv import load_dotenv
 
@@ -23,8 +24,233 @@ class Settings:
     ANTHROPIC_API_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
 
+    # Optional base URLs (e.g. local stub servers or compatible gateways)
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")
+    ANTHROPIC_BASE_URL: Optional[str] = os.getenv("ANTHROPIC_BASE_URL")
+    # Retries done inside the OpenAI/Anthropic SDKs before the router fails over
+    LLM_CLIENT_MAX_RETRIES: int = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "2"))
+
+    # Provider router (model_provider="auto")
+    ROUTER_MAX_COST_PER_MTOK: Optional[float] = (
+        float(os.environ["ROUTER_MAX_COST_PER_MTOK"])
+        if os.getenv("ROUTER_MAX_COST_PER_MTOK")
+        else None
+    )
+    ROUTER_EWMA_ALPHA: float = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+    ROUTER_ERROR_THRESHOLD: float = float(os.getenv("ROUTER_ERROR_THRESHOLD", "0.5"))
+    ROUTER_FAILURE_COOLDOWN_SECONDS: float = float(
+        os.getenv("ROUTER_FAILURE_COOLDOWN_SECONDS", "30")
+    )
+
+    # model_provider="cascade": provider/model tiers, fastest first; each call
+    # escalates to the next tier when the output fails local checks (see
+    # app/services/model_cascade.py)
+    CASCADE_MODELS: str = os.getenv(
+        "CASCADE_MODELS", "gemini/gemini-2.0-flash-lite,gemini/gemini-2.5-flash"
+    )
+
+    # Server-side agent loop budgets (see app/services/agent_loop.py)
+    AGENT_MAX_STEPS: int = int(os.getenv("AGENT_MAX_STEPS", "4"))
+    AGENT_MAX_TOKENS: int = int(os.getenv("AGENT_MAX_TOKENS", "12000"))
+    AGENT_MAX_SECONDS: float = float(os.getenv("AGENT_MAX_SECONDS", "25"))
+
+    # Batch endpoint (see app/services/batch.py)
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    BATCH_LANE_CONCURRENCY: int = int(os.getenv("BATCH_LANE_CONCURRENCY", "4"))
+    BATCH_INTERACTIVE_HIGH_WATER: int = int(
+        os.getenv("BATCH_INTERACTIVE_HIGH_WATER", "8")
+    )
+    BATCH_POLL_INTERVAL_SECONDS: float = float(
+        os.getenv("BATCH_POLL_INTERVAL_SECONDS", "30")
+    )
+    BATCH_PROVIDER_TIMEOUT_SECONDS: float = float(
+        os.getenv("BATCH_PROVIDER_TIMEOUT_SECONDS", "86400")
+    )
+    # Route provider batch mode through the in-process stand-in even when the
+    # provider has a native batch API
+    BATCH_USE_LOCAL_STANDIN: bool = os.getenv(
+        "BATCH_USE_LOCAL_STANDIN", ""
+    ).lower() in ("1", "true", "yes")
+    BATCH_LOCAL_QUEUE_DELAY_SECONDS: float = float(
+        os.getenv("BATCH_LOCAL_QUEUE_DELAY_SECONDS", "1")
+    )
+
+    # Slimming of getEvents results posted by the frontend
+    # (see app/services/event_compaction.py)
+    TOOL_RESULT_SLIMMING_ENABLED: bool = os.getenv(
+        "TOOL_RESULT_SLIMMING_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    GET_EVENTS_MAX_EVENTS: int = int(os.getenv("GET_EVENTS_MAX_EVENTS", "30"))
+
+    # Precomputed today/tomorrow agenda digests (see app/services/agenda_digest.py)
+    AGENDA_DIGEST_ENABLED: bool = os.getenv(
+        "AGENDA_DIGEST_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    AGENDA_DIGEST_INTERVAL_SECONDS: float = float(
+        os.getenv("AGENDA_DIGEST_INTERVAL_SECONDS", "60")
+    )
+    # How long a frontend snapshot is trusted; edits made outside the app only
+    # show up after the next sync
+    AGENDA_COVERAGE_MAX_AGE_SECONDS: float = float(
+        os.getenv("AGENDA_COVERAGE_MAX_AGE_SECONDS", "900")
+    )
+    AGENDA_ACTIVE_USER_TTL_SECONDS: float = float(
+        os.getenv("AGENDA_ACTIVE_USER_TTL_SECONDS", "86400")
+    )
+    AGENDA_MAX_USERS: int = int(os.getenv("AGENDA_MAX_USERS", "5000"))
+    # Shared with the frontend, which signs the session's user id with it
+    # (see app/core/user_signature.py); without it no user_id is trusted
+    USER_ID_SIGNING_SECRET: str = os.getenv("USER_ID_SIGNING_SECRET", "")
+
+    # Scripted fake provider for offline runs (see app/services/fake_provider.py)
+    FAKE_LLM_ENABLED: bool = os.getenv("FAKE_LLM_ENABLED", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    FAKE_LLM_SCRIPT: Optional[str] = os.getenv("FAKE_LLM_SCRIPT")
+    FAKE_LLM_FAULTS: str = os.getenv("FAKE_LLM_FAULTS", "")
+    FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    FAKE_LLM_TIMEOUT_MS: float = float(os.getenv("FAKE_LLM_TIMEOUT_MS", "2000"))
+
     # Web Search API Keys
     SERPAPI_API_KEY: Optional[str] = os.getenv("SERPAPI_API_KEY")
 
+    # Web search cache
+    WEB_SEARCH_CACHE_TTL_SECONDS: float = float(
+        os.getenv("WEB_SEARCH_CACHE_TTL_SECONDS", "300")
+    )
+    WEB_SEARCH_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("WEB_SEARCH_CACHE_MAX_ENTRIES", "256")
+    )
+
+    # Compaction of webSearch results fed back to the model
+    # (see app/services/search_compaction.py)
+    WEB_SEARCH_COMPACTION_ENABLED: bool = os.getenv(
+        "WEB_SEARCH_COMPACTION_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    WEB_SEARCH_RESULT_TOKEN_BUDGET: int = int(
+        os.getenv("WEB_SEARCH_RESULT_TOKEN_BUDGET", "400")
+    )
+
+    # Near-duplicate query reuse (see app/services/query_dedup.py)
+    WEB_SEARCH_NEAR_DUP_ENABLED: bool = os.getenv(
+        "WEB_SEARCH_NEAR_DUP_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    WEB_SEARCH_NEAR_DUP_THRESHOLD: float = float(
+        os.getenv("WEB_SEARCH_NEAR_DUP_THRESHOLD", "0.8")
+    )
+    # Results only get reused for rephrasings within this window
+    WEB_SEARCH_NEAR_DUP_MAX_AGE_SECONDS: float = float(
+        os.getenv("WEB_SEARCH_NEAR_DUP_MAX_AGE_SECONDS", "300")
+    )
+
+    # Speculative web search for "🔍 Web Search:" messages
+    WEB_SEARCH_PREFETCH_ENABLED: bool = os.getenv(
+        "WEB_SEARCH_PREFETCH_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    WEB_SEARCH_PREFETCH_MIN_SIMILARITY: float = float(
+        os.getenv("WEB_SEARCH_PREFETCH_MIN_SIMILARITY", "0.5")
+    )
+
+    # Idempotency-Key replay for /chat/generate (see app/services/idempotency.py)
+    IDEMPOTENCY_ENABLED: bool = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+    # Longer than a request can run (AGENT_MAX_SECONDS), so a duplicate on
+    # another worker only recomputes if the original worker died
+    IDEMPOTENCY_PENDING_TTL_SECONDS: float = float(
+        os.getenv("IDEMPOTENCY_PENDING_TTL_SECONDS", "60")
+    )
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = int(
+        os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", "65536")
+    )
+    # A computation whose requests all disconnected is cancelled after this
+    # long unless a retry attaches to it first
+    IDEMPOTENCY_ORPHAN_GRACE_SECONDS: float = float(
+        os.getenv("IDEMPOTENCY_ORPHAN_GRACE_SECONDS", "2")
+    )
+
+    # Output cap, temperature and thinking budget per request class
+    # (see app/services/generation_policy.py); off sends the old fixed values
+    GENERATION_POLICY_ENABLED: bool = os.getenv(
+        "GENERATION_POLICY_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+
+    # Validate model tool calls against the tool schemas, repair common
+    # mistakes locally and send unrepairable ones back to the model (see
+    # app/services/tool_schemas.py); off passes calls through unchecked
+    TOOL_CALL_VALIDATION_ENABLED: bool = os.getenv(
+        "TOOL_CALL_VALIDATION_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+
+    # Answer confirm/modify/cancel replies to an open confirmation card
+    # without the model (see app/services/confirmation_flow.py)
+    CONFIRMATION_FLOW_ENABLED: bool = os.getenv(
+        "CONFIRMATION_FLOW_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+
+    # Send only the prompt sections and tools a turn needs (see
+    # app/services/prompt_scope.py); turns classified below the confidence
+    # floor get the full prompt and every tool
+    PROMPT_SCOPE_ENABLED: bool = os.getenv("PROMPT_SCOPE_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    PROMPT_SCOPE_MIN_CONFIDENCE: float = float(
+        os.getenv("PROMPT_SCOPE_MIN_CONFIDENCE", "0.7")
+    )
+
+    # Per-request deadline for /chat/generate (see app/services/deadlines.py);
+    # an X-Request-Timeout header can shorten it but not extend it
+    REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "30"))
+    CANCEL_ON_DISCONNECT_ENABLED: bool = os.getenv(
+        "CANCEL_ON_DISCONNECT_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+
+    # Worker processes (uvicorn also reads WEB_CONCURRENCY for --workers)
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Caches and agenda sessions (see app/services/state_store.py). memory://
+    # keeps them per process; with several workers they default to a SQLite
+    # database in WAL mode shared by every worker on the host
+    STATE_STORE_URL: str = os.getenv("STATE_STORE_URL") or (
+        "sqlite:///" + os.path.join(tempfile.gettempdir(), "calendara-state.db")
+        if WEB_CONCURRENCY > 1
+        else "memory://"
+    )
+    # How long a SQLite store call waits on another worker's write lock before
+    # it counts as a miss. It runs on the event loop, so keep this short
+    STATE_STORE_BUSY_TIMEOUT_MS: int = int(
+        os.getenv("STATE_STORE_BUSY_TIMEOUT_MS", "25")
+    )
+
+    # orjson for request/response bodies when installed (see app/core/fast_json.py)
+    FAST_JSON_ENABLED: bool = os.getenv("FAST_JSON_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # Heavy SDKs are imported on first use; preload them in the background
+    # once the server is accepting requests (see app/services/lazy_imports.py)
+    LAZY_PRELOAD_ENABLED: bool = os.getenv("LAZY_PRELOAD_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    LAZY_PRELOAD_DELAY_SECONDS: float = float(
+        os.getenv("LAZY_PRELOAD_DELAY_SECONDS", "0.5")
+    )
+
+    # Metrics
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = float(
+        os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", "0.5")
+    )
+
 
 settings = Settings()
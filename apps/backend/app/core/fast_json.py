@@ -0,0 +1,86 @@
+"""Fast JSON encoding and decoding for request/response bodies.
+
+Chat requests carry the whole conversation (often hundreds of messages with
+tool results nested as JSON strings), so the JSON codec shows up in request
+latency. orjson is used when installed and ``FAST_JSON_ENABLED`` is on,
+otherwise the standard library. ``orjson.JSONDecodeError`` subclasses
+``json.JSONDecodeError``, so callers catch the same exceptions either way.
+"""
+
+import json
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+FAST = orjson is not None and settings.FAST_JSON_ENABLED
+BACKEND = "orjson" if FAST else "json"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: str | bytes) -> Any:
+    if FAST:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if FAST:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def dumps_str(obj: Any) -> str:
+    """Compact JSON as text, for JSON carried inside message content."""
+    if FAST:
+        return orjson.dumps(obj, default=_default).decode()
+    return json.dumps(obj, default=_default, ensure_ascii=False)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRequest(Request):
+    """Request whose ``json()`` decodes with ``loads``."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """Route that parses JSON bodies with the fast decoder.
+
+    FastAPI reads request bodies through ``Request.json()``; swapping the
+    request class is its documented extension point for custom decoding.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def fast_json_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return fast_json_handler
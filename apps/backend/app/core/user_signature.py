@@ -0,0 +1,35 @@
+"""Signed user ids from the frontend.
+
+Agenda digests are keyed by ``user_id``, which arrives in the request body.
+The frontend takes it from the authenticated session server-side and sends
+an HMAC-SHA256 of it, keyed with ``USER_ID_SIGNING_SECRET``, in the
+``X-User-Signature`` header. A user id without a valid signature is not
+trusted: ``/chat/generate`` serves no digests for it and ``/chat/agenda/sync``
+rejects it.
+"""
+
+import hashlib
+import hmac
+from typing import Optional
+
+from app.core.config import settings
+
+USER_SIGNATURE_HEADER = "X-User-Signature"
+
+
+def sign_user_id(user_id: str, secret: str) -> str:
+    return hmac.new(secret.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+
+
+def verified_user_id(
+    user_id: Optional[str],
+    signature: Optional[str],
+    secret: Optional[str] = None,
+) -> Optional[str]:
+    """``user_id`` if ``signature`` is its signature, otherwise None."""
+    secret = settings.USER_ID_SIGNING_SECRET if secret is None else secret
+    if not user_id or not signature or not secret:
+        return None
+    expected = sign_user_id(user_id, secret)
+    valid = hmac.compare_digest(expected.encode(), signature.strip().lower().encode())
+    return user_id if valid else None
@@ -1,10 +1,16 @@
 """Main FastAPI application."""
 
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.chat import llm_service
+from app.services.agenda_digest import agenda_digests, run_digest_scheduler
+from app.services.metrics import HTTP_REQUEST_LATENCY, Timer, monitor_event_loop_lag
+from app.services.provider_router import model_label
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -17,5 +23,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record request latency per endpoint and model."""
+    timer = Timer()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Use the route template to keep label cardinality bounded
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or "unmatched"
+        # The model name comes from the request body; map it to a known set
+        model = getattr(request.state, "metrics_model", None)
+        model = model_label(model) if model else "none"
+        HTTP_REQUEST_LATENCY.observe(
+            timer.elapsed(),
+            endpoint=endpoint,
+            method=request.method,
+            status=status,
+            model=model,
+        )
+
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    """Start sampling event loop lag in the background."""
+    app.state.event_loop_monitor = asyncio.create_task(
+        monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS)
+    )
+
+
+@app.on_event("startup")
+async def start_agenda_digest_scheduler():
+    """Keep precomputed agenda digests current for active users."""
+    if settings.AGENDA_DIGEST_ENABLED:
+        app.state.agenda_digest_scheduler = asyncio.create_task(
+            run_digest_scheduler(
+                agenda_digests, settings.AGENDA_DIGEST_INTERVAL_SECONDS
+            )
+        )
+
+
+@app.on_event("startup")
+async def start_sdk_preload():
+    """Import provider SDKs off the event loop once the server is up."""
+    if settings.LAZY_PRELOAD_ENABLED:
+
+        async def warm_up():
+            await asyncio.sleep(settings.LAZY_PRELOAD_DELAY_SECONDS)
+            timings = await asyncio.to_thread(llm_service.warm_up)
+            total = sum(timings.values()) * 1000
+            print(
+                f"🔍 DEBUG: Preloaded {', '.join(timings) or 'no SDKs'} in {total:.0f}ms"
+            )
+
+        app.state.sdk_preload = asyncio.create_task(warm_up())
+
+
+@app.on_event("shutdown")
+async def stop_event_loop_monitor():
+    """Stop the event loop lag sampler."""
+    task = getattr(app.state, "event_loop_monitor", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.on_event("shutdown")
+async def stop_agenda_digest_scheduler():
+    """Stop the agenda digest scheduler."""
+    task = getattr(app.state, "agenda_digest_scheduler", None)
+    if task is not None:
+        task.cancel()
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
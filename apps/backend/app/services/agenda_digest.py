@@ -0,0 +1,564 @@
+"""Precomputed today/tomorrow agenda digests per active user.
+
+The backend has no calendar access of its own, so the store is fed by the
+frontend: ``/chat/agenda/sync`` snapshots of the today+tomorrow window
+(expanded recurring instances) and the results of createEvent, updateEvent
+and deleteEvent calls posted back to ``/chat/generate``. Digests are rebuilt
+as soon as events change; the scheduler handles midnight rollover (tomorrow's
+digest becomes today's), expires stale snapshots and drops inactive users.
+
+A digest is only served while the snapshot it was built from is fresh, since
+events edited outside the app are invisible until the next sync. On a miss
+the request takes the normal getEvents path.
+"""
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core import fast_json
+from app.core.config import settings
+from app.services.calendar_intent import (
+    TimeWindow,
+    day_window,
+    detect_calendar_intent,
+    midnight,
+)
+from app.services.metrics import registry
+from app.services.state_store import StateStore, state_store
+from app.services.user_locale import DEFAULT_TZ, get_zone
+
+AGENDA_DIGEST_LOOKUPS = registry.counter(
+    "agenda_digest_lookups_total",
+    "Agenda questions by outcome (hit/miss)",
+    ["outcome"],
+)
+AGENDA_DIGEST_BUILDS = registry.counter(
+    "agenda_digest_builds_total",
+    "Agenda digests built by trigger (sync/change/schedule)",
+    ["reason"],
+)
+AGENDA_ACTIVE_USERS = registry.gauge(
+    "agenda_digest_active_users",
+    "Users with agenda state held by the digest scheduler",
+)
+
+# Windows a digest can answer, by day offset from today
+DIGEST_DAYS = {"today": 0, "tomorrow": 1}
+
+# Stricter than the intent detector's READ_RE: "what's the weather today" is a
+# read with a window but not an agenda question
+AGENDA_QUESTION_RE = re.compile(
+    r"\b(calendar|schedule|agenda|diary|events?|meetings?|appointments?|plans?"
+    r"|what(?:'s| is)? on|anything on|am i (?:free|busy|doing|up to)"
+    r"|what am i (?:doing|up to)|how busy)\b"
+)
+
+# Mutating tools whose results carry the event they touched
+EVENT_CHANGE_TOOLS = frozenset(
+    {"handleEventConfirmation", "updateEvent", "deleteEvent"}
+)
+
+FOLLOW_UP = "Want me to help you with anything else?"
+
+# Saving a user's state refreshes its TTL; touches closer together than this
+# skip the write
+TOUCH_INTERVAL_SECONDS = 60.0
+
+
+def parse_event_time(
+    value: Any, tz: ZoneInfo = DEFAULT_TZ
+) -> Tuple[Optional[datetime], bool]:
+    """A getEvents start/end (RFC3339 or all-day date) in the user's timezone."""
+    if isinstance(value, dict):
+        value = value.get("dateTime") or value.get("date")
+    if not isinstance(value, str) or not value:
+        return None, False
+    try:
+        if len(value) == 10:
+            return midnight(date.fromisoformat(value), tz), True
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None, False
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=tz), False
+    return parsed.astimezone(tz), False
+
+
+@dataclass(frozen=True)
+class AgendaEvent:
+    id: str
+    summary: str
+    start: datetime
+    end: datetime
+    location: Optional[str] = None
+    all_day: bool = False
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], tz: ZoneInfo = DEFAULT_TZ
+    ) -> Optional["AgendaEvent"]:
+        """Parse a formatted getEvents event or a raw Google Calendar event."""
+        start, all_day = parse_event_time(data.get("start"), tz)
+        end, _ = parse_event_time(data.get("end"), tz)
+        if not data.get("id") or start is None:
+            return None
+        return cls(
+            id=str(data["id"]),
+            summary=data.get("summary") or "No title",
+            start=start,
+            end=end if end and end > start else start + timedelta(hours=1),
+            location=data.get("location") or None,
+            all_day=all_day,
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "summary": self.summary,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "location": self.location,
+            "all_day": self.all_day,
+        }
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any], tz: ZoneInfo) -> "AgendaEvent":
+        return cls(
+            id=data["id"],
+            summary=data["summary"],
+            start=datetime.fromisoformat(data["start"]).astimezone(tz),
+            end=datetime.fromisoformat(data["end"]).astimezone(tz),
+            location=data["location"],
+            all_day=data["all_day"],
+        )
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return self.start < end and self.end > start
+
+    def days(self) -> Iterable[date]:
+        day = self.start.date()
+        last = (self.end - timedelta(microseconds=1)).date()
+        while day <= last:
+            yield day
+            day += timedelta(days=1)
+
+
+@dataclass
+class Digest:
+    day: date
+    label: str
+    text: str
+    event_count: int
+    built_at: float
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "day": self.day.isoformat(),
+            "label": self.label,
+            "text": self.text,
+            "event_count": self.event_count,
+            "built_at": self.built_at,
+        }
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "Digest":
+        return cls(**{**data, "day": date.fromisoformat(data["day"])})
+
+
+@dataclass
+class UserAgenda:
+    events: Dict[str, AgendaEvent] = field(default_factory=dict)
+    # Window of the last full snapshot and when it was synced. Times are wall
+    # clock (time.time) since the state can be shared between processes
+    coverage: Optional[Tuple[datetime, datetime, float]] = None
+    digests: Dict[date, Digest] = field(default_factory=dict)
+    last_seen: float = field(default_factory=time.time)
+    # The user's timezone decides where "today" starts and ends
+    tz: ZoneInfo = DEFAULT_TZ
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-compatible form kept in the state store."""
+        coverage = None
+        if self.coverage is not None:
+            start, end, synced_at = self.coverage
+            coverage = [start.isoformat(), end.isoformat(), synced_at]
+        return {
+            "events": [event.to_state() for event in self.events.values()],
+            "coverage": coverage,
+            "digests": [digest.to_state() for digest in self.digests.values()],
+            "last_seen": self.last_seen,
+            "tz": self.tz.key,
+        }
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "UserAgenda":
+        tz = get_zone(data["tz"]) or DEFAULT_TZ
+        coverage = None
+        if data["coverage"] is not None:
+            start, end, synced_at = data["coverage"]
+            coverage = (
+                datetime.fromisoformat(start),
+                datetime.fromisoformat(end),
+                synced_at,
+            )
+        events = [AgendaEvent.from_state(event, tz) for event in data["events"]]
+        digests = [Digest.from_state(digest) for digest in data["digests"]]
+        return cls(
+            events={event.id: event for event in events},
+            coverage=coverage,
+            digests={digest.day: digest for digest in digests},
+            last_seen=data["last_seen"],
+            tz=tz,
+        )
+
+
+def _clock(moment: datetime) -> Tuple[str, str]:
+    return f"{moment.hour % 12 or 12}:{moment.minute:02d}", (
+        "am" if moment.hour < 12 else "pm"
+    )
+
+
+def format_time_range(
+    event: AgendaEvent, day_start: datetime, day_end: datetime
+) -> str:
+    """Local time range of an event on one day, e.g. "10:00–11:00 am"."""
+    if event.all_day or (event.start <= day_start and event.end >= day_end):
+        return "all day"
+    start_clock, start_half = _clock(event.start)
+    end_clock, end_half = _clock(event.end)
+    if event.start < day_start:
+        return f"until {end_clock} {end_half}"
+    if event.end > day_end:
+        return f"from {start_clock} {start_half}"
+    if start_half == end_half:
+        return f"{start_clock}–{end_clock} {end_half}"
+    return f"{start_clock} {start_half}–{end_clock} {end_half}"
+
+
+def render_digest(label: str, window: TimeWindow, events: List[AgendaEvent]) -> str:
+    """Natural-language agenda in the style the system prompt asks for."""
+    if not events:
+        return f"You have no events {label}. {FOLLOW_UP}"
+    events = sorted(events, key=lambda e: (not e.all_day, e.start, e.summary))
+    items = []
+    for event in events:
+        item = (
+            f"{format_time_range(event, window.start, window.end)} **{event.summary}**"
+        )
+        if event.location:
+            item += f" ({event.location})"
+        items.append(item)
+    day = window.start.strftime("%a %-d %b")
+    count = f"{len(events)} event{'s' if len(events) != 1 else ''}"
+    return f"{label.capitalize()} ({day}) you have {count}: {'; '.join(items)}. {FOLLOW_UP}"
+
+
+class AgendaDigestStore:
+    """Per-user event state and the today/tomorrow digests built from it.
+
+    User state lives in a ``StateStore`` (``user:<id>`` keys), so with a
+    shared backend every worker sees the same snapshots and digests.
+    """
+
+    def __init__(
+        self,
+        coverage_max_age: float = 900.0,
+        active_user_ttl: float = 86400.0,
+        max_users: int = 5000,
+        state: Optional[StateStore] = None,
+    ):
+        self.coverage_max_age = coverage_max_age
+        self.active_user_ttl = active_user_ttl
+        self.max_users = max_users
+        self.state = state if state is not None else state_store("agenda", max_users)
+
+    def _load(self, user_id: str) -> Optional[UserAgenda]:
+        data = self.state.get(f"user:{user_id}")
+        return UserAgenda.from_state(data) if data is not None else None
+
+    def _save(self, user_id: str, agenda: UserAgenda) -> None:
+        self.state.set(f"user:{user_id}", agenda.to_state(), ttl=self.active_user_ttl)
+
+    def touch(self, user_id: str, tz: Optional[ZoneInfo] = None) -> None:
+        """Mark a user as active so the scheduler keeps their digests warm."""
+        agenda = self._load(user_id)
+        now = time.time()
+        if agenda is None:
+            agenda = UserAgenda(last_seen=0.0)
+        changed = tz is not None and self._set_timezone(agenda, tz)
+        if changed or now - agenda.last_seen >= TOUCH_INTERVAL_SECONDS:
+            agenda.last_seen = now
+            self._save(user_id, agenda)
+
+    def _set_timezone(self, agenda: UserAgenda, tz: ZoneInfo) -> bool:
+        if tz == agenda.tz:
+            return False
+        # Days and all-day events were bucketed in the old zone; the next
+        # sync rebuilds everything
+        agenda.tz = tz
+        agenda.events.clear()
+        agenda.digests.clear()
+        agenda.coverage = None
+        return True
+
+    def _digest_windows(
+        self, tz: ZoneInfo, now: Optional[datetime] = None
+    ) -> List[TimeWindow]:
+        today = (now or datetime.now(tz)).astimezone(tz).date()
+        return [
+            day_window(label, today + timedelta(days=offset), 1, tz)
+            for label, offset in DIGEST_DAYS.items()
+        ]
+
+    def _covers(self, agenda: UserAgenda, window: TimeWindow) -> bool:
+        if agenda.coverage is None:
+            return False
+        start, end, synced_at = agenda.coverage
+        fresh = time.time() - synced_at <= self.coverage_max_age
+        return fresh and start <= window.start and end >= window.end
+
+    def _rebuild(
+        self,
+        agenda: UserAgenda,
+        reason: str,
+        days: Optional[Iterable[date]] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        wanted = set(days) if days is not None else None
+        built = 0
+        for window in self._digest_windows(agenda.tz, now):
+            day = window.start.date()
+            if wanted is not None and day not in wanted:
+                continue
+            if not self._covers(agenda, window):
+                agenda.digests.pop(day, None)
+                continue
+            events = [
+                e
+                for e in agenda.events.values()
+                if e.overlaps(window.start, window.end)
+            ]
+            agenda.digests[day] = Digest(
+                day=day,
+                label=window.label,
+                text=render_digest(window.label, window, events),
+                event_count=len(events),
+                built_at=time.time(),
+            )
+            AGENDA_DIGEST_BUILDS.inc(reason=reason)
+            built += 1
+        return built
+
+    def sync(
+        self,
+        user_id: str,
+        time_min: datetime,
+        time_max: datetime,
+        events: List[Dict[str, Any]],
+        tz: Optional[ZoneInfo] = None,
+    ) -> List[Digest]:
+        """Replace the user's events in a window with a full snapshot."""
+        agenda = self._load(user_id) or UserAgenda()
+        agenda.last_seen = time.time()
+        if tz is not None:
+            self._set_timezone(agenda, tz)
+        agenda.events = {
+            event_id: event
+            for event_id, event in agenda.events.items()
+            if not event.overlaps(time_min, time_max)
+        }
+        for data in events:
+            event = AgendaEvent.from_dict(data, agenda.tz)
+            if event is not None:
+                agenda.events[event.id] = event
+        agenda.coverage = (time_min, time_max, time.time())
+        self._rebuild(agenda, "sync")
+        self._save(user_id, agenda)
+        print(
+            f"🔍 DEBUG: Agenda sync for {user_id}: {len(events)} events, "
+            f"{len(agenda.digests)} digests"
+        )
+        return list(agenda.digests.values())
+
+    def apply_changes(
+        self,
+        user_id: str,
+        upserts: Iterable[Dict[str, Any]] = (),
+        deletes: Iterable[str] = (),
+    ) -> int:
+        """Apply single-event changes and rebuild only the days they touch."""
+        agenda = self._load(user_id) or UserAgenda()
+        touched = set()
+        for data in upserts:
+            event = AgendaEvent.from_dict(data, agenda.tz)
+            if event is None:
+                continue
+            previous = agenda.events.get(event.id)
+            if previous is not None:
+                touched.update(previous.days())
+            agenda.events[event.id] = event
+            touched.update(event.days())
+        for event_id in deletes:
+            previous = agenda.events.pop(str(event_id), None)
+            if previous is not None:
+                touched.update(previous.days())
+        if not touched:
+            return 0
+        built = self._rebuild(agenda, "change", days=touched)
+        self._save(user_id, agenda)
+        return built
+
+    def apply_tool_results(
+        self,
+        user_id: str,
+        tool_calls: Dict[str, Dict[str, Any]],
+        results: List[Dict[str, Any]],
+    ) -> int:
+        """Pick event changes out of frontend tool results posted to /generate."""
+        upserts, deletes = [], []
+        for result in results:
+            call = tool_calls.get(result.get("tool_call_id", ""))
+            if not call or not result.get("success"):
+                continue
+            name = call.get("function", {}).get("name")
+            if name not in EVENT_CHANGE_TOOLS:
+                continue
+            try:
+                payload = fast_json.loads(result.get("content") or "")
+            except ValueError:
+                # handleEventConfirmation(modify) returns a card, not an event
+                continue
+            if not isinstance(payload, dict) or "id" not in payload:
+                continue
+            if payload.get("deleted"):
+                deletes.append(payload["id"])
+            else:
+                upserts.append(payload)
+        if not upserts and not deletes:
+            return 0
+        return self.apply_changes(user_id, upserts, deletes)
+
+    def lookup(
+        self, user_id: str, message: str, now: Optional[datetime] = None
+    ) -> Optional[Digest]:
+        """The cached digest answering ``message``, or None to use the live path."""
+        text = " ".join(message.lower().split())
+        if not AGENDA_QUESTION_RE.search(text):
+            return None
+        agenda = self._load(user_id)
+        tz = agenda.tz if agenda is not None else DEFAULT_TZ
+        intent = detect_calendar_intent(message, now, tz)
+        if intent.kind != "read" or not intent.window:
+            return None
+        if intent.window.label not in DIGEST_DAYS:
+            return None
+
+        digest = None
+        if agenda is not None and self._covers(agenda, intent.window):
+            digest = agenda.digests.get(intent.window.start.date())
+        if digest is not None and digest.label != intent.window.label:
+            # Built before midnight and the scheduler hasn't rolled it yet
+            digest = None
+        AGENDA_DIGEST_LOOKUPS.inc(outcome="hit" if digest else "miss")
+        return digest
+
+    def sync_window(
+        self, user_id: str, now: Optional[datetime] = None
+    ) -> Optional[TimeWindow]:
+        """The window the frontend should snapshot, if this user's is missing or
+        more than half way to expiry."""
+        agenda = self._load(user_id)
+        windows = self._digest_windows(agenda.tz if agenda else DEFAULT_TZ, now)
+        wanted = TimeWindow("agenda", windows[0].start, windows[-1].end)
+        if agenda is not None and agenda.coverage is not None:
+            start, end, synced_at = agenda.coverage
+            age = time.time() - synced_at
+            if (
+                start <= wanted.start
+                and end >= wanted.end
+                and age <= self.coverage_max_age / 2
+            ):
+                return None
+        return wanted
+
+    def refresh(self, now: Optional[datetime] = None) -> int:
+        """One scheduler pass: roll digests over midnight, expire stale ones and
+        forget inactive users."""
+        built = 0
+        active = 0
+        cutoff = time.time() - self.active_user_ttl
+        for key in self.state.keys("user:"):
+            user_id = key[len("user:") :]
+            agenda = self._load(user_id)
+            if agenda is None:
+                continue
+            if agenda.last_seen < cutoff:
+                self.state.delete(key)
+                continue
+            active += 1
+            changed = False
+            windows = self._digest_windows(agenda.tz, now)
+            current = {window.start.date(): window.label for window in windows}
+            for day in [d for d in agenda.digests if d not in current]:
+                del agenda.digests[day]
+                changed = True
+            stale = [
+                window.start.date()
+                for window in windows
+                if (digest := agenda.digests.get(window.start.date())) is None
+                or digest.label != window.label
+                or not self._covers(agenda, window)
+            ]
+            if stale:
+                built += self._rebuild(agenda, "schedule", days=stale, now=now)
+                changed = True
+            # Events that ended before today are no longer needed
+            today_start = windows[0].start
+            events = {
+                event_id: event
+                for event_id, event in agenda.events.items()
+                if event.end > today_start
+            }
+            if changed or len(events) != len(agenda.events):
+                agenda.events = events
+                self._save(user_id, agenda)
+        AGENDA_ACTIVE_USERS.set(active)
+        return built
+
+    def claim_refresh(self, interval: float) -> bool:
+        """Whether this process should run the next scheduler pass.
+
+        Every worker runs a scheduler; with shared state one of them per
+        interval does the pass.
+        """
+        return self.state.add("lease:refresh", os.getpid(), ttl=interval * 0.9)
+
+
+async def run_digest_scheduler(
+    store: AgendaDigestStore, interval: float = 60.0
+) -> None:
+    """Refresh digests forever; run as a background task."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not store.claim_refresh(interval):
+                continue
+            built = store.refresh()
+            if built:
+                print(f"🔍 DEBUG: Agenda scheduler rebuilt {built} digests")
+        except Exception as e:
+            print(f"🔍 DEBUG: Agenda scheduler error: {e}")
+
+
+# Global instance
+agenda_digests = AgendaDigestStore(
+    coverage_max_age=settings.AGENDA_COVERAGE_MAX_AGE_SECONDS,
+    active_user_ttl=settings.AGENDA_ACTIVE_USER_TTL_SECONDS,
+    max_users=settings.AGENDA_MAX_USERS,
+)
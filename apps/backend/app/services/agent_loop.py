@@ -0,0 +1,362 @@
+"""Bounded server-side agent loop over backend-executable tools."""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core import fast_json
+from app.core.config import settings
+from app.services.base_provider import LLMMessage, LLMResponse, tool_call_arguments
+from app.services.metrics import registry
+from app.services.tool_schemas import tool_call_errors
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+if TYPE_CHECKING:
+    from app.services.llm_service import LLMService
+    from app.services.provider_router import RouteOptions
+    from app.services.search_prefetch import SearchPrefetch
+
+# Tools LLMService.execute_tool_call can run; anything else belongs to the frontend
+BACKEND_TOOLS = frozenset({"webSearch"})
+
+AGENT_RUNS = registry.counter(
+    "agent_runs_total",
+    "Agent loop runs by stop reason",
+    ["stop_reason"],
+)
+AGENT_STEPS = registry.histogram(
+    "agent_steps",
+    "Model calls per agent loop run",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+
+
+@dataclass
+class AgentBudget:
+    """Limits for one agent loop run."""
+
+    max_steps: int = 4
+    max_tokens: int = 12000
+    max_seconds: float = 25.0
+
+
+@dataclass
+class AgentStep:
+    """Trace entry for one model call and the tools it triggered."""
+
+    index: int
+    provider: str
+    model: str
+    duration_ms: float
+    tokens: int
+    forced_final: bool = False
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class AgentResult:
+    """Outcome of an agent loop run.
+
+    ``response`` is the last model response. ``executed_tool_calls`` and
+    ``tool_results`` cover every backend tool run across steps;
+    ``pending_tool_calls`` are frontend tools the loop stopped on.
+    """
+
+    response: LLMResponse
+    stop_reason: str
+    steps: List[AgentStep]
+    executed_tool_calls: List[Dict[str, Any]]
+    tool_results: List[Dict[str, Any]]
+    pending_tool_calls: List[Dict[str, Any]]
+    usage: Dict[str, int]
+    elapsed_ms: float
+
+    def trace(self) -> Dict[str, Any]:
+        return {
+            "stop_reason": self.stop_reason,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "total_tokens": self.usage.get("total_tokens", 0),
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+
+def _tool_name(tool_call: Dict[str, Any]) -> str:
+    return tool_call.get("function", {}).get("name", "")
+
+
+def _count_tokens(usage: Dict[str, Any]) -> Tuple[int, int]:
+    prompt = usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    return prompt, completion
+
+
+class AgentLoop:
+    """Runs backend tools until the model answers or needs a frontend tool.
+
+    Each step is one model call. Backend tool calls from a step run
+    concurrently and their results are appended to the conversation for the
+    next step. The loop stops on a plain answer, on any frontend-only tool
+    call (returned to the caller as pending), or when a budget runs out. Tool
+    calls that fail validation (see tool_schemas.py) are answered with the
+    errors so the model can retry them on the next step. When the step or
+    token budget is about to run out, the last call is made without tools so
+    the model has to answer with what it has.
+    """
+
+    def __init__(self, llm_service: "LLMService", budget: Optional[AgentBudget] = None):
+        self.llm_service = llm_service
+        self.budget = budget or AgentBudget()
+
+    async def _execute(
+        self,
+        tool_call: Dict[str, Any],
+        prefetch: Optional["SearchPrefetch"],
+        locale: UserLocale,
+        deadline: float,
+    ) -> Tuple[Dict[str, Any], float]:
+        started = time.perf_counter()
+        result = await self.llm_service.execute_tool_call(
+            tool_call, prefetch, locale, deadline
+        )
+        return result, (time.perf_counter() - started) * 1000
+
+    async def run(
+        self,
+        provider: str,
+        messages: List[LLMMessage],
+        model: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        routing: Optional["RouteOptions"] = None,
+        budget: Optional[AgentBudget] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> AgentResult:
+        """Run the loop. ``deadline`` is the request's ``time.monotonic()``
+        deadline; the loop stops at it or at ``budget.max_seconds``,
+        whichever comes first."""
+        budget = budget or self.budget
+        run_deadline = time.monotonic() + budget.max_seconds
+        if deadline is not None:
+            run_deadline = min(run_deadline, deadline)
+        # Web search requests start searching alongside the first model call
+        prefetch = self.llm_service.start_search_prefetch(
+            messages, locale, run_deadline
+        )
+        try:
+            return await self._run(
+                provider,
+                messages,
+                model,
+                tools,
+                routing,
+                budget,
+                prefetch,
+                locale,
+                run_deadline,
+            )
+        finally:
+            if prefetch is not None:
+                prefetch.close()
+
+    async def _run(
+        self,
+        provider: str,
+        messages: List[LLMMessage],
+        model: Optional[str],
+        tools: Optional[List[Dict[str, Any]]],
+        routing: Optional["RouteOptions"],
+        budget: AgentBudget,
+        prefetch: Optional["SearchPrefetch"],
+        locale: UserLocale,
+        deadline: float,
+    ) -> AgentResult:
+        started = time.perf_counter()
+        messages = list(messages)
+        steps: List[AgentStep] = []
+        executed: List[Dict[str, Any]] = []
+        results: List[Dict[str, Any]] = []
+        pending: List[Dict[str, Any]] = []
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        response: Optional[LLMResponse] = None
+        stop_reason = "max_steps"
+
+        for index in range(budget.max_steps):
+            limit = None
+            if index > 0 and index == budget.max_steps - 1:
+                limit = "max_steps"
+            elif index > 0 and usage["total_tokens"] >= budget.max_tokens:
+                limit = "max_tokens"
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stop_reason = "deadline"
+                break
+
+            step_started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.llm_service.generate_response(
+                        provider=provider,
+                        messages=messages,
+                        model=model,
+                        tools=None if limit else tools,
+                        routing=routing,
+                        locale=locale,
+                        deadline=deadline,
+                    ),
+                    timeout=remaining,
+                )
+            except asyncio.TimeoutError:
+                stop_reason = "deadline"
+                break
+
+            prompt_tokens, completion_tokens = _count_tokens(response.usage)
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["total_tokens"] += prompt_tokens + completion_tokens
+            step = AgentStep(
+                index=index,
+                provider=response.provider,
+                model=response.model,
+                duration_ms=round((time.perf_counter() - step_started) * 1000, 1),
+                tokens=prompt_tokens + completion_tokens,
+                forced_final=limit is not None,
+            )
+            steps.append(step)
+            print(
+                f"🔍 DEBUG: Agent step {index}: {len(response.tool_calls)} tool calls, "
+                f"{step.tokens} tokens, {step.duration_ms}ms"
+            )
+
+            if limit:
+                stop_reason = limit
+                break
+            if not response.tool_calls:
+                stop_reason = "final"
+                break
+
+            # Calls LLMService couldn't repair go back to the model with the
+            # reasons instead of being run or handed to the frontend
+            calls, rejected = response.tool_calls, []
+            if settings.TOOL_CALL_VALIDATION_ENABLED:
+                checked = [(call, tool_call_errors(call)) for call in calls]
+                calls = [call for call, errors in checked if not errors]
+                rejected = [(call, errors) for call, errors in checked if errors]
+                step.tool_calls += [
+                    {
+                        "id": call.get("id"),
+                        "name": _tool_name(call),
+                        "executor": "rejected",
+                        "errors": errors,
+                    }
+                    for call, errors in rejected
+                ]
+
+            backend_calls = [
+                call for call in calls if _tool_name(call) in BACKEND_TOOLS
+            ]
+            frontend_calls = [
+                call for call in calls if _tool_name(call) not in BACKEND_TOOLS
+            ]
+            step_results: List[Dict[str, Any]] = []
+            if prefetch is not None:
+                # Stop a speculative search nobody in this step will use
+                prefetch.keep_if_wanted(
+                    (args.get("query", ""), args.get("maxResults", 5))
+                    for args in (
+                        tool_call_arguments(call)
+                        for call in backend_calls
+                        if _tool_name(call) == "webSearch"
+                    )
+                )
+            if backend_calls:
+                try:
+                    outcomes = await asyncio.wait_for(
+                        asyncio.gather(
+                            *(
+                                self._execute(call, prefetch, locale, deadline)
+                                for call in backend_calls
+                            )
+                        ),
+                        timeout=max(0.0, deadline - time.monotonic()),
+                    )
+                except asyncio.TimeoutError:
+                    stop_reason = "deadline"
+                    break
+                step_results = [result for result, _ in outcomes]
+                step.tool_calls += [
+                    {
+                        "id": call.get("id"),
+                        "name": _tool_name(call),
+                        "executor": "backend",
+                        "success": result.get("success", False),
+                        "duration_ms": round(duration_ms, 1),
+                        **(
+                            {"compaction": result["compaction"]}
+                            if "compaction" in result
+                            else {}
+                        ),
+                    }
+                    for call, (result, duration_ms) in zip(backend_calls, outcomes)
+                ]
+                executed.extend(backend_calls)
+                results.extend(step_results)
+
+            if frontend_calls:
+                # The frontend owns these; hand the turn back with any backend
+                # results from this step so it doesn't have to re-run them
+                pending = frontend_calls
+                # Rejected calls are dropped; the frontend only sees these
+                response.tool_calls = backend_calls + frontend_calls
+                step.tool_calls += [
+                    {
+                        "id": call.get("id"),
+                        "name": _tool_name(call),
+                        "executor": "frontend",
+                    }
+                    for call in frontend_calls
+                ]
+                stop_reason = "frontend_tool"
+                break
+
+            step_results += [
+                {
+                    "tool_call_id": call.get("id"),
+                    "content": "",
+                    "success": False,
+                    "error": "Invalid arguments: "
+                    + "; ".join(errors)
+                    + ". Call the tool again with corrected arguments.",
+                }
+                for call, errors in rejected
+            ]
+            messages = messages + [
+                LLMMessage(
+                    role="assistant",
+                    content=response.content,
+                    tool_calls=response.tool_calls,
+                ),
+                LLMMessage(
+                    role="tool",
+                    content=fast_json.dumps_str(step_results),
+                    tool_results=step_results,
+                ),
+            ]
+
+        AGENT_RUNS.inc(stop_reason=stop_reason)
+        AGENT_STEPS.observe(len(steps))
+        if response is None:
+            raise Exception(
+                "The AI service took too long to respond. Please try again in a few moments."
+            )
+        return AgentResult(
+            response=response,
+            stop_reason=stop_reason,
+            steps=steps,
+            executed_tool_calls=executed,
+            tool_results=results,
+            pending_tool_calls=pending,
+            usage=usage,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
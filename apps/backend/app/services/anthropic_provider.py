@@ -0,0 +1,138 @@
+"""Anthropic provider implementation using the Anthropic SDK."""
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.services.base_provider import (
+    BaseLLMProvider,
+    LLMMessage,
+    LLMResponse,
+    classify_provider_error,
+    to_chat_turns,
+)
+from app.services.deadlines import time_left
+from app.services.lazy_imports import LazyModule
+from app.services.metrics import LLM_CALL_LATENCY, LLM_ERRORS, Timer, observe_llm_usage
+
+
+if TYPE_CHECKING:
+    from app.services.generation_policy import GenerationPolicy
+
+anthropic = LazyModule("anthropic")
+
+
+class AnthropicProvider(BaseLLMProvider):
+    """Anthropic Claude messages provider."""
+
+    name = "anthropic"
+    sdk = anthropic
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-3-5-haiku-latest",
+        base_url: Optional[str] = None,
+        max_retries: int = 2,
+    ):
+        super().__init__(api_key, model)
+        self.base_url = base_url
+        self.max_retries = max_retries
+
+    def create_client(self) -> Any:
+        return anthropic.AsyncAnthropic(
+            api_key=self.api_key, base_url=self.base_url, max_retries=self.max_retries
+        )
+
+    def build_generation_config(
+        self, tools: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Request parameters shared by every call, with tools if provided."""
+        config: Dict[str, Any] = {"max_tokens": 1000, "temperature": 0.6}
+        if tools:
+            config["tools"] = tools
+        return config
+
+    def apply_generation_policy(
+        self, config: Dict[str, Any], policy: "GenerationPolicy"
+    ) -> Dict[str, Any]:
+        # No thinking budget on the chat endpoints used here
+        config["max_tokens"] = policy.max_output_tokens
+        config["temperature"] = policy.temperature
+        return config
+
+    async def generate_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        """Generate response using Anthropic."""
+        timer = Timer()
+        try:
+            system, turns = to_chat_turns(messages)
+
+            # Tools are already in Anthropic format (see tools.py)
+            if config is None:
+                config = self.build_generation_config(tools)
+            request_params: Dict[str, Any] = {
+                **config,
+                "model": self.model,
+                "messages": turns,
+            }
+            if system:
+                request_params["system"] = system
+            timeout = time_left(deadline)
+            if timeout is not None:
+                request_params["timeout"] = timeout
+
+            resp = await self.client.messages.create(**request_params)
+
+            content = ""
+            tool_calls = []
+            for block in getattr(resp, "content", None) or []:
+                block_type = getattr(block, "type", None)
+                if block_type == "text":
+                    content += block.text
+                elif block_type == "tool_use":
+                    tool_calls.append(
+                        {
+                            "id": block.id,
+                            "type": "function",
+                            "function": {
+                                "name": block.name,
+                                # Normalise to a JSON string like the other providers
+                                "arguments": json.dumps(block.input),
+                            },
+                        }
+                    )
+
+            usage = {}
+            if getattr(resp, "usage", None):
+                prompt_tokens = getattr(resp.usage, "input_tokens", None)
+                completion_tokens = getattr(resp.usage, "output_tokens", None)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": (prompt_tokens or 0) + (completion_tokens or 0),
+                }
+
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider=self.name, model=self.model, outcome="ok"
+            )
+            observe_llm_usage(self.name, self.model, usage)
+            return LLMResponse(
+                content,
+                self.name,
+                self.model,
+                usage,
+                tool_calls,
+                truncated=getattr(resp, "stop_reason", None) == "max_tokens",
+            )
+        except Exception as e:
+            error_class, message = classify_provider_error(str(e), "Anthropic")
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider=self.name, model=self.model, outcome="error"
+            )
+            LLM_ERRORS.inc(provider=self.name, error_class=error_class)
+            raise Exception(message)
@@ -0,0 +1,315 @@
+"""Provider-agnostic message types and the base LLM provider interface."""
+
+import copy
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from app.core import fast_json
+
+if TYPE_CHECKING:
+    from app.services.generation_policy import GenerationPolicy
+
+
+def classify_provider_error(error_str: str, provider_label: str) -> Tuple[str, str]:
+    """Map a raw provider error to an error class and a user-friendly message."""
+    if ("503" in error_str and "overloaded" in error_str.lower()) or (
+        "529" in error_str
+    ):
+        return (
+            "overloaded",
+            "Our AI model is currently overloaded and experiencing high demand. Please try again in a few moments. We apologize for the inconvenience!",
+        )
+    elif "503" in error_str:
+        return (
+            "unavailable",
+            "The AI service is temporarily unavailable. Please try again in a few moments.",
+        )
+    elif "429" in error_str:
+        return (
+            "rate_limited",
+            "Too many requests. Please wait a moment before trying again.",
+        )
+    elif "401" in error_str or "403" in error_str:
+        return (
+            "auth",
+            "Authentication error. Please refresh the page and try again.",
+        )
+    elif "timed out" in error_str.lower() or "deadline" in error_str.lower():
+        return (
+            "timeout",
+            "The AI service took too long to respond. Please try again in a few moments.",
+        )
+    else:
+        return ("other", f"{provider_label} API error: {error_str}")
+
+
+def parse_tool_results(content: str) -> Optional[List[Dict[str, Any]]]:
+    """The ``{tool_call_id, content, success, error}`` list in a tool message,
+    or None if the content isn't one."""
+    try:
+        results = fast_json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(results, list) or not all(isinstance(r, dict) for r in results):
+        return None
+    return results
+
+
+_UNPARSED: Any = object()
+
+
+class LLMMessage:
+    """Message structure for LLM requests.
+
+    A tool message's JSON payload is decoded at most once, by the first
+    caller of ``tool_results``; pass ``tool_results`` when it is already known.
+    """
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_results: Optional[List[Dict[str, Any]]] = _UNPARSED,
+    ):
+        self.role = role
+        self.content = content
+        self.tool_calls = tool_calls
+        self._tool_results = tool_results
+
+    @property
+    def tool_results(self) -> Optional[List[Dict[str, Any]]]:
+        """Parsed results of a tool message; shared, so don't mutate them."""
+        if self.role != "tool":
+            return None
+        if self._tool_results is _UNPARSED:
+            self._tool_results = parse_tool_results(self.content)
+        return self._tool_results
+
+
+class LLMResponse:
+    """Response structure from LLM providers."""
+
+    def __init__(
+        self,
+        content: str,
+        provider: str,
+        model: str,
+        usage: Optional[Dict[str, Any]] = None,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        truncated: bool = False,
+    ):
+        self.content = content
+        self.provider = provider
+        self.model = model
+        self.usage = usage or {}
+        self.tool_calls = tool_calls or []
+        # Stopped at the output token cap
+        self.truncated = truncated
+
+
+def new_tool_call_id(prefix: str) -> str:
+    """Process-independent unique ID for a tool call the provider did not name."""
+    return f"{prefix}-{uuid.uuid4().hex[:16]}"
+
+
+def describe_tool_call(tool_call: Dict[str, Any]) -> str:
+    function = tool_call.get("function", {})
+    return f"{function.get('name', 'tool')}({function.get('arguments', '')})"
+
+
+@lru_cache(maxsize=1024)
+def _parse_arguments(arguments: str) -> Dict[str, Any]:
+    args = fast_json.loads(arguments)
+    return args if isinstance(args, dict) else {}
+
+
+def tool_call_arguments(tool_call: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsed arguments of a tool call; ``{}`` if they aren't a JSON object.
+
+    Parsed once per distinct arguments string and shared, so don't mutate
+    the result. Raises ``json.JSONDecodeError`` on malformed JSON.
+    """
+    return _parse_arguments(tool_call.get("function", {}).get("arguments") or "{}")
+
+
+def format_tool_results(
+    message: "LLMMessage", calls_by_id: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    """Render a tool message as one line per result, matched to its call by ID.
+
+    Tool messages carry a JSON list of ``{tool_call_id, content, success,
+    error}``. Each result is labelled with the call it answers so the model
+    can tell apart several calls to the same tool in one turn. Content that
+    is not such a list is returned unchanged.
+    """
+    results = message.tool_results
+    if results is None:
+        return [message.content]
+
+    lines = []
+    for result in results:
+        call_id = result.get("tool_call_id", "")
+        call = calls_by_id.get(call_id)
+        label = describe_tool_call(call) if call else "tool"
+        if result.get("success", True):
+            body = result.get("content", "")
+        else:
+            body = f"ERROR: {result.get('error') or 'unknown error'}"
+        lines.append(f"[{call_id}] {label} -> {body}")
+    return lines
+
+
+def to_chat_turns(
+    messages: List["LLMMessage"],
+) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """Flatten messages into (system prompt, alternating user/assistant turns).
+
+    Tool results and assistant tool calls are inlined as text, the same way the
+    Gemini provider flattens them, so every provider sees equivalent context.
+    """
+    system_parts: List[str] = []
+    turns: List[Dict[str, str]] = []
+    calls_by_id: Dict[str, Dict[str, Any]] = {}
+    for msg in messages:
+        if msg.role == "system":
+            system_parts.append(msg.content)
+            continue
+        if msg.role == "assistant":
+            role = "assistant"
+            text = msg.content or ""
+            if msg.tool_calls:
+                calls_by_id.update(
+                    {call.get("id", ""): call for call in msg.tool_calls}
+                )
+                text = f"{text} [Tool calls: {msg.tool_calls}]".strip()
+        elif msg.role == "tool":
+            role = "user"
+            lines = format_tool_results(msg, calls_by_id)
+            text = "\n".join(f"Tool: {line}" for line in lines)
+        else:
+            role = "user"
+            text = msg.content
+        if turns and turns[-1]["role"] == role:
+            turns[-1]["content"] += f"\n\n{text}"
+        else:
+            turns.append({"role": role, "content": text})
+    system = "\n\n".join(system_parts) if system_parts else None
+    return system, turns
+
+
+class LLMStreamChunk:
+    """A streamed piece of a response; the final chunk carries the full response."""
+
+    def __init__(
+        self, delta: str, done: bool = False, response: Optional[LLMResponse] = None
+    ):
+        self.delta = delta
+        self.done = done
+        self.response = response
+
+
+class BatchJobStatus:
+    """State of an asynchronous batch job.
+
+    ``state`` is one of "pending", "running", "succeeded", "failed" or
+    "cancelled". Once succeeded, ``results`` holds one entry per submitted
+    request, in order: an LLMResponse or the Exception that request hit.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        state: str,
+        results: Optional[List[Union[LLMResponse, Exception]]] = None,
+        error: Optional[str] = None,
+    ):
+        self.job_id = job_id
+        self.state = state
+        self.results = results
+        self.error = error
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("succeeded", "failed", "cancelled")
+
+
+# A fully prepared request: messages including the system prompt, and config
+BatchRequest = Tuple[List["LLMMessage"], Any]
+
+
+class BaseLLMProvider(ABC):
+    """Base class for LLM providers."""
+
+    name = "base"
+    # Whether the provider has a native asynchronous batch API
+    supports_batch = False
+    # LazyModule proxy for the provider's SDK, if it has one
+    sdk: Any = None
+
+    def __init__(self, api_key: Optional[str], model: str):
+        self.api_key = api_key
+        self.model = model
+        self._client: Any = None
+
+    def create_client(self) -> Any:
+        """Build the SDK client; called on first use of ``client``."""
+        return None
+
+    @property
+    def client(self) -> Any:
+        # Created lazily so constructing providers at import time doesn't
+        # import their SDKs (see lazy_imports.py)
+        if self._client is None:
+            self._client = self.create_client()
+        return self._client
+
+    def build_generation_config(self, tools: Optional[List[Dict[str, Any]]]) -> Any:
+        """Provider-specific generation config including tools.
+
+        Built once per request template (see request_templates.py) and cloned
+        per request with ``clone_generation_config``.
+        """
+        return None
+
+    @staticmethod
+    def clone_generation_config(config: Any) -> Any:
+        return copy.copy(config)
+
+    def apply_generation_policy(self, config: Any, policy: "GenerationPolicy") -> Any:
+        """Set the policy's output cap, temperature and thinking budget on a
+        per-request config clone; returns the config to send."""
+        return config
+
+    @abstractmethod
+    async def generate_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Any] = None,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        """Generate a response. ``config`` is a per-request clone of a template's
+        generation config; when omitted it is built from ``tools``. ``deadline``
+        (``time.monotonic()``) becomes the timeout of the upstream call."""
+        raise NotImplementedError
+
+    async def stream_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Any] = None,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a response. Providers without streaming yield it in one chunk."""
+        response = await self.generate_response(messages, tools, config)
+        yield LLMStreamChunk(response.content, done=True, response=response)
+
+    async def submit_batch(self, requests: List[BatchRequest]) -> str:
+        """Submit prepared requests to the provider's batch API; returns a job ID."""
+        raise NotImplementedError(f"{self.name} has no batch API")
+
+    async def get_batch(self, job_id: str) -> BatchJobStatus:
+        """Poll a batch job submitted with ``submit_batch``."""
+        raise NotImplementedError(f"{self.name} has no batch API")
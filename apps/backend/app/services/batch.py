@@ -0,0 +1,164 @@
+"""Background lane and batch job helpers for non-interactive workloads."""
+
+import asyncio
+import contextlib
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.base_provider import (
+    BaseLLMProvider,
+    BatchJobStatus,
+    BatchRequest,
+)
+from app.services.metrics import registry
+
+BATCH_ITEMS = registry.counter(
+    "batch_items_total",
+    "Batch conversations processed by mode and status",
+    ["mode", "status"],
+)
+BATCH_LANE_IN_FLIGHT = registry.gauge(
+    "batch_lane_in_flight",
+    "Batch conversations currently running on the background lane",
+)
+BATCH_LANE_WAIT = registry.histogram(
+    "batch_lane_wait_seconds",
+    "Time a batch conversation waited for a background lane slot",
+)
+
+
+class BackgroundLane:
+    """Concurrency-limited lane for batch work that yields to interactive traffic.
+
+    At most ``concurrency`` batch conversations run at once across all batch
+    requests, and a new one only starts while fewer than
+    ``interactive_high_water`` interactive requests are in flight.
+    """
+
+    def __init__(self, concurrency: int = 4, interactive_high_water: int = 8):
+        self.concurrency = concurrency
+        self.interactive_high_water = interactive_high_water
+        self.interactive_in_flight = 0
+        self.batch_in_flight = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._interactive_quiet = asyncio.Event()
+        self._interactive_quiet.set()
+
+    @contextlib.asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Mark an interactive request as in flight."""
+        self.interactive_in_flight += 1
+        if self.interactive_in_flight >= self.interactive_high_water:
+            self._interactive_quiet.clear()
+        try:
+            yield
+        finally:
+            self.interactive_in_flight -= 1
+            if self.interactive_in_flight < self.interactive_high_water:
+                self._interactive_quiet.set()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Run one batch conversation once a slot is free and traffic allows."""
+        started = time.perf_counter()
+        async with self._slots:
+            while not self._interactive_quiet.is_set():
+                await self._interactive_quiet.wait()
+            BATCH_LANE_WAIT.observe(time.perf_counter() - started)
+            self.batch_in_flight += 1
+            BATCH_LANE_IN_FLIGHT.set(self.batch_in_flight)
+            try:
+                yield
+            finally:
+                self.batch_in_flight -= 1
+                BATCH_LANE_IN_FLIGHT.set(self.batch_in_flight)
+
+
+class LocalBatchJobs:
+    """In-process stand-in for a provider's asynchronous batch API.
+
+    Jobs sit queued for ``queue_delay`` seconds, then run through the
+    provider's regular ``generate_response`` with small concurrency. Used for
+    providers without a native batch API and for offline testing.
+    """
+
+    def __init__(
+        self, queue_delay: float = 1.0, concurrency: int = 2, max_jobs: int = 100
+    ):
+        self.queue_delay = queue_delay
+        self.concurrency = concurrency
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BatchJobStatus]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def submit_batch(
+        self, provider: BaseLLMProvider, requests: List[BatchRequest]
+    ) -> str:
+        job_id = f"local-batch-{uuid.uuid4().hex[:12]}"
+        self._jobs[job_id] = BatchJobStatus(job_id, "pending")
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, provider, requests))
+        while len(self._jobs) > self.max_jobs:
+            old_id, _ = self._jobs.popitem(last=False)
+            task = self._tasks.pop(old_id, None)
+            if task is not None:
+                task.cancel()
+        return job_id
+
+    async def _run(
+        self, job_id: str, provider: BaseLLMProvider, requests: List[BatchRequest]
+    ) -> None:
+        await asyncio.sleep(self.queue_delay)
+        self._jobs[job_id].state = "running"
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(messages, config):
+            async with semaphore:
+                try:
+                    return await provider.generate_response(messages, None, config)
+                except Exception as e:
+                    return e
+
+        results = await asyncio.gather(
+            *(run_one(messages, config) for messages, config in requests)
+        )
+        self._jobs[job_id] = BatchJobStatus(job_id, "succeeded", results=list(results))
+        self._tasks.pop(job_id, None)
+
+    async def get_batch(self, job_id: str) -> BatchJobStatus:
+        status = self._jobs.get(job_id)
+        if status is None:
+            return BatchJobStatus(job_id, "failed", error="Unknown batch job")
+        return status
+
+
+async def wait_for_batch(
+    poll,
+    job_id: str,
+    poll_interval: float,
+    timeout: float,
+) -> AsyncIterator[BatchJobStatus]:
+    """Poll a batch job, yielding on every state change until it is done."""
+    deadline = time.monotonic() + timeout
+    last_state: Optional[str] = None
+    while True:
+        status = await poll(job_id)
+        if status.state != last_state:
+            last_state = status.state
+            yield status
+        if status.done:
+            return
+        if time.monotonic() >= deadline:
+            yield BatchJobStatus(job_id, "failed", error="Timed out waiting for batch")
+            return
+        await asyncio.sleep(poll_interval)
+
+
+# Global instances
+background_lane = BackgroundLane(
+    concurrency=settings.BATCH_LANE_CONCURRENCY,
+    interactive_high_water=settings.BATCH_INTERACTIVE_HIGH_WATER,
+)
+local_batch_jobs = LocalBatchJobs(queue_delay=settings.BATCH_LOCAL_QUEUE_DELAY_SECONDS)
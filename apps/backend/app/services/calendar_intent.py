@@ -0,0 +1,254 @@
+"""Calendar intent and time-window detection for user messages.
+
+Classifies a message as a calendar read ("what's on tomorrow?"), a calendar
+write ("add lunch with Sam on Friday") or neither, and resolves the time
+window it refers to. The window drives a speculative getEvents prefetch in
+the frontend while the model is still deciding on its tool call, so windows
+are deliberately generous: a whole day for "tonight", Monday to Monday for
+"this week".
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.services.metrics import registry
+from app.services.search_prefetch import WEB_SEARCH_PREFIX
+from app.services.user_locale import DEFAULT_TZ
+
+CALENDAR_INTENTS = registry.counter(
+    "calendar_intents_total",
+    "Calendar intents detected by kind and time window",
+    ["kind", "window"],
+)
+
+WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+READ_RE = re.compile(
+    r"\b("
+    r"what(?:'s| is| do i have| have i got)|whats"
+    r"|what am i (?:doing|up to)|am i (?:free|busy|available)"
+    r"|is there anything|do i have|have i got"
+    r"|show(?: me)?|list|check|any (?:meetings?|events?|plans?|appointments?)"
+    r"|how (?:busy|free)|when is|when's"
+    r")\b"
+)
+WRITE_RE = re.compile(
+    r"^(?:please |can you |could you |pls )?"
+    r"(add|create|book|schedule|set up|put|move|reschedule|cancel|delete|remove"
+    r"|rename|update|change)\b"
+)
+# What a write has to act on: "add milk to my list" and "change my password"
+# have a write verb but nothing to put in a calendar
+CALENDAR_OBJECT_RE = re.compile(
+    r"\b(calendar|events?|meetings?|appointments?|reminders?|calls?|standups?"
+    r"|syncs?|1:1s?|interviews?|bookings?|reservations?|focus (?:block|time)"
+    r"|(?:lunch|dinner|breakfast|coffee) with)\b"
+)
+CLOCK_TIME_RE = re.compile(
+    r"\b\d{1,2}(?::\d{2})? ?(?:am|pm)\b|\b\d{1,2}:\d{2}\b|\b(?:noon|midday)\b"
+)
+CALENDAR_NOUN_RE = re.compile(
+    r"\b(calendar|schedule|agenda|diary|events?|meetings?|appointments?|calls?"
+    r"|plans?|busy|free|(?:anything|something|what'?s) on)\b"
+)
+# Questions about the world rather than the user's calendar; left to webSearch
+NOT_CALENDAR_RE = re.compile(
+    r"\b(weather|forecast|temperature|rain|news|headlines|scores?|prices?"
+    r"|stocks?|exchange rate)\b"
+)
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """A half-open [start, end) window in the user's timezone."""
+
+    label: str
+    start: datetime
+    end: datetime
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "label": self.label,
+            "timeMin": self.start.isoformat(),
+            "timeMax": self.end.isoformat(),
+        }
+
+
+@dataclass(frozen=True)
+class CalendarIntent:
+    """Detected intent: ``kind`` is "read", "write" or "none"."""
+
+    kind: str
+    confidence: float
+    window: Optional[TimeWindow] = None
+
+    @property
+    def is_calendar(self) -> bool:
+        return self.kind != "none"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "confidence": self.confidence,
+            "window": self.window.to_dict() if self.window else None,
+        }
+
+
+NO_INTENT = CalendarIntent(kind="none", confidence=0.0)
+
+
+def midnight(day: date, tz: ZoneInfo = DEFAULT_TZ) -> datetime:
+    """The start of ``day`` in ``tz``."""
+    return datetime.combine(day, time(), tzinfo=tz)
+
+
+def day_window(
+    label: str, first: date, count: int, tz: ZoneInfo = DEFAULT_TZ
+) -> TimeWindow:
+    """``count`` whole days from midnight on ``first``."""
+    return TimeWindow(
+        label, midnight(first, tz), midnight(first + timedelta(days=count), tz)
+    )
+
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _weekday_window(match: re.Match, today: date, tz: ZoneInfo) -> TimeWindow:
+    qualifier, name = match.group(1), match.group(2)
+    ahead = (WEEKDAYS.index(name) - today.weekday()) % 7
+    upcoming = today + timedelta(days=ahead)
+    if qualifier == "next":
+        # "next friday" means this coming one to some people and the one after
+        # to others; cover both
+        first = upcoming if ahead else upcoming + timedelta(days=7)
+        return TimeWindow(
+            f"next {name}",
+            midnight(first, tz),
+            midnight(upcoming + timedelta(days=8), tz),
+        )
+    return day_window(name, upcoming, 1, tz)
+
+
+def _weekend_window(match: re.Match, today: date, tz: ZoneInfo) -> TimeWindow:
+    saturday = _monday(today) + timedelta(days=5)
+    if match.group(1) == "next":
+        saturday += timedelta(days=7)
+    return day_window(f"{match.group(1) or 'this'} weekend", saturday, 2, tz)
+
+
+def _month_window(match: re.Match, today: date, tz: ZoneInfo) -> TimeWindow:
+    first = today.replace(day=1)
+    if match.group(1) == "next":
+        first = (first + timedelta(days=32)).replace(day=1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return TimeWindow(
+        f"{match.group(1)} month", midnight(first, tz), midnight(following, tz)
+    )
+
+
+def _next_days_window(match: re.Match, today: date, tz: ZoneInfo) -> TimeWindow:
+    count = 3 if match.group(1) in ("few", "couple of") else int(match.group(1))
+    count = min(count, 31)
+    return day_window(f"next {count} days", today, count + 1, tz)
+
+
+WindowBuilder = Callable[[re.Match, date, ZoneInfo], TimeWindow]
+
+# Checked in order; the first match wins, so more specific phrases come first
+WINDOW_RULES: List[Tuple[re.Pattern, WindowBuilder]] = [
+    (
+        re.compile(r"\bday after tomorrow\b"),
+        lambda m, today, tz: day_window(
+            "day after tomorrow", today + timedelta(days=2), 1, tz
+        ),
+    ),
+    (
+        re.compile(r"\btomorrow\b|\btmrw?\b"),
+        lambda m, today, tz: day_window("tomorrow", today + timedelta(days=1), 1, tz),
+    ),
+    (
+        re.compile(r"\byesterday\b"),
+        lambda m, today, tz: day_window("yesterday", today - timedelta(days=1), 1, tz),
+    ),
+    (
+        re.compile(r"\b(?:today|tonight|this (?:morning|afternoon|evening))\b"),
+        lambda m, today, tz: day_window("today", today, 1, tz),
+    ),
+    (re.compile(r"\b(this|next)? ?weekend\b"), _weekend_window),
+    (
+        re.compile(r"\bnext week\b"),
+        lambda m, today, tz: day_window(
+            "next week", _monday(today) + timedelta(days=7), 7, tz
+        ),
+    ),
+    (
+        re.compile(r"\b(?:this|the) week\b|\brest of (?:the|this) week\b"),
+        lambda m, today, tz: day_window("this week", _monday(today), 7, tz),
+    ),
+    (re.compile(r"\b(this|next) month\b"), _month_window),
+    (re.compile(r"\bnext (few|couple of|\d{1,2}) days\b"), _next_days_window),
+    (
+        re.compile(r"\b(?:(this|next|on) )?(" + "|".join(WEEKDAYS) + r")\b"),
+        _weekday_window,
+    ),
+]
+
+
+def detect_time_window(
+    message: str, now: Optional[datetime] = None, tz: ZoneInfo = DEFAULT_TZ
+) -> Optional[TimeWindow]:
+    """The time window a message refers to, in the user's timezone, if any."""
+    text = message.lower()
+    today = (now or datetime.now(tz)).astimezone(tz).date()
+    for pattern, build in WINDOW_RULES:
+        match = pattern.search(text)
+        if match:
+            return build(match, today, tz)
+    return None
+
+
+def classify_calendar_intent(
+    message: str, now: Optional[datetime] = None, tz: ZoneInfo = DEFAULT_TZ
+) -> CalendarIntent:
+    """Classify a message as a calendar read, write or neither, unrecorded."""
+    if message.startswith(WEB_SEARCH_PREFIX):
+        return NO_INTENT
+    text = " ".join(message.lower().split())
+    window = detect_time_window(text, now, tz)
+
+    if WRITE_RE.search(text) and (
+        CALENDAR_OBJECT_RE.search(text) or window or CLOCK_TIME_RE.search(text)
+    ):
+        return CalendarIntent("write", 0.8, window)
+    if NOT_CALENDAR_RE.search(text):
+        return NO_INTENT
+    if READ_RE.search(text) and (window or CALENDAR_NOUN_RE.search(text)):
+        return CalendarIntent("read", 0.9 if window else 0.6, window)
+    if window and CALENDAR_NOUN_RE.search(text):
+        # "meetings tomorrow?", "anything on friday"
+        return CalendarIntent("read", 0.7, window)
+    return NO_INTENT
+
+
+def detect_calendar_intent(
+    message: str, now: Optional[datetime] = None, tz: ZoneInfo = DEFAULT_TZ
+) -> CalendarIntent:
+    """Classify a message as a calendar read, write or neither."""
+    intent = classify_calendar_intent(message, now, tz)
+    CALENDAR_INTENTS.inc(
+        kind=intent.kind, window=intent.window.label if intent.window else "none"
+    )
+    return intent
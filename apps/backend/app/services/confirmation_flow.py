@@ -0,0 +1,239 @@
+"""The event confirmation loop as a state machine over the last card.
+
+The system prompt describes the confirm/modify/cancel protocol in prose, but
+once a confirmation card is open the answers to its three replies follow
+from the card alone:
+
+- "confirm" (exactly, right after a card) → handleEventConfirmation(
+  action="confirm") with the card's details,
+- "I modified the event with these details:" plus a card → handleEventConfirmation(
+  action="modify") with that card, fields it leaves out taken from the last
+  card,
+- "cancel" / "no" / "nevermind" right after a card → a short
+  acknowledgement, no tool call.
+
+``answer_turn`` returns that answer without calling the model. Anything
+else, or a card whose date and time can't be read exactly, returns None and
+the turn goes to the model as before.
+
+A card's "Date & Time" is read only as RFC 3339 with a UTC offset, which is
+how the prompt asks the model to write it and how the frontend stores its
+own cards and edit form; the chat page renders it in the user's timezone.
+Display text such as "Tue 21 Oct, 2:00 pm" is never parsed back: it doesn't
+say which timezone it was rendered in.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import fast_json
+from app.services.base_provider import LLMMessage, new_tool_call_id
+from app.services.generation_policy import CONFIRM_TEXT, MODIFY_PREFIX
+from app.services.metrics import registry
+from app.services.prompt_scope import CARD_MARKERS
+from app.services.tool_schemas import (
+    DEFAULT_DURATION,
+    DEFAULT_TITLE,
+    tool_call_errors,
+)
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+CONFIRMATION_TURNS = registry.counter(
+    "confirmation_flow_turns_total",
+    "User turns by how the confirmation loop answered them "
+    "(confirm, modify, cancel, or model when it left them to the model)",
+    ["outcome"],
+)
+
+# The chat page sends its edit form as "modify the event with these
+# details:" and stores it as the prompt's "I modified ..." wording
+MODIFY_PREFIXES = (MODIFY_PREFIX.lower(), "modify the event with these details:")
+
+CANCEL_RE = re.compile(
+    r"^(?:cancel|no|nope|nevermind|never mind)(?:,? (?:thanks|thank you))?[\s!.]*$"
+)
+CANCEL_REPLY = (
+    "No problem, I've discarded that event. Is there anything else I can help you with?"
+)
+
+# Card label -> eventDetails key; "when" is split into start and end
+CARD_FIELDS = {
+    "Title": "summary",
+    "Date & Time": "when",
+    "Location": "location",
+    "Description": "description",
+}
+CARD_FIELD_RE = re.compile(
+    r"^\s*\*\*(Title|Date & Time|Location|Description):\*\*\s*(.*?)\s*$"
+)
+CARD_BLOCK_RE = re.compile(r"<event_confirmation>(.*?)</event_confirmation>", re.S)
+# Placeholders the frontend writes for an empty field
+EMPTY_VALUES = frozenset({"", "none", "tbd"})
+
+RANGE_SEPARATORS = (" - ", " – ", " — ", " to ")
+
+
+@dataclass(frozen=True)
+class ConfirmationTurn:
+    """The answer to one turn of the loop."""
+
+    outcome: str
+    content: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def parse_card(text: str) -> Optional[Dict[str, str]]:
+    """Card label -> value, or None if ``text`` is more than a card.
+
+    Only the ``<event_confirmation>`` block is read when there is one. Any
+    other line, or a label given twice, leaves the card to the model: it may
+    be a multi-line description or prose around the card.
+    """
+    block = CARD_BLOCK_RE.search(text)
+    if block:
+        text = block.group(1)
+    fields: Dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = CARD_FIELD_RE.match(line)
+        if match is None or match[1] in fields:
+            return None
+        fields[match[1]] = match[2]
+    return fields
+
+
+def parse_card_time(text: str) -> Optional[datetime]:
+    """One side of a card's "[Start] - [End]", or None without an offset.
+
+    Only RFC 3339 with a UTC offset is read: a wall time alone doesn't say
+    which timezone the card was rendered in.
+    """
+    try:
+        parsed = datetime.fromisoformat(text.strip().upper())
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else None
+
+
+def parse_when(text: str) -> Optional[Tuple[datetime, datetime]]:
+    """Start and end of a card's "Date & Time", or None if it isn't exact."""
+    for separator in RANGE_SEPARATORS:
+        start_text, found, end_text = text.partition(separator)
+        if found:
+            break
+    else:
+        start_text, end_text = text, ""
+    start = parse_card_time(start_text)
+    if start is None:
+        return None
+    if end_text.strip().lower() in EMPTY_VALUES:
+        return start, start + DEFAULT_DURATION
+    end = parse_card_time(end_text)
+    if end is None or end <= start:
+        return None
+    return start, end
+
+
+def event_details(
+    fields: Dict[str, str], locale: UserLocale
+) -> Optional[Dict[str, Any]]:
+    """handleEventConfirmation eventDetails for a card, or None."""
+    when = parse_when(fields.get("Date & Time", ""))
+    if when is None:
+        return None
+    details: Dict[str, Any] = {
+        "summary": fields.get("Title", "").strip() or DEFAULT_TITLE,
+    }
+    for key, value in zip(("start", "end"), when):
+        details[key] = {
+            "dateTime": value.isoformat(timespec="seconds"),
+            "timeZone": locale.timezone,
+        }
+    for label in ("Location", "Description"):
+        value = fields.get(label, "").strip()
+        if value.lower() not in EMPTY_VALUES:
+            details[CARD_FIELDS[label]] = value
+    return details
+
+
+def _last_card(messages: List[LLMMessage]) -> Tuple[Optional[Dict[str, str]], bool]:
+    """The most recent assistant card and whether it was the last reply.
+
+    The card is ``{}`` when there is none and None when it can't be read.
+    """
+    latest = True
+    for msg in reversed(messages):
+        if msg.role != "assistant":
+            continue
+        if all(marker in msg.content for marker in CARD_MARKERS):
+            return parse_card(msg.content), latest
+        # Tool-call rounds carry no text; they don't close the card
+        if msg.content.strip():
+            latest = False
+    return {}, False
+
+
+def _confirmation_call(action: str, details: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": new_tool_call_id("confirmation"),
+        "type": "function",
+        "function": {
+            "name": "handleEventConfirmation",
+            "arguments": fast_json.dumps_str(
+                {"action": action, "eventDetails": details}
+            ),
+        },
+    }
+
+
+def _decide(
+    messages: List[LLMMessage], locale: UserLocale
+) -> Optional[ConfirmationTurn]:
+    text = messages[-1].content.strip()
+    lowered = text.lower()
+    card, card_is_open = _last_card(messages[:-1])
+
+    if lowered == CONFIRM_TEXT:
+        # The hard guard: only a card that was the last reply can be confirmed
+        if not card or not card_is_open:
+            return None
+        details = event_details(card, locale)
+        if details is None:
+            return None
+        return ConfirmationTurn("confirm", "", [_confirmation_call("confirm", details)])
+
+    if CANCEL_RE.match(" ".join(lowered.split())):
+        if not card or not card_is_open:
+            return None
+        return ConfirmationTurn("cancel", CANCEL_REPLY)
+
+    prefix = next((p for p in MODIFY_PREFIXES if lowered.startswith(p)), None)
+    if prefix is None:
+        return None
+    changes = parse_card(text[len(prefix) :])
+    # Without a readable last card, unspecified fields have nothing to inherit
+    if not changes or card is None:
+        return None
+    details = event_details({**card, **changes}, locale)
+    if details is None:
+        return None
+    return ConfirmationTurn("modify", "", [_confirmation_call("modify", details)])
+
+
+def answer_turn(
+    messages: List[LLMMessage], locale: UserLocale = DEFAULT_LOCALE
+) -> Optional[ConfirmationTurn]:
+    """The loop's answer to the latest user message, or None for the model."""
+    if not messages or messages[-1].role != "user":
+        return None
+    turn = _decide(messages, locale)
+    if turn is not None and any(map(tool_call_errors, turn.tool_calls)):
+        print(f"🔍 DEBUG: Confirmation flow built an invalid call: {turn.tool_calls}")
+        turn = None
+    CONFIRMATION_TURNS.inc(outcome=turn.outcome if turn else "model")
+    if turn is not None:
+        print(f"🔍 DEBUG: Confirmation flow answered without the model: {turn.outcome}")
+    return turn
@@ -0,0 +1,177 @@
+"""Schema-aware slimming of getEvents tool results before they reach the model.
+
+Calendar results come back from the frontend as JSON. Raw Google Calendar
+events carry etags, HTML links, creator/organizer blocks, reminders,
+conference data and more. None of that helps the model answer "what's on
+tomorrow?", but all of it is prompt tokens. Each event is reduced to one line
+with its ID, compact times in the user's timezone, title, location and
+attendee count. Lists beyond ``max_events`` end with a summary line.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core import fast_json
+from app.services.agenda_digest import parse_event_time
+from app.services.base_provider import LLMMessage
+from app.services.metrics import registry
+from app.services.search_compaction import estimate_tokens
+from app.services.user_locale import DEFAULT_TZ
+
+TOOL_RESULT_TOKENS = registry.histogram(
+    "tool_result_tokens",
+    "Estimated tokens of frontend tool results by tool and stage (raw/slim)",
+    ["tool", "stage"],
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000),
+)
+
+EVENTS_TOOL = "getEvents"
+
+
+def _day(moment: datetime) -> str:
+    return moment.strftime("%a %-d %b")
+
+
+def _clock(moment: datetime) -> str:
+    return moment.strftime("%H:%M")
+
+
+def format_event_time(start: datetime, end: Optional[datetime], all_day: bool) -> str:
+    """Compact local time: "Mon 20 Oct 10:00-11:00", "Mon 20 Oct (all day)"."""
+    if all_day:
+        if end is None or (end - start).days <= 1:
+            return f"{_day(start)} (all day)"
+        last = end - timedelta(days=1)
+        return f"{_day(start)}–{_day(last)} (all day)"
+    if end is None:
+        return f"{_day(start)} {_clock(start)}"
+    if end.date() == start.date():
+        return f"{_day(start)} {_clock(start)}-{_clock(end)}"
+    return f"{_day(start)} {_clock(start)} – {_day(end)} {_clock(end)}"
+
+
+def slim_event(
+    event: Dict[str, Any], tz: ZoneInfo = DEFAULT_TZ
+) -> Optional[Tuple[datetime, str]]:
+    """(start, one-line summary) for a raw or pre-formatted event."""
+    start, all_day = parse_event_time(event.get("start"), tz)
+    if start is None:
+        return None
+    end, _ = parse_event_time(event.get("end"), tz)
+    parts = [
+        f"id={event.get('id', '?')}",
+        format_event_time(start, end, all_day),
+        " ".join((event.get("summary") or "No title").split()),
+    ]
+    if event.get("location"):
+        parts.append(f"@ {' '.join(str(event['location']).split())}")
+    attendees = event.get("attendees")
+    count = (
+        len(attendees) if isinstance(attendees, list) else event.get("attendeeCount")
+    )
+    if count:
+        parts.append(f"{count} attendee{'s' if count != 1 else ''}")
+    if event.get("status") == "cancelled":
+        parts.append("cancelled")
+    return start, " | ".join(parts)
+
+
+def _events_from_payload(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    if isinstance(payload, dict):
+        payload = payload.get("events", payload.get("items"))
+    if not isinstance(payload, list):
+        return None
+    if not all(isinstance(e, dict) and "start" in e for e in payload):
+        return None
+    return payload
+
+
+def slim_events_content(
+    content: str, max_events: int = 30, tz: ZoneInfo = DEFAULT_TZ
+) -> Optional[str]:
+    """Slim text for a getEvents result body, or None if it isn't one."""
+    try:
+        payload = fast_json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    events = _events_from_payload(payload)
+    if events is None:
+        return None
+    if not events:
+        return "0 events"
+
+    slimmed = sorted(
+        (line for line in (slim_event(e, tz) for e in events) if line is not None),
+        key=lambda item: item[0],
+    )
+    total = len(slimmed)
+    lines = [f"{total} event{'s' if total != 1 else ''} ({tz.key} times):"]
+    lines += [line for _, line in slimmed[:max_events]]
+    if total > max_events:
+        rest = slimmed[max_events:]
+        lines.append(
+            f"... {len(rest)} more between {_day(rest[0][0])} and "
+            f"{_day(rest[-1][0])} not shown; call getEvents with a narrower "
+            f"time range to see them"
+        )
+    return "\n".join(lines)
+
+
+def slim_tool_results(
+    messages: List[LLMMessage], max_events: int = 30, tz: ZoneInfo = DEFAULT_TZ
+) -> Tuple[List[LLMMessage], Dict[str, int]]:
+    """Replace getEvents result bodies in tool messages with slim text.
+
+    Results are matched to their calls by ``tool_call_id``; results without a
+    known call are slimmed only if their content has the events schema.
+    Returns the new messages and raw/slim token totals.
+    """
+    calls_by_id = {
+        call.get("id"): call
+        for msg in messages
+        if msg.role == "assistant"
+        for call in msg.tool_calls or []
+    }
+    stats = {"results": 0, "raw_tokens": 0, "slim_tokens": 0}
+    slimmed_messages = []
+    for msg in messages:
+        if msg.role != "tool":
+            slimmed_messages.append(msg)
+            continue
+        if msg.tool_results is None:
+            slimmed_messages.append(msg)
+            continue
+
+        # The parsed payload is shared with the original message; copy it
+        results = [dict(result) for result in msg.tool_results]
+        changed = False
+        for result in results:
+            if not result.get("success", True):
+                continue
+            call = calls_by_id.get(result.get("tool_call_id"))
+            name = call.get("function", {}).get("name") if call else None
+            if name not in (EVENTS_TOOL, None):
+                continue
+            content = result.get("content")
+            slim = slim_events_content(content, max_events, tz) if content else None
+            if slim is None:
+                continue
+            raw_tokens, slim_tokens = estimate_tokens(content), estimate_tokens(slim)
+            TOOL_RESULT_TOKENS.observe(raw_tokens, tool=EVENTS_TOOL, stage="raw")
+            TOOL_RESULT_TOKENS.observe(slim_tokens, tool=EVENTS_TOOL, stage="slim")
+            stats["results"] += 1
+            stats["raw_tokens"] += raw_tokens
+            stats["slim_tokens"] += slim_tokens
+            result["content"] = slim
+            changed = True
+
+        if changed:
+            msg = LLMMessage(
+                role=msg.role,
+                content=fast_json.dumps_str(results),
+                tool_calls=msg.tool_calls,
+                tool_results=results,
+            )
+        slimmed_messages.append(msg)
+    return slimmed_messages, stats
@@ -0,0 +1,269 @@
+"""Deterministic scripted LLM provider for offline runs and benchmarks."""
+
+import asyncio
+import itertools
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.base_provider import (
+    BaseLLMProvider,
+    LLMMessage,
+    LLMResponse,
+    LLMStreamChunk,
+)
+from app.services.gemini_provider import classify_gemini_error
+from app.services.metrics import LLM_CALL_LATENCY, LLM_ERRORS, Timer, observe_llm_usage
+
+# Raw upstream errors the fake raises; they go through the same error mapping
+# as real Gemini errors so the endpoint sees identical messages.
+FAULT_ERRORS = {
+    "429": "429 RESOURCE_EXHAUSTED. Quota exceeded for requests per minute.",
+    "503": "503 UNAVAILABLE. The model is overloaded. Please try again later.",
+    "timeout": "Request timed out waiting for the model.",
+}
+
+
+@dataclass
+class ScriptedTurn:
+    """One canned model answer, optionally selected by a substring match."""
+
+    content: str = ""
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    # Case-insensitive substring matched against the last non-system message
+    match: Optional[str] = None
+    # Restrict the match to messages with this role ("user", "tool", ...)
+    role: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScriptedTurn":
+        return cls(
+            content=data.get("content", ""),
+            tool_calls=data.get("tool_calls", []),
+            match=data.get("match"),
+            role=data.get("role"),
+        )
+
+    def matches(self, message: Optional[LLMMessage]) -> bool:
+        if self.match is None or message is None:
+            return False
+        if self.role and message.role != self.role:
+            return False
+        return self.match.lower() in message.content.lower()
+
+
+# Default script covering the calendar conversation shapes the app produces
+DEFAULT_SCRIPT = [
+    ScriptedTurn(
+        match="web search results",
+        role="tool",
+        content="Here is what I found. Create an event from this?",
+    ),
+    ScriptedTurn(
+        match="tool_call_id",
+        role="tool",
+        content="Here are your events. Want me to help you with anything else?",
+    ),
+    ScriptedTurn(
+        match="web search:",
+        role="user",
+        tool_calls=[{"name": "webSearch", "arguments": {"query": "latest results"}}],
+    ),
+    ScriptedTurn(
+        match="add ",
+        role="user",
+        tool_calls=[
+            {
+                "name": "handleEventConfirmation",
+                "arguments": {
+                    "action": "modify",
+                    "eventDetails": {
+                        "summary": "Meeting",
+                        "start": {
+                            "dateTime": "2025-10-21T14:00:00+11:00",
+                            "timeZone": "Australia/Sydney",
+                        },
+                        "end": {
+                            "dateTime": "2025-10-21T15:00:00+11:00",
+                            "timeZone": "Australia/Sydney",
+                        },
+                    },
+                },
+            }
+        ],
+    ),
+    ScriptedTurn(
+        match="calendar",
+        role="user",
+        tool_calls=[
+            {
+                "name": "getEvents",
+                "arguments": {
+                    "timeMin": "2025-10-21T00:00:00+11:00",
+                    "timeMax": "2025-10-22T00:00:00+11:00",
+                },
+            }
+        ],
+    ),
+    ScriptedTurn(content="Hi! I'm Calendara. How can I help with your schedule?"),
+]
+
+
+class FaultSchedule:
+    """Cyclic, deterministic fault pattern such as ``"ok,ok,429,ok,503,timeout"``."""
+
+    def __init__(self, pattern: str = ""):
+        steps = [step.strip() for step in pattern.split(",") if step.strip()]
+        unknown = [step for step in steps if step != "ok" and step not in FAULT_ERRORS]
+        if unknown:
+            raise ValueError(f"Unknown fault kinds in schedule: {unknown}")
+        self.steps = steps or ["ok"]
+
+    def fault_for(self, call_index: int) -> Optional[str]:
+        step = self.steps[call_index % len(self.steps)]
+        return None if step == "ok" else step
+
+
+class FakeScript:
+    """Shared replay state; one instance backs every FakeProvider of a service."""
+
+    def __init__(
+        self,
+        turns: Optional[List[ScriptedTurn]] = None,
+        faults: Optional[FaultSchedule] = None,
+        latency_ms: float = 0.0,
+        timeout_ms: float = 2000.0,
+        stream_chunk_chars: int = 16,
+        stream_chunk_ms: float = 0.0,
+    ):
+        self.turns = turns if turns is not None else list(DEFAULT_SCRIPT)
+        self.faults = faults or FaultSchedule()
+        self.latency_ms = latency_ms
+        self.timeout_ms = timeout_ms
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_ms = stream_chunk_ms
+        self._calls = itertools.count()
+        self._lock = threading.Lock()
+        self._fallback_index = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "FakeScript":
+        """Load turns from a JSON file: a list of ScriptedTurn dicts."""
+        with open(path) as fh:
+            data = json.load(fh)
+        return cls(turns=[ScriptedTurn.from_dict(item) for item in data], **kwargs)
+
+    def next_call_index(self) -> int:
+        with self._lock:
+            return next(self._calls)
+
+    def pick_turn(self, messages: List[LLMMessage]) -> ScriptedTurn:
+        """Pick the first matching turn, else replay unmatched turns in order."""
+        last = next((m for m in reversed(messages) if m.role != "system"), None)
+        for turn in self.turns:
+            if turn.matches(last):
+                return turn
+        fallbacks = [turn for turn in self.turns if turn.match is None]
+        if not fallbacks:
+            return ScriptedTurn(content="")
+        with self._lock:
+            turn = fallbacks[self._fallback_index % len(fallbacks)]
+            self._fallback_index += 1
+        return turn
+
+
+class FakeProvider(BaseLLMProvider):
+    """Replays a FakeScript with optional latency and scheduled faults."""
+
+    name = "fake"
+
+    def __init__(self, script: FakeScript, model: str = "fake-model"):
+        super().__init__(None, model)
+        self.script = script
+
+    async def _apply_schedule(self, call_index: int, timer: Timer) -> None:
+        if self.script.latency_ms:
+            await asyncio.sleep(self.script.latency_ms / 1000.0)
+        fault = self.script.faults.fault_for(call_index)
+        if fault is None:
+            return
+        if fault == "timeout":
+            await asyncio.sleep(self.script.timeout_ms / 1000.0)
+        error_class, message = classify_gemini_error(FAULT_ERRORS[fault])
+        LLM_CALL_LATENCY.observe(
+            timer.elapsed(), provider=self.name, model=self.model, outcome="error"
+        )
+        LLM_ERRORS.inc(provider=self.name, error_class=error_class)
+        raise Exception(message)
+
+    def _build_response(
+        self, call_index: int, turn: ScriptedTurn, messages: List[LLMMessage]
+    ) -> LLMResponse:
+        tool_calls = [
+            {
+                "id": f"fake-{call_index}-{i}",
+                "type": "function",
+                "function": {
+                    "name": call["name"],
+                    "arguments": json.dumps(call.get("arguments", {})),
+                },
+            }
+            for i, call in enumerate(turn.tool_calls)
+        ]
+        prompt_chars = sum(len(m.content or "") for m in messages)
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(turn.content) // 4,
+            "total_tokens": (prompt_chars + len(turn.content)) // 4,
+        }
+        return LLMResponse(
+            content=turn.content,
+            provider=self.name,
+            model=self.model,
+            usage=usage,
+            tool_calls=tool_calls,
+        )
+
+    async def generate_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Any] = None,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        """Return the next scripted response."""
+        timer = Timer()
+        call_index = self.script.next_call_index()
+        await self._apply_schedule(call_index, timer)
+        response = self._build_response(
+            call_index, self.script.pick_turn(messages), messages
+        )
+        LLM_CALL_LATENCY.observe(
+            timer.elapsed(), provider=self.name, model=self.model, outcome="ok"
+        )
+        observe_llm_usage(self.name, self.model, response.usage)
+        return response
+
+    async def stream_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Any] = None,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream the scripted content in fixed-size chunks."""
+        timer = Timer()
+        call_index = self.script.next_call_index()
+        await self._apply_schedule(call_index, timer)
+        response = self._build_response(
+            call_index, self.script.pick_turn(messages), messages
+        )
+        size = max(1, self.script.stream_chunk_chars)
+        for start in range(0, len(response.content), size):
+            if self.script.stream_chunk_ms:
+                await asyncio.sleep(self.script.stream_chunk_ms / 1000.0)
+            yield LLMStreamChunk(response.content[start : start + size])
+        LLM_CALL_LATENCY.observe(
+            timer.elapsed(), provider=self.name, model=self.model, outcome="ok"
+        )
+        yield LLMStreamChunk("", done=True, response=response)
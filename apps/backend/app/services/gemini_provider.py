@@ -3,192 +3,332 @@
 import json
 import asyncio
 import warnings
-from typing import List, Optional, Dict, Any
-import google.genai as genai
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 
+from app.services.base_provider import (
+    BaseLLMProvider,
+    BatchJobStatus,
+    BatchRequest,
+    LLMMessage,
+    LLMResponse,
+    classify_provider_error,
+    format_tool_results,
+    new_tool_call_id,
+)
+from app.services.deadlines import time_left
+from app.services.lazy_imports import LazyModule
+from app.services.metrics import (
+    LLM_CALL_LATENCY,
+    LLM_ERRORS,
+    Timer,
+    observe_llm_usage,
+)
+
+if TYPE_CHECKING:
+    from app.services.generation_policy import GenerationPolicy
+
+genai = LazyModule("google.genai")
 
 # Suppress warnings from Google Gen AI SDK about non-text parts
 warnings.filterwarnings("ignore", message=".*non-text parts.*", category=UserWarning)
 
 
-class LLMMessage:
-    """Message structure for LLM requests."""
+def classify_gemini_error(error_str: str) -> Tuple[str, str]:
+    """Map a raw Gemini error to an error class and a user-friendly message."""
+    return classify_provider_error(error_str, "Gemini")
 
-    def __init__(
-        self, role: str, content: str, tool_calls: Optional[List[Dict[str, Any]]] = None
-    ):
-        self.role = role
-        self.content = content
-        self.tool_calls = tool_calls
 
+# Gemini batch job states mapped onto BatchJobStatus states
+GEMINI_BATCH_STATES = {
+    "JOB_STATE_QUEUED": "pending",
+    "JOB_STATE_PENDING": "pending",
+    "JOB_STATE_RUNNING": "running",
+    "JOB_STATE_UPDATING": "running",
+    "JOB_STATE_PAUSED": "running",
+    "JOB_STATE_SUCCEEDED": "succeeded",
+    "JOB_STATE_PARTIALLY_SUCCEEDED": "succeeded",
+    "JOB_STATE_FAILED": "failed",
+    "JOB_STATE_EXPIRED": "failed",
+    "JOB_STATE_CANCELLING": "cancelled",
+    "JOB_STATE_CANCELLED": "cancelled",
+}
 
-class LLMResponse:
-    """Response structure from LLM providers."""
 
-    def __init__(
-        self,
-        content: str,
-        provider: str,
-        model: str,
-        usage: Optional[Dict[str, Any]] = None,
-        tool_calls: Optional[List[Dict[str, Any]]] = None,
-    ):
-        self.content = content
-        self.provider = provider
-        self.model = model
-        self.usage = usage or {}
-        self.tool_calls = tool_calls or []
-
-
-class GeminiProvider:
+def extract_gemini_usage(response: Any) -> Dict[str, Any]:
+    """Extract token counts from a Gemini response's usage metadata."""
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(metadata, "prompt_token_count", None),
+        "completion_tokens": getattr(metadata, "candidates_token_count", None),
+        "total_tokens": getattr(metadata, "total_token_count", None),
+    }
+
+
+class GeminiProvider(BaseLLMProvider):
     """
     Gemini provider using the Google Gen AI SDK.
     """
 
+    name = "gemini"
+    sdk = genai
+    supports_batch = True
+
     def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
-        self.api_key = api_key
-        self.model = model
-        self.client = genai.Client(api_key=api_key)
+        super().__init__(api_key, model)
+
+    def create_client(self) -> Any:
+        return genai.Client(api_key=self.api_key)
+
+    def build_generation_config(
+        self, tools: Optional[List[Dict[str, Any]]]
+    ) -> "genai.types.GenerateContentConfig":
+        """Build the Gemini generation config, with tools if provided."""
+        config = genai.types.GenerateContentConfig(
+            max_output_tokens=1000,
+            temperature=0.6,
+            thinking_config=genai.types.ThinkingConfig(thinking_budget=0),
+        )
+
+        # Add tools if provided (already formatted for Gemini in tools.py)
+        if tools:
+            config.tools = [{"function_declarations": tools}]
+        return config
+
+    @staticmethod
+    def clone_generation_config(
+        config: "genai.types.GenerateContentConfig",
+    ) -> "genai.types.GenerateContentConfig":
+        return config.model_copy()
+
+    def apply_generation_policy(
+        self, config: "genai.types.GenerateContentConfig", policy: "GenerationPolicy"
+    ) -> "genai.types.GenerateContentConfig":
+        config.max_output_tokens = policy.max_output_tokens
+        config.temperature = policy.temperature
+        config.thinking_config = genai.types.ThinkingConfig(
+            thinking_budget=policy.thinking_budget
+        )
+        return config
+
+    @staticmethod
+    def build_prompt(messages: List[LLMMessage]) -> str:
+        """Flatten messages into the single "Role: content" prompt Gemini gets."""
+        prompt_parts = []
+        calls_by_id = {}
+        for msg in messages:
+            if msg.role == "system":
+                prompt_parts.append(f"System: {msg.content}")
+            elif msg.role == "user":
+                prompt_parts.append(f"User: {msg.content}")
+            elif msg.role == "assistant":
+                if msg.tool_calls:
+                    calls_by_id.update(
+                        {call.get("id", ""): call for call in msg.tool_calls}
+                    )
+                    prompt_parts.append(
+                        f"Assistant: {msg.content} [Tool calls: {msg.tool_calls}]"
+                    )
+                else:
+                    prompt_parts.append(f"Assistant: {msg.content}")
+            elif msg.role == "tool":
+                # One line per result, labelled with the call it answers
+                for line in format_tool_results(msg, calls_by_id):
+                    prompt_parts.append(f"Tool: {line}")
+
+        return "\n\n".join(prompt_parts)
+
+    @staticmethod
+    def parse_response(response: Any) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extract text content and tool calls from a Gemini response."""
+        # Extract content and tool calls manually to avoid warnings
+        content = ""
+        tool_calls = []
+
+        print(f"🔍 DEBUG: Response type: {type(response)}")
+        print(f"🔍 DEBUG: Response attributes: {dir(response)}")
+
+        if hasattr(response, "candidates") and response.candidates:
+            print(f"🔍 DEBUG: Number of candidates: {len(response.candidates)}")
+            for i, candidate in enumerate(response.candidates):
+                print(f"🔍 DEBUG: Candidate {i} type: {type(candidate)}")
+                print(f"🔍 DEBUG: Candidate {i} attributes: {dir(candidate)}")
+
+                if (
+                    hasattr(candidate, "content")
+                    and candidate.content
+                    and hasattr(candidate.content, "parts")
+                    and candidate.content.parts
+                ):
+                    print(
+                        f"🔍 DEBUG: Candidate {i} has {len(candidate.content.parts)} parts"
+                    )
+                    for j, part in enumerate(candidate.content.parts):
+                        print(f"🔍 DEBUG: Part {j} type: {type(part)}")
+                        print(f"🔍 DEBUG: Part {j} attributes: {dir(part)}")
+
+                        # Extract text content only
+                        if hasattr(part, "text") and part.text:
+                            content += part.text
+                            print(
+                                f"🔍 DEBUG: Added text content: '{part.text[:100]}...'"
+                            )
+                        # Extract function calls
+                        elif (
+                            hasattr(part, "function_call")
+                            and part.function_call is not None
+                        ):
+                            json_args = json.dumps(part.function_call.args or {})
+                            # Keep Gemini's own call ID when it sends one;
+                            # otherwise mint a unique one so repeated calls
+                            # to the same tool in a turn don't collide
+                            call_id = getattr(
+                                part.function_call, "id", None
+                            ) or new_tool_call_id("gemini")
+                            tool_call = {
+                                "id": call_id,
+                                "type": "function",
+                                "function": {
+                                    "name": part.function_call.name,
+                                    "arguments": json_args,
+                                },
+                            }
+                            tool_calls.append(tool_call)
+                            print(
+                                f"🔍 DEBUG: Added function call: {part.function_call.name} with args: {json_args}"
+                            )
+                        # Skip any other non-text parts to avoid warnings
+                        else:
+                            print(
+                                f"🔍 DEBUG: Skipping part {j} - neither text nor function_call"
+                            )
+                            pass
+                else:
+                    print(f"🔍 DEBUG: Candidate {i} has no content or parts")
+        else:
+            print("🔍 DEBUG: No candidates in response")
+
+        print(f"🔍 DEBUG: Final content: '{content[:200]}...'")
+        print(f"🔍 DEBUG: Final tool_calls: {tool_calls}")
+        print(f"🔍 DEBUG: Number of tool calls: {len(tool_calls)}")
+
+        return content, tool_calls
 
     async def generate_response(
-        self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional["genai.types.GenerateContentConfig"] = None,
+        deadline: Optional[float] = None,
     ) -> LLMResponse:
         """Generate response using Gemini."""
+        timer = Timer()
         try:
-            # Convert messages to Gemini format
-            prompt_parts = []
-            for msg in messages:
-                if msg.role == "system":
-                    prompt_parts.append(f"System: {msg.content}")
-                elif msg.role == "user":
-                    prompt_parts.append(f"User: {msg.content}")
-                elif msg.role == "assistant":
-                    if msg.tool_calls:
-                        prompt_parts.append(
-                            f"Assistant: {msg.content} [Tool calls: {msg.tool_calls}]"
-                        )
-                    else:
-                        prompt_parts.append(f"Assistant: {msg.content}")
-                elif msg.role == "tool":
-                    prompt_parts.append(f"Tool: {msg.content}")
-
-            prompt = "\n\n".join(prompt_parts)
-
-            # Prepare generation config
-            config = genai.types.GenerateContentConfig(
-                max_output_tokens=1000,
-                temperature=0.6,
-                thinking_config=genai.types.ThinkingConfig(thinking_budget=0),
-            )
+            prompt = self.build_prompt(messages)
 
-            # Add tools if provided (already formatted for Gemini in tools.py)
-            if tools:
-                config.tools = [{"function_declarations": tools}]
+            # Prepare generation config unless a template clone was passed in
+            if config is None:
+                config = self.build_generation_config(tools)
+            timeout = time_left(deadline)
+            if timeout is not None:
+                # Milliseconds; the SDK has no timeout of its own
+                config.http_options = genai.types.HttpOptions(
+                    timeout=max(1, int(timeout * 1000))
+                )
 
-            # Use the google-genai client to generate content (synchronous call)
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.models.generate_content(
-                    model=self.model,
-                    contents=prompt,
-                    config=config,
-                ),
+            # The async client holds no executor thread, and cancelling this
+            # coroutine (client disconnect) aborts the HTTP request
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=config,
             )
 
-            # Extract content and tool calls manually to avoid warnings
-            content = ""
-            tool_calls = []
-
-            print(f"🔍 DEBUG: Response type: {type(response)}")
-            print(f"🔍 DEBUG: Response attributes: {dir(response)}")
-
-            if hasattr(response, "candidates") and response.candidates:
-                print(f"🔍 DEBUG: Number of candidates: {len(response.candidates)}")
-                for i, candidate in enumerate(response.candidates):
-                    print(f"🔍 DEBUG: Candidate {i} type: {type(candidate)}")
-                    print(f"🔍 DEBUG: Candidate {i} attributes: {dir(candidate)}")
-
-                    if (
-                        hasattr(candidate, "content")
-                        and candidate.content
-                        and hasattr(candidate.content, "parts")
-                        and candidate.content.parts
-                    ):
-                        print(
-                            f"🔍 DEBUG: Candidate {i} has {len(candidate.content.parts)} parts"
-                        )
-                        for j, part in enumerate(candidate.content.parts):
-                            print(f"🔍 DEBUG: Part {j} type: {type(part)}")
-                            print(f"🔍 DEBUG: Part {j} attributes: {dir(part)}")
-
-                            # Extract text content only
-                            if hasattr(part, "text") and part.text:
-                                content += part.text
-                                print(
-                                    f"🔍 DEBUG: Added text content: '{part.text[:100]}...'"
-                                )
-                            # Extract function calls
-                            elif (
-                                hasattr(part, "function_call")
-                                and part.function_call is not None
-                            ):
-                                json_args = json.dumps(part.function_call.args)
-                                tool_call = {
-                                    "id": f"gemini-{hash(part.function_call.name)}",
-                                    "type": "function",
-                                    "function": {
-                                        "name": part.function_call.name,
-                                        "arguments": json_args,
-                                    },
-                                }
-                                tool_calls.append(tool_call)
-                                print(
-                                    f"🔍 DEBUG: Added function call: {part.function_call.name} with args: {json_args}"
-                                )
-                            # Skip any other non-text parts to avoid warnings
-                            else:
-                                print(
-                                    f"🔍 DEBUG: Skipping part {j} - neither text nor function_call"
-                                )
-                                pass
-                    else:
-                        print(f"🔍 DEBUG: Candidate {i} has no content or parts")
-            else:
-                print("🔍 DEBUG: No candidates in response")
-
-            print(f"🔍 DEBUG: Final content: '{content[:200]}...'")
-            print(f"🔍 DEBUG: Final tool_calls: {tool_calls}")
-            print(f"🔍 DEBUG: Number of tool calls: {len(tool_calls)}")
+            content, tool_calls = self.parse_response(response)
+
+            usage = extract_gemini_usage(response)
+            finish_reason = getattr(
+                (response.candidates or [None])[0], "finish_reason", None
+            )
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider="gemini", model=self.model, outcome="ok"
+            )
+            observe_llm_usage("gemini", self.model, usage)
 
             response_obj = LLMResponse(
                 content=content,
                 provider="gemini",
                 model=self.model,
-                usage={},  # Gemini doesn't provide detailed usage info
+                usage=usage,
                 tool_calls=tool_calls,
+                truncated=getattr(finish_reason, "value", finish_reason)
+                == "MAX_TOKENS",
             )
 
             print(f"🔍 DEBUG: LLMResponse created: {response_obj}")
             return response_obj
         except Exception as e:
-            error_str = str(e)
-            # Handle specific Gemini API errors with user-friendly messages
-            if "503" in error_str and "overloaded" in error_str.lower():
-                raise Exception(
-                    "Our AI model is currently overloaded and experiencing high demand. Please try again in a few moments. We apologize for the inconvenience!"
-                )
-            elif "503" in error_str:
-                raise Exception(
-                    "The AI service is temporarily unavailable. Please try again in a few moments."
-                )
-            elif "429" in error_str:
-                raise Exception(
-                    "Too many requests. Please wait a moment before trying again."
-                )
-            elif "401" in error_str or "403" in error_str:
-                raise Exception(
-                    "Authentication error. Please refresh the page and try again."
+            error_class, message = classify_gemini_error(str(e))
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider="gemini", model=self.model, outcome="error"
+            )
+            LLM_ERRORS.inc(provider="gemini", error_class=error_class)
+            raise Exception(message)
+
+    async def submit_batch(self, requests: List[BatchRequest]) -> str:
+        """Submit prepared requests as one inline Gemini batch job."""
+        inlined = [
+            {
+                "contents": self.build_prompt(messages),
+                "config": config or self.build_generation_config(None),
+            }
+            for messages, config in requests
+        ]
+        loop = asyncio.get_event_loop()
+        try:
+            job = await loop.run_in_executor(
+                None,
+                lambda: self.client.batches.create(model=self.model, src=inlined),
+            )
+        except Exception as e:
+            error_class, message = classify_gemini_error(str(e))
+            LLM_ERRORS.inc(provider="gemini", error_class=error_class)
+            raise Exception(message)
+        print(
+            f"🔍 DEBUG: Submitted Gemini batch {job.name} with {len(inlined)} requests"
+        )
+        return job.name
+
+    async def get_batch(self, job_id: str) -> BatchJobStatus:
+        """Poll a Gemini batch job and parse its inline responses when done."""
+        loop = asyncio.get_event_loop()
+        job = await loop.run_in_executor(
+            None, lambda: self.client.batches.get(name=job_id)
+        )
+        raw_state = getattr(job.state, "value", job.state)
+        state = GEMINI_BATCH_STATES.get(str(raw_state), "running")
+        if state != "succeeded":
+            error = str(job.error) if job.error else None
+            return BatchJobStatus(job_id, state, error=error)
+
+        results = []
+        inlined_responses = (job.dest.inlined_responses if job.dest else None) or []
+        for inlined in inlined_responses:
+            if inlined.error or inlined.response is None:
+                _, message = classify_gemini_error(str(inlined.error))
+                results.append(Exception(message))
+                continue
+            content, tool_calls = self.parse_response(inlined.response)
+            usage = extract_gemini_usage(inlined.response)
+            observe_llm_usage("gemini", self.model, usage)
+            results.append(
+                LLMResponse(
+                    content=content,
+                    provider="gemini",
+                    model=self.model,
+                    usage=usage,
+                    tool_calls=tool_calls,
                 )
-            else:
-                raise Exception(f"Gemini API error: {error_str}")
+            )
+        return BatchJobStatus(job_id, state, results=results)
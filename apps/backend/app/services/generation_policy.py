@@ -0,0 +1,111 @@
+"""Generation settings per request class.
+
+Every model call used to get the same output cap, temperature and thinking
+budget. What a turn needs depends on what it is for:
+
+- ``tool_call``: a turn expected to end in a tool call (calendar reads and
+  writes, the confirm/modify protocol, web search requests). The arguments
+  are a few dozen tokens and should be deterministic.
+- ``events_summary``: answering from getEvents results. A busy week needs
+  more room than the old cap of 1000 tokens.
+- ``web_answer``: answering from webSearch results.
+- ``chat``: everything else.
+
+``classify_turn`` picks the class from the conversation with local rules;
+providers map a ``GenerationPolicy`` onto their own config in
+``apply_generation_policy``.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Set
+
+from app.services.base_provider import LLMMessage
+from app.services.calendar_intent import classify_calendar_intent
+from app.services.metrics import DEFAULT_LATENCY_BUCKETS, TOKEN_BUCKETS, registry
+from app.services.search_prefetch import WEB_SEARCH_PREFIX
+
+GENERATION_LATENCY = registry.histogram(
+    "llm_generation_seconds",
+    "Model call latency by request class",
+    ["request_class"],
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+GENERATION_OUTPUT_TOKENS = registry.histogram(
+    "llm_generation_output_tokens",
+    "Completion tokens by request class",
+    ["request_class"],
+    buckets=TOKEN_BUCKETS,
+)
+GENERATION_TRUNCATED = registry.counter(
+    "llm_generation_truncated_total",
+    "Model calls that stopped at the output token cap, by request class",
+    ["request_class"],
+)
+
+REQUEST_CLASSES = ("tool_call", "events_summary", "web_answer", "chat")
+
+CONFIRM_TEXT = "confirm"
+MODIFY_PREFIX = "I modified the event with these details:"
+
+
+@dataclass(frozen=True)
+class GenerationPolicy:
+    """Output cap, sampling temperature and thinking budget for one class."""
+
+    max_output_tokens: int
+    temperature: float
+    thinking_budget: int = 0
+
+
+# The previous fixed settings, used for every class when the policy is off
+DEFAULT_POLICY = GenerationPolicy(max_output_tokens=1000, temperature=0.6)
+
+# Thinking stays off: every class is on the interactive path, and none of
+# them needs reasoning the prompt doesn't already spell out
+POLICIES: Dict[str, GenerationPolicy] = {
+    "tool_call": GenerationPolicy(max_output_tokens=384, temperature=0.2),
+    "events_summary": GenerationPolicy(max_output_tokens=1536, temperature=0.3),
+    "web_answer": GenerationPolicy(max_output_tokens=1024, temperature=0.5),
+    "chat": GenerationPolicy(max_output_tokens=512, temperature=0.7),
+}
+
+
+def _answered_tools(messages: List[LLMMessage]) -> Set[str]:
+    """Names of the tools whose results the last message carries."""
+    results = messages[-1].tool_results or []
+    answered = {result.get("tool_call_id") for result in results}
+    return {
+        call.get("function", {}).get("name", "")
+        for msg in messages
+        for call in msg.tool_calls or []
+        if call.get("id") in answered
+    }
+
+
+def classify_turn(messages: List[LLMMessage], has_tools: bool = True) -> str:
+    """Request class of the model call that continues ``messages``."""
+    if not messages:
+        return "chat"
+    last = messages[-1]
+    if last.role == "tool":
+        names = _answered_tools(messages)
+        if "getEvents" in names:
+            return "events_summary"
+        if "webSearch" in names:
+            return "web_answer"
+        return "chat"
+    if last.role != "user" or not has_tools:
+        return "chat"
+
+    text = last.content.strip()
+    if text.startswith(WEB_SEARCH_PREFIX) or text.startswith(MODIFY_PREFIX):
+        return "tool_call"
+    if text.lower() == CONFIRM_TEXT:
+        return "tool_call"
+    if classify_calendar_intent(text).kind != "none":
+        return "tool_call"
+    return "chat"
+
+
+def policy_for(request_class: str) -> GenerationPolicy:
+    return POLICIES.get(request_class, DEFAULT_POLICY)
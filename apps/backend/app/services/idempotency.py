@@ -0,0 +1,198 @@
+"""Idempotency-Key handling for retried /chat/generate requests.
+
+The frontend retries slow requests, and each retry used to run (and bill)
+the whole model call again. Requests carrying an ``Idempotency-Key`` are
+run once per key:
+
+- a duplicate arriving while the first is still running waits for the same
+  computation; on this worker it awaits the task, on another worker it polls
+  the shared state store until the result is stored
+- a duplicate arriving after completion gets the stored response replayed
+  for ``IDEMPOTENCY_TTL_SECONDS``
+
+Entries live in the ``idempotency`` state store namespace, bounded by TTL
+and, in memory, by an LRU of ``IDEMPOTENCY_MAX_ENTRIES``. A key reused with
+a different request body is rejected rather than replayed.
+
+A computation keeps running while any request on this worker waits for it.
+Once they have all disconnected it is cancelled after
+``IDEMPOTENCY_ORPHAN_GRACE_SECONDS``, unless a retry attaches first.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core import fast_json
+from app.core.config import settings
+from app.services.metrics import registry
+from app.services.state_store import StateStore, state_store
+
+IDEMPOTENT_REQUESTS = registry.counter(
+    "idempotent_requests_total",
+    "Requests with an Idempotency-Key by outcome "
+    "(new/attached/replayed/conflict/orphaned)",
+    ["outcome"],
+)
+
+# How often a duplicate polls for a result computed on another worker
+POLL_INTERVAL_SECONDS = 0.05
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different body."""
+
+
+def request_fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class _Running:
+    """A computation on this worker and the requests waiting for it."""
+
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task = task
+        self.waiters = 0
+        self.orphan_timer: Optional[asyncio.TimerHandle] = None
+
+    def attach(self) -> None:
+        self.waiters += 1
+        if self.orphan_timer is not None:
+            self.orphan_timer.cancel()
+            self.orphan_timer = None
+
+    def detach(self, grace: float) -> None:
+        self.waiters -= 1
+        if self.waiters == 0 and not self.task.done():
+            self.orphan_timer = asyncio.get_running_loop().call_later(
+                grace, self._cancel_orphan
+            )
+
+    def _cancel_orphan(self) -> None:
+        self.orphan_timer = None
+        if self.waiters == 0 and not self.task.done():
+            IDEMPOTENT_REQUESTS.inc(outcome="orphaned")
+            self.task.cancel()
+
+
+class IdempotencyCache:
+    """Runs each idempotency key once and replays its response."""
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        pending_ttl: float = 60.0,
+        max_entries: int = 1000,
+        max_response_bytes: int = 65536,
+        orphan_grace: float = 2.0,
+        store: Optional[StateStore] = None,
+    ):
+        self.ttl = ttl
+        # A pending entry outlives a crashed worker by at most this long
+        self.pending_ttl = pending_ttl
+        self.max_response_bytes = max_response_bytes
+        self.orphan_grace = orphan_grace
+        self.store = (
+            store if store is not None else state_store("idempotency", max_entries)
+        )
+        # Computations running on this worker, by key
+        self._inflight: Dict[str, _Running] = {}
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda response: True,
+    ) -> Tuple[Dict[str, Any], str]:
+        """The response for ``key`` and how it was obtained
+        (new/attached/replayed).
+
+        ``compute`` returns a JSON-compatible response; responses failing
+        ``cacheable`` go to requests already waiting but are not stored.
+        """
+        waited = False
+        while True:
+            running = self._inflight.get(key)
+            if running is not None:
+                self._check(running.fingerprint, fingerprint)
+                response = await self._wait(running)
+                return self._done(response, "attached")
+
+            entry = self.store.get(key)
+            if entry is None:
+                pending = {"fingerprint": fingerprint, "status": "pending"}
+                if self.store.add(key, pending, ttl=self.pending_ttl):
+                    task = asyncio.ensure_future(compute())
+                    running = self._inflight[key] = _Running(fingerprint, task)
+                    task.add_done_callback(
+                        lambda done: self._finish(key, fingerprint, done, cacheable)
+                    )
+                    response = await self._wait(running)
+                    return self._done(response, "new")
+                # Claimed by a concurrent request, or the shared store was
+                # busy; look again shortly
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                continue
+
+            self._check(entry["fingerprint"], fingerprint)
+            if entry["status"] == "done":
+                return self._done(
+                    entry["response"], "attached" if waited else "replayed"
+                )
+            # Running on another worker
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def _wait(self, running: _Running) -> Dict[str, Any]:
+        running.attach()
+        try:
+            # Shielded so one disconnecting request can't cancel work that
+            # others wait for; the last one leaving starts the orphan timer
+            return await asyncio.shield(running.task)
+        finally:
+            running.detach(self.orphan_grace)
+
+    def _check(self, stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            IDEMPOTENT_REQUESTS.inc(outcome="conflict")
+            raise IdempotencyConflict()
+
+    @staticmethod
+    def _done(response: Dict[str, Any], outcome: str) -> Tuple[Dict[str, Any], str]:
+        IDEMPOTENT_REQUESTS.inc(outcome=outcome)
+        return response, outcome
+
+    def _finish(
+        self,
+        key: str,
+        fingerprint: str,
+        task: asyncio.Task,
+        cacheable: Callable[[Dict[str, Any]], bool],
+    ) -> None:
+        """Store a finished computation, or release the key if it failed."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            self.store.delete(key)
+            return
+        response = task.result()
+        too_big = len(fast_json.dumps(response)) > self.max_response_bytes
+        if too_big or not cacheable(response):
+            # Later retries run again
+            self.store.delete(key)
+            return
+        entry = {"fingerprint": fingerprint, "status": "done", "response": response}
+        self.store.set(key, entry, ttl=self.ttl)
+
+
+# Global instance
+idempotency_cache = IdempotencyCache(
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    pending_ttl=settings.IDEMPOTENCY_PENDING_TTL_SECONDS,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    max_response_bytes=settings.IDEMPOTENCY_MAX_RESPONSE_BYTES,
+    orphan_grace=settings.IDEMPOTENCY_ORPHAN_GRACE_SECONDS,
+)
@@ -0,0 +1,85 @@
+"""Deferred imports for heavy SDKs.
+
+``google.genai``, ``openai``, ``anthropic`` and ``serpapi`` together take
+well over a second to import, most of the backend's cold start. Modules
+reference them through a ``LazyModule`` proxy, which imports on first
+attribute access. ``preload`` imports them up front; the app calls it from a worker thread
+once the server is up, so the first request usually finds them loaded.
+"""
+
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Iterable, List
+
+from app.services.metrics import registry
+
+LAZY_IMPORT_SECONDS = registry.gauge(
+    "lazy_import_seconds",
+    "Time taken to import a deferred module, by module and trigger",
+    ["module", "trigger"],
+)
+
+# Every module loaded through a LazyModule proxy
+HEAVY_MODULES: List[str] = []
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Attribute assignment is forwarded to the real module, so test doubles can
+    still be patched in with ``proxy.Client = Fake``.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        if name not in HEAVY_MODULES:
+            HEAVY_MODULES.append(name)
+
+    def load(self, trigger: str = "first_use") -> ModuleType:
+        module = self._module
+        if module is not None:
+            return module
+        with self._lock:
+            if self._module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self._name)
+                elapsed = time.perf_counter() - started
+                LAZY_IMPORT_SECONDS.set(elapsed, module=self._name, trigger=trigger)
+                print(
+                    f"🔍 DEBUG: Imported {self._name} ({trigger}) in "
+                    f"{elapsed * 1000:.0f}ms"
+                )
+                object.__setattr__(self, "_module", module)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Introspection (e.g. ABCMeta probing class attributes for
+        # __isabstractmethod__) must not trigger the import
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self.load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def preload(modules: Iterable[LazyModule]) -> Dict[str, float]:
+    """Import modules now (blocking); returns seconds taken per module."""
+    timings = {}
+    for module in modules:
+        started = time.perf_counter()
+        module.load(trigger="preload")
+        timings[module._name] = time.perf_counter() - started
+    return timings
@@ -1,24 +1,182 @@
-"""Simplified LLM service focused on Gemini provider."""
+"""LLM service routing requests to pluggable providers."""
 
-import json
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple
 
 from app.core.config import settings
-from app.services.web_search import web_search_service
-from app.services.gemini_provider import GeminiProvider, LLMMessage, LLMResponse
-from app.services.system_prompts import get_calendar_system_prompt
+from app.services.web_search import serpapi, web_search_service
+from app.services.agent_loop import AgentBudget, AgentLoop
+from app.services.anthropic_provider import AnthropicProvider
+from app.services.base_provider import (
+    BaseLLMProvider,
+    BatchJobStatus,
+    LLMMessage,
+    LLMResponse,
+    tool_call_arguments,
+)
+from app.services.batch import local_batch_jobs
+from app.services.calendar_intent import CalendarIntent, detect_calendar_intent
+from app.services.fake_provider import FakeProvider, FakeScript, FaultSchedule
+from app.services.gemini_provider import GeminiProvider
+from app.services.generation_policy import (
+    GENERATION_LATENCY,
+    GENERATION_OUTPUT_TOKENS,
+    GENERATION_TRUNCATED,
+    classify_turn,
+    policy_for,
+)
+from app.services.lazy_imports import preload
+from app.services.metrics import Timer
+from app.services.model_cascade import ModelCascade, parse_tiers
+from app.services.openai_provider import OpenAIProvider
+from app.services.prompt_scope import select_scope
+from app.services.provider_router import ProviderRouter, RouteOptions
+from app.services.request_templates import RequestTemplateRegistry
+from app.services.search_compaction import (
+    compact_search_results,
+    format_results_verbose,
+    observe_compaction,
+)
+from app.services.search_prefetch import (
+    WEB_SEARCH_PREFIX,
+    SearchPrefetch,
+    SearchPrefetcher,
+)
+from app.services.system_prompts import PROMPT_VERSION
+from app.services.tool_schemas import check_tool_calls
+from app.services.tools import tool_names
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+# Builds a provider instance for a given model name
+ProviderFactory = Callable[[str], BaseLLMProvider]
 
 
 class LLMService:
-    """Simplified LLM service using only Gemini provider."""
+    """LLM service with a registry of provider factories."""
 
     def __init__(self):
         # Initialize with default model, but will be overridden per request
         self.api_key = settings.GEMINI_API_KEY
+        self.providers: Dict[str, ProviderFactory] = {}
+        self.default_models: Dict[str, str] = {}
+        # Providers hold SDK clients; build one per (provider, model) and reuse it
+        self._instances: Dict[Tuple[str, str], BaseLLMProvider] = {}
+        self.templates = RequestTemplateRegistry()
+        self._initialize_providers()
+        self.router = ProviderRouter(
+            self,
+            alpha=settings.ROUTER_EWMA_ALPHA,
+            error_threshold=settings.ROUTER_ERROR_THRESHOLD,
+            failure_cooldown=settings.ROUTER_FAILURE_COOLDOWN_SECONDS,
+            default_max_cost_per_mtok=settings.ROUTER_MAX_COST_PER_MTOK,
+        )
+        self.cascade = ModelCascade(self, parse_tiers(settings.CASCADE_MODELS))
+        self.prefetcher = SearchPrefetcher(
+            web_search_service.search,
+            enabled=settings.WEB_SEARCH_PREFETCH_ENABLED,
+            min_similarity=settings.WEB_SEARCH_PREFETCH_MIN_SIMILARITY,
+        )
+        self.agent = AgentLoop(
+            self,
+            AgentBudget(
+                max_steps=settings.AGENT_MAX_STEPS,
+                max_tokens=settings.AGENT_MAX_TOKENS,
+                max_seconds=settings.AGENT_MAX_SECONDS,
+            ),
+        )
+
+    def _initialize_providers(self):
+        if settings.GEMINI_API_KEY:
+            self.register_provider(
+                "gemini",
+                lambda model: GeminiProvider(api_key=self.api_key, model=model),
+                default_model="gemini-2.5-flash",
+            )
+
+        if settings.OPENAI_API_KEY:
+            self.register_provider(
+                "openai",
+                lambda model: OpenAIProvider(
+                    api_key=settings.OPENAI_API_KEY,
+                    model=model,
+                    base_url=settings.OPENAI_BASE_URL,
+                    max_retries=settings.LLM_CLIENT_MAX_RETRIES,
+                ),
+                default_model="gpt-4o-mini",
+            )
+
+        if settings.ANTHROPIC_API_KEY:
+            self.register_provider(
+                "anthropic",
+                lambda model: AnthropicProvider(
+                    api_key=settings.ANTHROPIC_API_KEY,
+                    model=model,
+                    base_url=settings.ANTHROPIC_BASE_URL,
+                    max_retries=settings.LLM_CLIENT_MAX_RETRIES,
+                ),
+                default_model="claude-3-5-haiku-latest",
+            )
+
+        if settings.FAKE_LLM_ENABLED:
+            script_kwargs = dict(
+                faults=FaultSchedule(settings.FAKE_LLM_FAULTS),
+                latency_ms=settings.FAKE_LLM_LATENCY_MS,
+                timeout_ms=settings.FAKE_LLM_TIMEOUT_MS,
+            )
+            script = (
+                FakeScript.from_file(settings.FAKE_LLM_SCRIPT, **script_kwargs)
+                if settings.FAKE_LLM_SCRIPT
+                else FakeScript(**script_kwargs)
+            )
+            self.register_provider(
+                "fake",
+                lambda model: FakeProvider(script, model=model),
+                default_model="fake-model",
+            )
+
+    def register_provider(
+        self, name: str, factory: ProviderFactory, default_model: str
+    ) -> None:
+        """Register (or replace) a provider factory."""
+        self.providers[name] = factory
+        self.default_models[name] = default_model
+        for key in [key for key in self._instances if key[0] == name]:
+            del self._instances[key]
+
+    def get_provider_instance(self, provider: str, model: str) -> BaseLLMProvider:
+        """Cached provider instance for (provider, model)."""
+        key = (provider, model)
+        instance = self._instances.get(key)
+        if instance is None:
+            instance = self._instances[key] = self.providers[provider](model)
+        return instance
+
+    def warm_up(self) -> Dict[str, float]:
+        """Import configured SDKs and build default-model clients (blocking).
+
+        Returns import seconds per module; run it off the event loop.
+        """
+        instances = [
+            self.get_provider_instance(name, model)
+            for name, model in self.default_models.items()
+        ]
+        modules = [instance.sdk for instance in instances if instance.sdk is not None]
+        if settings.SERPAPI_API_KEY:
+            modules.append(serpapi)
+        timings = preload(modules)
+        for instance in instances:
+            instance.client
+        return timings
+
+    def get_available_providers(self) -> List[str]:
+        return list(self.providers.keys())
 
     def is_provider_available(self, provider: str) -> bool:
         """Check if a provider is available."""
-        return provider == "gemini" and bool(settings.GEMINI_API_KEY)
+        if provider == "auto":
+            return self.router.is_available()
+        if provider == "cascade":
+            return self.cascade.is_available()
+        return provider in self.providers
 
     async def generate_response(
         self,
@@ -26,60 +184,202 @@ class LLMService:
         messages: List[LLMMessage],
         model: Optional[str] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
+        routing: Optional[RouteOptions] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
     ) -> LLMResponse:
-        """Generate response using the specified provider."""
+        """Generate response using the specified provider.
+
+        ``provider="auto"`` lets the router pick the backend; ``routing``
+        carries per-request overrides (cost ceiling, allowed providers/models).
+        ``locale`` sets the timezone the system prompt is written for.
+        ``deadline`` (``time.monotonic()``) bounds the provider's HTTP call.
+        """
+        if provider == "auto":
+            return await self.router.generate(
+                messages, tools, routing, locale, deadline
+            )
+        if provider == "cascade":
+            return await self.cascade.generate(messages, tools, locale, deadline)
+
+        request_class = classify_turn(messages, bool(tools))
+        provider_instance, messages_with_system, tools, config = self.prepare_request(
+            provider, messages, model, tools, locale, request_class
+        )
+        timer = Timer()
+        response = await provider_instance.generate_response(
+            messages_with_system, tools, config, deadline
+        )
+        GENERATION_LATENCY.observe(timer.elapsed(), request_class=request_class)
+        completion_tokens = response.usage.get("completion_tokens")
+        if completion_tokens:
+            GENERATION_OUTPUT_TOKENS.observe(
+                completion_tokens, request_class=request_class
+            )
+        if response.truncated:
+            GENERATION_TRUNCATED.inc(request_class=request_class)
+        if response.tool_calls and settings.TOOL_CALL_VALIDATION_ENABLED:
+            response.tool_calls = check_tool_calls(response.tool_calls, locale)
+        return response
+
+    def prepare_request(
+        self,
+        provider: str,
+        messages: List[LLMMessage],
+        model: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        request_class: Optional[str] = None,
+    ) -> Tuple[BaseLLMProvider, List[LLMMessage], List[Dict[str, Any]], Any]:
+        """Resolve the provider instance and build the full request for it.
+
+        Returns (provider instance, messages with system prompt, tools,
+        generation config); shared by live calls and batch submission. The
+        config follows the generation policy for ``request_class`` (see
+        generation_policy.py) when one is given.
+        """
         if not self.is_provider_available(provider):
             raise Exception(f"Provider {provider} is not available")
 
-        # Use the provided model or default to gemini-2.5-flash
-        model_to_use = model or "gemini-2.5-flash"
+        # Use the provided model or the provider's default
+        model_to_use = model or self.default_models[provider]
 
-        print(f"🔍 DEBUG: Using Gemini model: {model_to_use}")
+        print(f"🔍 DEBUG: Using {provider} model: {model_to_use}")
 
-        # Create a new provider instance with the specified model
-        provider_instance = GeminiProvider(api_key=self.api_key, model=model_to_use)
+        provider_instance = self.get_provider_instance(provider, model_to_use)
+
+        # Only the prompt sections and tools this turn needs (see
+        # prompt_scope.py), falling back to all of them
+        names = tool_names(tools)
+        prompt_version = PROMPT_VERSION
+        if names and settings.PROMPT_SCOPE_ENABLED:
+            names, prompt_version = select_scope(messages, names)
+
+        # Tools, generation config and the static prompt are prebuilt per
+        # (provider, model, prompt version, tool set); only clone and fill in
+        template = self.templates.get(
+            provider_instance, provider, model_to_use, names, prompt_version
+        )
 
         # Use the unified system prompt for all calendar operations
-        system_prompt = get_calendar_system_prompt()
+        system_prompt = template.render_system_prompt(locale=locale)
 
         # Add system message at the beginning
         messages_with_system = [LLMMessage("system", system_prompt)] + messages
 
-        return await provider_instance.generate_response(messages_with_system, tools)
+        config = template.new_config()
+        if request_class is not None and settings.GENERATION_POLICY_ENABLED:
+            config = provider_instance.apply_generation_policy(
+                config, policy_for(request_class)
+            )
+
+        return (
+            provider_instance,
+            messages_with_system,
+            list(template.tools),
+            config,
+        )
+
+    async def submit_batch(
+        self,
+        provider: str,
+        conversations: List[List[LLMMessage]],
+        model: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+    ) -> Tuple[str, Callable[[str], Awaitable[BatchJobStatus]]]:
+        """Submit conversations through the provider's asynchronous batch API.
+
+        Providers without one (or every provider, with BATCH_USE_LOCAL_STANDIN)
+        go through the in-process stand-in. Returns the job ID and the
+        function to poll it with.
+        """
+        if provider in ("auto", "cascade"):
+            raise Exception("Batch mode needs an explicit provider")
+        if not conversations:
+            raise Exception("Batch is empty")
+
+        requests = []
+        for messages in conversations:
+            provider_instance, messages_with_system, _, config = self.prepare_request(
+                provider,
+                messages,
+                model,
+                tools,
+                locale,
+                classify_turn(messages, bool(tools)),
+            )
+            requests.append((messages_with_system, config))
 
-    async def execute_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool call and return the result."""
+        if provider_instance.supports_batch and not settings.BATCH_USE_LOCAL_STANDIN:
+            job_id = await provider_instance.submit_batch(requests)
+            return job_id, provider_instance.get_batch
+        job_id = await local_batch_jobs.submit_batch(provider_instance, requests)
+        return job_id, local_batch_jobs.get_batch
+
+    def start_search_prefetch(
+        self,
+        messages: List[LLMMessage],
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> Optional[SearchPrefetch]:
+        """Start searching now if the latest message is a web search request."""
+        if not messages or messages[-1].role != "user":
+            return None
+        if not self.is_web_search_query(messages[-1].content):
+            return None
+        return self.prefetcher.start(messages[-1].content, locale, deadline)
+
+    async def execute_tool_call(
+        self,
+        tool_call: Dict[str, Any],
+        prefetch: Optional[SearchPrefetch] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Execute a tool call and return the result.
+
+        A ``prefetch`` started for this request answers a webSearch call when
+        the model's query is similar to the speculative one.
+        """
         try:
             tool_name = tool_call["function"]["name"]
-            args = json.loads(tool_call["function"]["arguments"])
+            args = tool_call_arguments(tool_call)
 
             if tool_name == "webSearch":
                 # Execute web search directly
                 query = args.get("query", "")
                 max_results = args.get("maxResults", 5)
 
-                result = await web_search_service.search(query, max_results)
-                formatted_content = f"Web search results for '{query}':\n\n"
-
-                if result.get("error"):
-                    formatted_content += f"Error: {result['error']}\n"
+                result = None
+                if prefetch is not None:
+                    result = await prefetch.claim(query, max_results)
+                if result is None:
+                    result = await web_search_service.search(
+                        query, max_results, locale, deadline
+                    )
+                compacted = None
+                if settings.WEB_SEARCH_COMPACTION_ENABLED:
+                    # Prompt size dominates the next model call's latency
+                    compacted = compact_search_results(
+                        query,
+                        result,
+                        token_budget=settings.WEB_SEARCH_RESULT_TOKEN_BUDGET,
+                    )
+                    observe_compaction(compacted)
+                    formatted_content = compacted.content
+                    print(f"🔍 DEBUG: Search result compaction: {compacted.stats()}")
                 else:
-                    for i, search_result in enumerate(result.get("results", []), 1):
-                        formatted_content += (
-                            f"{i}. **{search_result.get('title', 'No title')}**\n"
-                        )
-                        formatted_content += (
-                            f"   {search_result.get('snippet', 'No description')}\n"
-                        )
-                        formatted_content += (
-                            f"   {search_result.get('url', 'No URL')}\n\n"
-                        )
-
-                return {
+                    formatted_content = format_results_verbose(query, result)
+
+                tool_result = {
                     "tool_call_id": tool_call["id"],
                     "content": formatted_content,
                     "success": True,
                 }
+                if compacted is not None:
+                    tool_result["compaction"] = compacted.stats()
+                return tool_result
             else:
                 # For other tools (getEvents), don't execute them
                 # They should be handled by the frontend
@@ -97,48 +397,10 @@ class LLMService:
 
     def is_web_search_query(self, user_message: str) -> bool:
         """Detect if a user message is a web search request."""
-        return user_message.startswith("🔍 Web Search:")
-
-    def is_calendar_query(self, user_message: str) -> bool:
-        """Detect if a user message is calendar-related."""
-        calendar_keywords = [
-            "calendar",
-            "event",
-            "meeting",
-            "appointment",
-            "schedule",
-            "book",
-            "create",
-            "add",
-            "tomorrow",
-            "today",
-            "next week",
-            "this week",
-            "monday",
-            "tuesday",
-            "wednesday",
-            "thursday",
-            "friday",
-            "saturday",
-            "sunday",
-            "am",
-            "pm",
-            "morning",
-            "afternoon",
-            "evening",
-            "night",
-            "confirm",
-            "modify",
-            "edit",
-            "delete",
-            "remove",
-            "show",
-            "list",
-            "what",
-            "when",
-            "where",
-            "who",
-        ]
+        return user_message.startswith(WEB_SEARCH_PREFIX)
 
-        user_message_lower = user_message.lower()
-        return any(keyword in user_message_lower for keyword in calendar_keywords)
+    def detect_calendar_intent(
+        self, user_message: str, locale: UserLocale = DEFAULT_LOCALE
+    ) -> CalendarIntent:
+        """Detect a calendar read/write intent and the time window it targets."""
+        return detect_calendar_intent(user_message, tz=locale.tz)
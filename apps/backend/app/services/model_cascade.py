@@ -0,0 +1,190 @@
+"""Model cascade: answer with the fastest model, escalate when its output fails.
+
+``model_provider="cascade"`` sends each model call to the first tier of
+``CASCADE_MODELS`` (fastest first, strongest last). The response is checked
+locally before it is returned:
+
+- it is not empty and did not stop at the output token cap,
+- every tool call names a known tool and its arguments match the tool's
+  schema (see tool_schemas.py),
+- a confirmation card in the text is well formed.
+
+A response that fails, or a tier that errors, moves the call to the next
+tier. The last tier's response is returned as is; if the last tier errors,
+the earlier response that failed the checks is returned instead.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.services.base_provider import LLMMessage, LLMResponse
+from app.services.metrics import DEFAULT_LATENCY_BUCKETS, registry
+from app.services.tool_schemas import tool_call_errors
+from app.services.tools import translate_tools
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+if TYPE_CHECKING:
+    from app.services.llm_service import LLMService
+
+CASCADE_REQUESTS = registry.counter(
+    "llm_cascade_requests_total",
+    "Cascade model calls by the tier that answered",
+    ["model"],
+)
+CASCADE_ESCALATIONS = registry.counter(
+    "llm_cascade_escalations_total",
+    "Cascade tiers whose output failed the checks, by model and reason",
+    ["model", "reason"],
+)
+CASCADE_LATENCY = registry.histogram(
+    "llm_cascade_seconds",
+    "Cascade model call latency including escalations, by answering tier",
+    ["model"],
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+
+CARD_OPEN = "<event_confirmation>"
+CARD_CLOSE = "</event_confirmation>"
+CARD_LABELS = ("**Title:**", "**Date & Time:**")
+
+
+@dataclass(frozen=True)
+class CascadeTier:
+    provider: str
+    model: str
+
+
+def parse_tiers(spec: str) -> List[CascadeTier]:
+    """Tiers from "provider/model,provider/model", fastest first."""
+    tiers = []
+    for item in spec.split(","):
+        provider, _, model = item.strip().partition("/")
+        if provider and model:
+            tiers.append(CascadeTier(provider, model))
+    return tiers
+
+
+def check_response(response: LLMResponse) -> Optional[str]:
+    """Why a response should be escalated, or None if it passes."""
+    if response.truncated:
+        return "truncated"
+    if not response.tool_calls and not response.content.strip():
+        return "empty"
+    for tool_call in response.tool_calls:
+        errors = tool_call_errors(tool_call)
+        if errors:
+            print(f"🔍 DEBUG: Cascade tool call rejected: {errors}")
+            return "tool_args"
+    content = response.content
+    if CARD_OPEN in content or CARD_CLOSE in content or CARD_LABELS[0] in content:
+        if content.count(CARD_OPEN) != 1 or content.count(CARD_CLOSE) != 1:
+            return "card"
+        card = content[content.find(CARD_OPEN) : content.find(CARD_CLOSE)]
+        if any(card.count(label) != 1 for label in CARD_LABELS):
+            return "card"
+    return None
+
+
+class ModelCascade:
+    """Tries each tier in turn until one's output passes ``check_response``."""
+
+    def __init__(self, llm_service: "LLMService", tiers: List[CascadeTier]):
+        self.llm_service = llm_service
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._escalations = 0
+        self._seconds = 0.0
+
+    def available_tiers(self) -> List[CascadeTier]:
+        return [
+            tier
+            for tier in self.tiers
+            if self.llm_service.is_provider_available(tier.provider)
+        ]
+
+    def is_available(self) -> bool:
+        return bool(self.available_tiers())
+
+    async def generate(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        tiers = self.available_tiers()
+        if not tiers:
+            raise Exception("No cascade model is available")
+
+        started = time.perf_counter()
+        usage: Dict[str, int] = {}
+        response: Optional[LLMResponse] = None
+        last_error: Optional[Exception] = None
+        escalations = 0
+        for index, tier in enumerate(tiers):
+            last = index == len(tiers) - 1
+            if response is not None and deadline is not None:
+                if time.monotonic() >= deadline:
+                    # No time for a stronger model; keep what we have
+                    break
+            try:
+                response = await self.llm_service.generate_response(
+                    provider=tier.provider,
+                    messages=messages,
+                    model=tier.model,
+                    tools=translate_tools(tools, tier.provider),
+                    locale=locale,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                if last and response is None:
+                    raise
+                last_error = e
+                if not last:
+                    escalations += 1
+                    CASCADE_ESCALATIONS.inc(model=tier.model, reason="error")
+                continue
+            for key, value in response.usage.items():
+                if isinstance(value, int):
+                    usage[key] = usage.get(key, 0) + value
+            reason = None if last else check_response(response)
+            if reason is None:
+                break
+            print(f"🔍 DEBUG: Cascade escalating from {tier.model}: {reason}")
+            escalations += 1
+            CASCADE_ESCALATIONS.inc(model=tier.model, reason=reason)
+
+        if response is None:
+            raise last_error
+        # Bill the request for every tier it went through
+        response.usage = usage
+        elapsed = time.perf_counter() - started
+        CASCADE_REQUESTS.inc(model=response.model)
+        CASCADE_LATENCY.observe(elapsed, model=response.model)
+        with self._lock:
+            self._requests += 1
+            self._escalations += int(escalations > 0)
+            self._seconds += elapsed
+        return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Tiers, escalation rate and blended latency, for the providers endpoint."""
+        with self._lock:
+            requests, escalations, seconds = (
+                self._requests,
+                self._escalations,
+                self._seconds,
+            )
+        return {
+            "tiers": [
+                f"{tier.provider}/{tier.model}" for tier in self.available_tiers()
+            ],
+            "requests": requests,
+            "escalation_rate": round(escalations / requests, 3) if requests else None,
+            "blended_latency_ms": (
+                round(seconds / requests * 1000, 1) if requests else None
+            ),
+        }
@@ -0,0 +1,136 @@
+"""OpenAI provider implementation using the OpenAI SDK."""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.services.base_provider import (
+    BaseLLMProvider,
+    LLMMessage,
+    LLMResponse,
+    classify_provider_error,
+    to_chat_turns,
+)
+from app.services.deadlines import time_left
+from app.services.lazy_imports import LazyModule
+from app.services.metrics import LLM_CALL_LATENCY, LLM_ERRORS, Timer, observe_llm_usage
+
+
+if TYPE_CHECKING:
+    from app.services.generation_policy import GenerationPolicy
+
+openai = LazyModule("openai")
+
+
+class OpenAIProvider(BaseLLMProvider):
+    """OpenAI chat completions provider."""
+
+    name = "openai"
+    sdk = openai
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        base_url: Optional[str] = None,
+        max_retries: int = 2,
+    ):
+        super().__init__(api_key, model)
+        self.base_url = base_url
+        self.max_retries = max_retries
+
+    def create_client(self) -> Any:
+        return openai.AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, max_retries=self.max_retries
+        )
+
+    def build_generation_config(
+        self, tools: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Request parameters shared by every call, with tools if provided."""
+        config: Dict[str, Any] = {"max_tokens": 1000, "temperature": 0.6}
+        if tools:
+            config["tools"] = tools
+            config["tool_choice"] = "auto"
+        return config
+
+    def apply_generation_policy(
+        self, config: Dict[str, Any], policy: "GenerationPolicy"
+    ) -> Dict[str, Any]:
+        # No thinking budget on the chat endpoints used here
+        config["max_tokens"] = policy.max_output_tokens
+        config["temperature"] = policy.temperature
+        return config
+
+    async def generate_response(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        """Generate response using OpenAI."""
+        timer = Timer()
+        try:
+            system, turns = to_chat_turns(messages)
+            openai_messages = (
+                [{"role": "system", "content": system}] if system else []
+            ) + turns
+
+            # Tools are already in OpenAI format (see tools.py)
+            if config is None:
+                config = self.build_generation_config(tools)
+            request_params: Dict[str, Any] = {
+                **config,
+                "model": self.model,
+                "messages": openai_messages,
+            }
+            timeout = time_left(deadline)
+            if timeout is not None:
+                request_params["timeout"] = timeout
+
+            response = await self.client.chat.completions.create(**request_params)
+
+            message = response.choices[0].message
+            content = message.content or ""
+
+            tool_calls = []
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                tool_calls.append(
+                    {
+                        "id": tool_call.id,
+                        "type": "function",
+                        "function": {
+                            "name": tool_call.function.name,
+                            "arguments": tool_call.function.arguments,
+                        },
+                    }
+                )
+
+            usage = {}
+            if getattr(response, "usage", None):
+                usage = {
+                    "prompt_tokens": getattr(response.usage, "prompt_tokens", None),
+                    "completion_tokens": getattr(
+                        response.usage, "completion_tokens", None
+                    ),
+                    "total_tokens": getattr(response.usage, "total_tokens", None),
+                }
+
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider=self.name, model=self.model, outcome="ok"
+            )
+            observe_llm_usage(self.name, self.model, usage)
+            return LLMResponse(
+                content,
+                self.name,
+                self.model,
+                usage,
+                tool_calls,
+                truncated=response.choices[0].finish_reason == "length",
+            )
+        except Exception as e:
+            error_class, message = classify_provider_error(str(e), "OpenAI")
+            LLM_CALL_LATENCY.observe(
+                timer.elapsed(), provider=self.name, model=self.model, outcome="error"
+            )
+            LLM_ERRORS.inc(provider=self.name, error_class=error_class)
+            raise Exception(message)
@@ -0,0 +1,201 @@
+"""Per-turn prompt sections and tool subsets.
+
+Every model call used to carry all five tool declarations and the whole
+rulebook (confirmation loop, card parsing, web handoff, samples), even for
+"what's my next event?". ``select_scope`` looks at the turn with local rules
+and keeps only what it needs:
+
+- ``events``: calendar reads. The getEvents answer style and getEvents.
+- ``write``: creating or changing events, the confirm/modify protocol and
+  replies to an open confirmation card. The card rules plus every calendar
+  tool, since moves and deletes look the event up first.
+- ``web``: "🔍 Web Search:" requests. The web handoff rules and webSearch.
+- ``chat``: greetings, thanks and date/time questions. No tools.
+
+Sections every turn needs (role, time, tool rules, output rules, examples)
+are always sent; see ``PROMPT_SECTIONS`` in system_prompts.py. A turn the
+rules can't place with at least ``PROMPT_SCOPE_MIN_CONFIDENCE`` gets the
+full prompt and every tool, as before.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.base_provider import LLMMessage
+from app.services.calendar_intent import classify_calendar_intent
+from app.services.generation_policy import CONFIRM_TEXT, MODIFY_PREFIX
+from app.services.metrics import TOKEN_BUCKETS, registry
+from app.services.search_compaction import estimate_tokens
+from app.services.search_prefetch import WEB_SEARCH_PREFIX
+from app.services.system_prompts import (
+    PROMPT_GROUPS,
+    PROMPT_VERSION,
+    prompt_for_version,
+    scoped_prompt_version,
+)
+from app.services.tools import CALENDAR_TOOLS
+
+PROMPT_SCOPES = registry.counter(
+    "prompt_scope_total",
+    "Model calls by prompt scope (full when the turn was not classified)",
+    ["scope"],
+)
+PROMPT_TOKENS_SAVED = registry.histogram(
+    "prompt_tokens_saved",
+    "Estimated system prompt and tool declaration tokens left out per call",
+    ["scope"],
+    buckets=TOKEN_BUCKETS,
+)
+
+# Card labels the backend renders; an assistant message with them is an
+# open confirmation card
+CARD_MARKERS = ("**Title:**", "**Date & Time:**")
+
+_SMALL_TALK = (
+    r"(?:hi|hello|hey|hiya|yo|good (?:morning|afternoon|evening)"
+    r"|thanks?(?: you)?(?: so much| a lot)?|thank you|cheers|ta"
+    r"|(?:ok(?:ay)?|great|cool|perfect|awesome),? thanks?(?: you)?"
+    r"|bye|goodbye|see you|that'?s all(?: for now)?|that'?s it"
+    r"|how are you(?: doing)?|who are you|what can you do"
+    r"|what can you help me with)(?: there| calendara)?"
+)
+# One or more pleasantries and nothing else: "Thanks, that's all for now."
+SMALL_TALK_RE = re.compile(rf"^{_SMALL_TALK}(?:[\s!.?,]+{_SMALL_TALK})*[\s!.?,]*$")
+DATE_TIME_RE = re.compile(
+    r"^(?:what(?:'s| is) (?:the )?(?:current |today'?s )?(?:time|date|day)"
+    r"(?: (?:is it|today|now|right now))?"
+    r"|what (?:day|time|date) is it(?: today| now| right now)?"
+    r"|is it (?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"(?: today)?)[\s?.!]*$"
+)
+# The user's own calendar: "what's my next event?" is a read even without a
+# time window
+OWN_CALENDAR_RE = re.compile(
+    r"\bmy (?:next |first |last |upcoming )?(?:calendar|schedule|agenda|diary"
+    r"|events?|meetings?|appointments?)\b"
+)
+
+
+@dataclass(frozen=True)
+class PromptScope:
+    """Prompt groups and tools for one turn; ``tools`` None means all."""
+
+    name: str
+    groups: Tuple[str, ...]
+    tools: Optional[FrozenSet[str]]
+    confidence: float
+
+    @property
+    def prompt_version(self) -> str:
+        return scoped_prompt_version(self.groups)
+
+
+FULL_SCOPE = PromptScope("full", PROMPT_GROUPS, None, 0.0)
+
+_WRITE_TOOLS = frozenset(
+    {"getEvents", "handleEventConfirmation", "updateEvent", "deleteEvent"}
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace("’", "'").split())
+
+
+def _last_user_index(messages: List[LLMMessage]) -> Optional[int]:
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].role == "user":
+            return i
+    return None
+
+
+def _has_open_card(messages: List[LLMMessage], before: int) -> bool:
+    """Whether the assistant's reply before ``before`` was a confirmation card."""
+    for msg in reversed(messages[:before]):
+        if msg.role == "assistant":
+            return all(marker in msg.content for marker in CARD_MARKERS)
+    return False
+
+
+def _called_tools(messages: List[LLMMessage]) -> Set[str]:
+    return {
+        call.get("function", {}).get("name", "")
+        for msg in messages
+        for call in msg.tool_calls or []
+    }
+
+
+def classify_scope(messages: List[LLMMessage]) -> PromptScope:
+    """Scope of the turn started by the latest user message, unrecorded.
+
+    Tool rounds within a turn keep the scope of the user message that
+    started it.
+    """
+    index = _last_user_index(messages)
+    if index is None:
+        return FULL_SCOPE
+    raw = messages[index].content.strip()
+    if raw.startswith(WEB_SEARCH_PREFIX):
+        return PromptScope("web", ("web",), frozenset({"webSearch"}), 0.95)
+    if raw.startswith(MODIFY_PREFIX) or raw.lower() == CONFIRM_TEXT:
+        return PromptScope("write", ("events", "write"), _WRITE_TOOLS, 0.95)
+    if _has_open_card(messages, index):
+        # "yes", "cancel", "make it 3pm": all answers to the card
+        return PromptScope("write", ("events", "write"), _WRITE_TOOLS, 0.9)
+
+    text = _normalize(raw)
+    if DATE_TIME_RE.match(text) or SMALL_TALK_RE.match(text):
+        return PromptScope("chat", (), frozenset(), 0.9)
+    intent = classify_calendar_intent(raw)
+    if intent.kind == "write":
+        return PromptScope(
+            "write", ("events", "write"), _WRITE_TOOLS, intent.confidence
+        )
+    if intent.kind == "read":
+        confidence = intent.confidence
+        if OWN_CALENDAR_RE.search(text):
+            confidence = max(confidence, 0.8)
+        return PromptScope("events", ("events",), frozenset({"getEvents"}), confidence)
+    return FULL_SCOPE
+
+
+@lru_cache(maxsize=64)
+def _tokens_saved(version: str, dropped: FrozenSet[str]) -> int:
+    prompt_tokens = estimate_tokens(prompt_for_version(PROMPT_VERSION)) - (
+        estimate_tokens(prompt_for_version(version))
+    )
+    tool_tokens = sum(
+        estimate_tokens(json.dumps(tool["function"]))
+        for tool in CALENDAR_TOOLS
+        if tool["function"]["name"] in dropped
+    )
+    return prompt_tokens + tool_tokens
+
+
+def select_scope(
+    messages: List[LLMMessage], names: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], str]:
+    """Tool names and prompt version for the call that continues ``messages``.
+
+    ``names`` are the tools the caller offered; the result is a subset of
+    them. Tools already called in the conversation stay declared, as
+    providers reject tool history without matching declarations.
+    """
+    scope = classify_scope(messages)
+    if scope.confidence < settings.PROMPT_SCOPE_MIN_CONFIDENCE:
+        scope = FULL_SCOPE
+    PROMPT_SCOPES.inc(scope=scope.name)
+    if scope.tools is None:
+        PROMPT_TOKENS_SAVED.observe(0, scope=scope.name)
+        return names, PROMPT_VERSION
+
+    keep = scope.tools | _called_tools(messages)
+    scoped = tuple(name for name in names if name in keep)
+    PROMPT_TOKENS_SAVED.observe(
+        _tokens_saved(scope.prompt_version, frozenset(names) - keep),
+        scope=scope.name,
+    )
+    return scoped, scope.prompt_version
@@ -0,0 +1,262 @@
+"""Latency-aware routing across LLM providers and models."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.services.base_provider import LLMMessage, LLMResponse
+from app.services.metrics import registry
+from app.services.tools import translate_tools
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+if TYPE_CHECKING:
+    from app.services.llm_service import LLMService
+
+ROUTE_DECISIONS = registry.counter(
+    "llm_route_decisions_total",
+    "Backends chosen by the provider router",
+    ["provider", "model", "attempt"],
+)
+
+
+@dataclass(frozen=True)
+class RouteTarget:
+    """A (provider, model) backend with its list price in USD per 1M tokens."""
+
+    provider: str
+    model: str
+    input_cost_per_mtok: float
+    output_cost_per_mtok: float
+
+    @property
+    def blended_cost_per_mtok(self) -> float:
+        # Calendar prompts are input-heavy; weight input 3:1 against output
+        return (3 * self.input_cost_per_mtok + self.output_cost_per_mtok) / 4
+
+
+# Candidate backends; only those whose provider is registered are used
+DEFAULT_TARGETS = [
+    RouteTarget("gemini", "gemini-2.0-flash-lite", 0.075, 0.30),
+    RouteTarget("gemini", "gemini-2.5-flash-lite", 0.10, 0.40),
+    RouteTarget("gemini", "gemini-2.0-flash", 0.10, 0.40),
+    RouteTarget("gemini", "gemini-2.5-flash", 0.30, 2.50),
+    RouteTarget("openai", "gpt-4o-mini", 0.15, 0.60),
+    RouteTarget("openai", "gpt-4o", 2.50, 10.00),
+    RouteTarget("anthropic", "claude-3-5-haiku-latest", 0.80, 4.00),
+    RouteTarget("anthropic", "claude-3-5-sonnet-latest", 3.00, 15.00),
+]
+
+# Models that get their own metric label; anything else a client sends is
+# counted as "other" so request bodies can't grow the registry
+METRIC_MODELS = frozenset(target.model for target in DEFAULT_TARGETS) | {
+    "auto",
+    "cascade",
+    "fake",
+    "fake-model",
+}
+
+
+def model_label(model: str) -> str:
+    """``model`` as a bounded metric label value."""
+    return model if model in METRIC_MODELS else "other"
+
+
+@dataclass
+class RouteOptions:
+    """Per-request routing overrides."""
+
+    max_cost_per_mtok: Optional[float] = None
+    providers: Optional[List[str]] = None
+    models: Optional[List[str]] = None
+
+
+@dataclass
+class BackendStats:
+    """EWMA latency and error rate for one backend."""
+
+    ewma_latency: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    samples: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    last_sample_at: float = 0.0
+    last_error: str = field(default="", repr=False)
+
+
+class ProviderRouter:
+    """Sends each request to the fastest healthy backend within a cost ceiling.
+
+    Latency and error rate are tracked per (provider, model) as exponentially
+    weighted moving averages. A backend is unhealthy while it is cooling down
+    after consecutive failures or its error rate is above ``error_threshold``.
+    Backends with no samples, or none for ``probe_interval`` seconds, are tried
+    first so new and recovering backends get measured. Failed attempts fall
+    through to the next candidate.
+    """
+
+    def __init__(
+        self,
+        llm_service: "LLMService",
+        targets: Optional[List[RouteTarget]] = None,
+        alpha: float = 0.2,
+        error_threshold: float = 0.5,
+        failure_cooldown: float = 30.0,
+        cooldown_after_failures: int = 3,
+        probe_interval: float = 60.0,
+        max_attempts: int = 3,
+        default_max_cost_per_mtok: Optional[float] = None,
+    ):
+        self.llm_service = llm_service
+        self.targets = targets if targets is not None else list(DEFAULT_TARGETS)
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.failure_cooldown = failure_cooldown
+        self.cooldown_after_failures = cooldown_after_failures
+        self.probe_interval = probe_interval
+        self.max_attempts = max_attempts
+        self.default_max_cost_per_mtok = default_max_cost_per_mtok
+        self._stats: Dict[Tuple[str, str], BackendStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, target: RouteTarget) -> BackendStats:
+        key = (target.provider, target.model)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = BackendStats()
+        return stats
+
+    def is_available(self) -> bool:
+        return bool(self.candidates())
+
+    def _is_stale(self, stats: BackendStats, now: float) -> bool:
+        return stats.samples == 0 or now - stats.last_sample_at >= self.probe_interval
+
+    def is_healthy(self, target: RouteTarget, now: Optional[float] = None) -> bool:
+        stats = self._stats_for(target)
+        now = time.monotonic() if now is None else now
+        if stats.cooldown_until > now:
+            return False
+        if stats.ewma_error_rate < self.error_threshold:
+            return True
+        # Erroring backend: allow a probe once its stats have gone stale
+        return self._is_stale(stats, now)
+
+    def score(self, target: RouteTarget, now: Optional[float] = None) -> float:
+        """Expected latency in seconds; stale backends score 0 to get probed."""
+        stats = self._stats_for(target)
+        now = time.monotonic() if now is None else now
+        if self._is_stale(stats, now) or stats.ewma_latency is None:
+            return 0.0
+        return stats.ewma_latency
+
+    def candidates(self, options: Optional[RouteOptions] = None) -> List[RouteTarget]:
+        """Backends eligible for a request, best first."""
+        options = options or RouteOptions()
+        max_cost = (
+            options.max_cost_per_mtok
+            if options.max_cost_per_mtok is not None
+            else self.default_max_cost_per_mtok
+        )
+        eligible = [
+            target
+            for target in self.targets
+            if self.llm_service.is_provider_available(target.provider)
+            and (max_cost is None or target.blended_cost_per_mtok <= max_cost)
+            and (not options.providers or target.provider in options.providers)
+            and (not options.models or target.model in options.models)
+        ]
+        now = time.monotonic()
+        with self._lock:
+            healthy = [t for t in eligible if self.is_healthy(t, now)]
+            unhealthy = [t for t in eligible if t not in healthy]
+            healthy.sort(key=lambda t: (self.score(t, now), t.blended_cost_per_mtok))
+            # Unhealthy backends are a last resort, least-bad first
+            unhealthy.sort(key=lambda t: self._stats_for(t).ewma_error_rate)
+        return healthy + unhealthy
+
+    def record(self, target: RouteTarget, latency: float, ok: bool, error: str = ""):
+        """Update EWMA latency / error rate after an attempt."""
+        with self._lock:
+            stats = self._stats_for(target)
+            stats.samples += 1
+            stats.last_sample_at = time.monotonic()
+            stats.ewma_error_rate += self.alpha * (
+                (0.0 if ok else 1.0) - stats.ewma_error_rate
+            )
+            if ok:
+                stats.consecutive_failures = 0
+                if stats.ewma_latency is None:
+                    stats.ewma_latency = latency
+                else:
+                    stats.ewma_latency += self.alpha * (latency - stats.ewma_latency)
+            else:
+                stats.last_error = error
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= self.cooldown_after_failures:
+                    stats.cooldown_until = time.monotonic() + self.failure_cooldown
+
+    async def generate(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        options: Optional[RouteOptions] = None,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> LLMResponse:
+        """Route a request, failing over to the next candidate on errors."""
+        candidates = self.candidates(options)
+        if not candidates:
+            raise Exception("No LLM provider is available within the requested limits")
+
+        last_error: Optional[Exception] = None
+        for attempt, target in enumerate(candidates[: self.max_attempts]):
+            ROUTE_DECISIONS.inc(
+                provider=target.provider, model=target.model, attempt=str(attempt)
+            )
+            print(
+                f"🔍 DEBUG: Routing attempt {attempt} to {target.provider}/{target.model}"
+            )
+            started = time.perf_counter()
+            try:
+                response = await self.llm_service.generate_response(
+                    provider=target.provider,
+                    messages=messages,
+                    model=target.model,
+                    tools=translate_tools(tools, target.provider),
+                    locale=locale,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                self.record(
+                    target, time.perf_counter() - started, ok=False, error=str(e)
+                )
+                last_error = e
+                continue
+            self.record(target, time.perf_counter() - started, ok=True)
+            return response
+
+        raise last_error
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Current routing state, for the providers endpoint and benchmarks."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "provider": target.provider,
+                    "model": target.model,
+                    "blended_cost_per_mtok": round(target.blended_cost_per_mtok, 4),
+                    "ewma_latency_ms": (
+                        round(stats.ewma_latency * 1000, 1)
+                        if stats.ewma_latency is not None
+                        else None
+                    ),
+                    "ewma_error_rate": round(stats.ewma_error_rate, 3),
+                    "samples": stats.samples,
+                    "healthy": self.is_healthy(target, now),
+                }
+                for target in self.targets
+                if self.llm_service.is_provider_available(target.provider)
+                for stats in [self._stats_for(target)]
+            ]
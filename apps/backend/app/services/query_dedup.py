@@ -0,0 +1,220 @@
+"""Near-duplicate web search query detection.
+
+Exact-key caching treats "Man Utd vs Arsenal tomorrow" and "manchester united
+arsenal match tomorrow" as different searches. Queries are normalised
+(case, punctuation, synonyms such as "man utd" → "manchester united", filler
+words, plurals) into a token set; MinHash LSH finds candidate earlier queries
+in roughly constant time and the exact Jaccard similarity of the token sets
+decides. Anything that changes the answer — a different team, city, number
+or date word — lowers the similarity below a sensible threshold.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Applied in one pass, so earlier alternatives win and a replacement is never
+# rewritten again; multi-word phrases come before their single-word parts
+SYNONYMS: List[Tuple[str, str]] = [
+    (r"man(?:chester)? u(?:td|nited)|mufc", "manchester united"),
+    (r"man(?:chester)? city|mcfc", "manchester city"),
+    (r"spurs|tottenham hotspur", "tottenham"),
+    (r"gunners", "arsenal"),
+    (r"nyc|new york city", "new york"),
+    (r"syd", "sydney"),
+    (r"melb", "melbourne"),
+    (r"tmrw?|tomorow", "tomorrow"),
+    (r"tonite", "tonight"),
+    (r"wkend", "weekend"),
+    (r"forecast|temp|temperature", "weather"),
+    (r"(?:opening|business|trading) (?:hours|hrs?)|hrs?", "hours"),
+    (r"nye", "new years eve"),
+    (r"vs?\.?|versus|against", " "),
+]
+_SYNONYM_RE = re.compile(
+    r"\b(?:" + "|".join(f"({pattern})" for pattern, _ in SYNONYMS) + r")\b"
+)
+_SYNONYM_REPLACEMENTS = [replacement for _, replacement in SYNONYMS]
+
+# Words that don't change what a search returns
+STOPWORDS = frozenset(
+    """a an the of for in on at to and or is are was be what whats when where who
+    how which do does did i me my we our can could will would please tell show
+    find search look up get about any there game match fixture fixtures result
+    results score scores latest current info information""".split()
+)
+# Words ending in "s" that aren't plurals
+NO_STEM = frozenset("news series species sports physics always perhaps bus gas".split())
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MERSENNE = (1 << 61) - 1
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding: "meetings" → "meeting", "matches" → "match"."""
+    if word in NO_STEM:
+        return word
+    if len(word) > 4 and word.endswith("es") and word[-3] in "sxz":
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_query(query: str) -> FrozenSet[str]:
+    """Canonical token set for a search query."""
+    text = " ".join(query.lower().replace("’", "'").split())
+    text = re.sub(r"'s\b", "", text)
+    text = _SYNONYM_RE.sub(lambda m: _SYNONYM_REPLACEMENTS[m.lastindex - 1], text)
+    return frozenset(
+        _stem(word) for word in _WORD_RE.findall(text) if word not in STOPWORDS
+    )
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures over token sets using universal hashing."""
+
+    def __init__(
+        self, num_perm: int = 64, seed: int = 7, token_cache_size: int = 50000
+    ):
+        self.token_cache_size = token_cache_size
+        self._token_cache: Dict[str, Tuple[int, ...]] = {}
+        rng = hashlib.blake2b(str(seed).encode(), digest_size=64)
+        self.num_perm = num_perm
+        self._params: List[Tuple[int, int]] = []
+        while len(self._params) < num_perm:
+            rng = hashlib.blake2b(rng.digest(), digest_size=64)
+            digest = rng.digest()
+            for offset in range(0, 64, 16):
+                a = int.from_bytes(digest[offset : offset + 8], "big") % _MERSENNE
+                b = int.from_bytes(digest[offset + 8 : offset + 16], "big") % _MERSENNE
+                self._params.append((a | 1, b))
+        self._params = self._params[:num_perm]
+
+    def _token_values(self, token: str) -> Tuple[int, ...]:
+        # Query vocabularies are small and repetitive, so each token's
+        # permuted hashes are computed once
+        values = self._token_cache.get(token)
+        if values is None:
+            if len(self._token_cache) >= self.token_cache_size:
+                self._token_cache.clear()
+            h = int.from_bytes(
+                hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"
+            )
+            values = tuple((a * h + b) % _MERSENNE for a, b in self._params)
+            self._token_cache[token] = values
+        return values
+
+    def signature(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        if not tokens:
+            return self._token_values("")
+        return tuple(map(min, zip(*(self._token_values(t) for t in tokens))))
+
+
+@dataclass
+class _Entry:
+    query: str
+    tokens: FrozenSet[str]
+    bands: Tuple[Tuple[int, ...], ...]
+    stored_at: float
+    value: Any
+
+
+class NearDuplicateIndex:
+    """Recent queries indexed for near-duplicate lookup.
+
+    ``threshold`` is the minimum Jaccard similarity of normalised token sets
+    to count as a duplicate; ``max_age`` is the freshness window in seconds.
+    ``num_perm`` must be a multiple of ``bands``; with 16 bands of 6 rows a
+    pair at Jaccard 0.8 becomes a candidate with probability ~0.99, at 0.5
+    ~0.22 (then rejected by the exact check).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_age: float = 300.0,
+        max_entries: int = 1024,
+        num_perm: int = 96,
+        bands: int = 16,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = defaultdict(set)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bands(self, tokens: FrozenSet[str]) -> Tuple[Tuple[int, ...], ...]:
+        signature = self.hasher.signature(tokens)
+        return tuple(
+            signature[i * self.rows : (i + 1) * self.rows] for i in range(self.bands)
+        )
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for index, band in enumerate(entry.bands):
+            bucket = self._buckets.get((index, band))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[(index, band)]
+
+    def add(self, query: str, value: Any) -> None:
+        tokens = normalize_query(query)
+        if not tokens:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        bands = self._bands(tokens)
+        self._entries[entry_id] = _Entry(query, tokens, bands, time.monotonic(), value)
+        for index, band in enumerate(bands):
+            self._buckets[(index, band)].add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def find(self, query: str) -> Optional[Tuple[str, Any, float]]:
+        """Best fresh match as (matched query, value, similarity), or None."""
+        tokens = normalize_query(query)
+        if not tokens:
+            return None
+        candidates: Set[int] = set()
+        for index, band in enumerate(self._bands(tokens)):
+            candidates |= self._buckets.get((index, band), set())
+
+        now = time.monotonic()
+        best: Optional[Tuple[str, Any, float]] = None
+        # Jaccard >= t needs t * |larger| <= |smaller|
+        min_size = self.threshold * len(tokens)
+        max_size = len(tokens) / self.threshold if self.threshold else float("inf")
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if now - entry.stored_at > self.max_age:
+                self._remove(entry_id)
+                continue
+            if not min_size <= len(entry.tokens) <= max_size:
+                continue
+            similarity = jaccard(tokens, entry.tokens)
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (entry.query, entry.value, similarity)
+        return best
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "buckets": len(self._buckets)}
@@ -0,0 +1,124 @@
+"""Prebuilt per-(provider, model, prompt version, tool set) request templates.
+
+Converting tool declarations, building provider generation configs and
+rendering the system prompt give the same result on every request. A
+RequestTemplate does that work once; each request then clones the config and
+splices the current time into the pre-split prompt. The prompt halves are
+localised once per timezone and cached on the template.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.base_provider import BaseLLMProvider
+from app.services.system_prompts import (
+    CALENDAR_SYSTEM_PROMPT,
+    PROMPT_VERSION,
+    format_current_time,
+    localize_prompt,
+    prompt_for_version,
+    split_system_prompt,
+)
+from app.services.tools import get_tools_for_provider
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+TemplateKey = Tuple[str, str, str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    """Immutable request skeleton. Do not mutate ``tools`` or the config."""
+
+    provider: str
+    model: str
+    prompt_version: str
+    tool_names: Tuple[str, ...]
+    tools: Tuple[Dict[str, Any], ...]
+    system_prompt_head: str
+    system_prompt_tail: str
+    generation_config: Any
+    clone_config: Callable[[Any], Any]
+    # timezone -> (head, tail) with the zone filled in
+    _localized: Dict[str, Tuple[str, str]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def prompt_parts(self, timezone: str) -> Tuple[str, str]:
+        """Prompt head and tail for a timezone, built on first use."""
+        parts = self._localized.get(timezone)
+        if parts is None:
+            parts = (
+                localize_prompt(self.system_prompt_head, timezone),
+                localize_prompt(self.system_prompt_tail, timezone),
+            )
+            self._localized[timezone] = parts
+        return parts
+
+    def render_system_prompt(
+        self, now: Optional[datetime] = None, locale: UserLocale = DEFAULT_LOCALE
+    ) -> str:
+        """The system prompt for the user's timezone with the current time
+        spliced in."""
+        head, tail = self.prompt_parts(locale.timezone)
+        return head + format_current_time(now, locale.tz) + tail
+
+    def new_config(self) -> Any:
+        """A per-request copy of the generation config, safe to modify."""
+        return self.clone_config(self.generation_config)
+
+
+class RequestTemplateRegistry:
+    """Builds templates on first use and hands out the cached instance after."""
+
+    def __init__(self, prompts: Optional[Dict[str, str]] = None):
+        # prompt version -> prompt text containing the time placeholder;
+        # other versions (scoped variants) come from prompt_for_version
+        self.prompts = prompts or {PROMPT_VERSION: CALENDAR_SYSTEM_PROMPT}
+        self._templates: Dict[TemplateKey, RequestTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        provider_instance: BaseLLMProvider,
+        provider: str,
+        model: str,
+        tool_names: Tuple[str, ...],
+        prompt_version: str = PROMPT_VERSION,
+    ) -> RequestTemplate:
+        key = (provider, model, prompt_version, tool_names)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                template = self._build(provider_instance, key)
+                self._templates[key] = template
+        return template
+
+    def _build(
+        self, provider_instance: BaseLLMProvider, key: TemplateKey
+    ) -> RequestTemplate:
+        provider, model, prompt_version, names = key
+        print(f"🔍 DEBUG: Building request template for {key}")
+        tools = tuple(get_tools_for_provider(provider, names)) if names else ()
+        prompt = self.prompts.get(prompt_version) or prompt_for_version(prompt_version)
+        head, tail = split_system_prompt(prompt)
+        template = RequestTemplate(
+            provider=provider,
+            model=model,
+            prompt_version=prompt_version,
+            tool_names=names,
+            tools=tools,
+            system_prompt_head=head,
+            system_prompt_tail=tail,
+            generation_config=provider_instance.build_generation_config(list(tools)),
+            clone_config=provider_instance.clone_generation_config,
+        )
+        template.prompt_parts(DEFAULT_LOCALE.timezone)
+        return template
+
+    def __len__(self) -> int:
+        return len(self._templates)
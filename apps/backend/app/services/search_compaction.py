@@ -0,0 +1,223 @@
+"""Token-budgeted compaction of web search results before they reach the model.
+
+The webSearch tool result is injected into the next model call, so its size
+goes straight into that call's prompt latency. Results are deduplicated (same
+canonical URL or near-identical snippet), stripped of SerpAPI boilerplate,
+ranked by overlap with the query and cut to a token budget; URLs are
+canonicalised and shown without scheme, ``www.`` or tracking parameters.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from app.services.metrics import registry
+from app.services.query_dedup import jaccard, normalize_query
+
+SEARCH_RESULT_TOKENS = registry.histogram(
+    "web_search_result_tokens",
+    "Estimated tokens of formatted webSearch tool results by stage (raw/compact)",
+    ["stage"],
+    buckets=(50, 100, 200, 300, 400, 600, 800, 1200, 2000, 4000),
+)
+SEARCH_RESULT_TOKENS_SAVED = registry.histogram(
+    "web_search_result_tokens_saved",
+    "Estimated prompt tokens removed from a webSearch tool result by compaction",
+    buckets=(0, 25, 50, 100, 200, 400, 800, 1600),
+)
+
+TRACKING_PARAMS = re.compile(
+    r"^(utm_.*|gclid|fbclid|msclkid|mc_[a-z]+|ref|ref_src|srsltid|igshid|_ga|si)$"
+)
+# SerpAPI snippet noise: "Missing: foo | Show results with: foo", leading
+# "3 days ago —" dates are kept since they tell the model how fresh a hit is
+_SNIPPET_NOISE = re.compile(r"\s*(?:Missing:|Show results with:|Must include:).*$")
+_ELLIPSIS = re.compile(r"\s*(?:\.\.\.|…)\s*")
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), as the fake provider uses."""
+    return (len(text) + 3) // 4
+
+
+def canonicalize_url(url: str) -> str:
+    """Stable display form: no scheme, www., fragment, tracking params or
+    trailing slash."""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    host = host.removesuffix(":443").removesuffix(":80")
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not TRACKING_PARAMS.match(key.lower())
+        ]
+    )
+    path = parts.path.rstrip("/")
+    return host + path + (f"?{query}" if query else "")
+
+
+def clean_snippet(snippet: str) -> str:
+    snippet = _SNIPPET_NOISE.sub("", snippet or "")
+    snippet = _ELLIPSIS.sub(" ", snippet)
+    return " ".join(snippet.split())
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut at a sentence end if one is close, else at a word boundary."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentence_end = cut.rfind(". ")
+    if sentence_end >= limit * 0.6:
+        return cut[: sentence_end + 1]
+    return cut.rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+@dataclass
+class _Hit:
+    rank: int
+    title: str
+    snippet: str
+    url: str
+    score: float
+
+
+@dataclass
+class CompactedResults:
+    content: str
+    raw_tokens: int
+    compact_tokens: int
+    kept: int
+    dropped_duplicates: int
+    dropped_budget: int
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "raw_tokens": self.raw_tokens,
+            "compact_tokens": self.compact_tokens,
+            "tokens_saved": self.raw_tokens - self.compact_tokens,
+            "kept": self.kept,
+            "dropped_duplicates": self.dropped_duplicates,
+            "dropped_budget": self.dropped_budget,
+        }
+
+
+def format_results_verbose(query: str, result: Dict[str, Any]) -> str:
+    """The original markdown block per hit (title, snippet, URL)."""
+    content = f"Web search results for '{query}':\n\n"
+    if result.get("error"):
+        return content + f"Error: {result['error']}\n"
+    for i, hit in enumerate(result.get("results", []), 1):
+        content += f"{i}. **{hit.get('title', 'No title')}**\n"
+        content += f"   {hit.get('snippet', 'No description')}\n"
+        content += f"   {hit.get('url', 'No URL')}\n\n"
+    return content
+
+
+def _score(query_tokens: FrozenSet[str], hit: Dict[str, Any], rank: int) -> float:
+    text_tokens = normalize_query(f"{hit.get('title', '')} {hit.get('snippet', '')}")
+    overlap = len(query_tokens & text_tokens) / len(query_tokens) if query_tokens else 0
+    # Search engine rank still carries signal; overlap decides close calls
+    return overlap + 1.0 / (rank + 1)
+
+
+def compact_search_results(
+    query: str,
+    result: Dict[str, Any],
+    token_budget: int = 400,
+    max_snippet_tokens: int = 60,
+    duplicate_threshold: float = 0.8,
+) -> CompactedResults:
+    """Compact a ``WebSearchService.search`` result into a budgeted prompt block."""
+    raw = format_results_verbose(query, result)
+    raw_tokens = estimate_tokens(raw)
+    header = f"Web search results for '{query}':\n"
+    if result.get("error"):
+        content = header + f"Error: {result['error']}\n"
+        return CompactedResults(content, raw_tokens, estimate_tokens(content), 0, 0, 0)
+
+    query_tokens = normalize_query(query)
+    hits: List[_Hit] = []
+    seen_urls = set()
+    seen_snippets: List[FrozenSet[str]] = []
+    duplicates = 0
+    for rank, item in enumerate(result.get("results", [])):
+        url = canonicalize_url(item.get("url", ""))
+        snippet = clean_snippet(item.get("snippet", ""))
+        words = frozenset(_WORD_RE.findall(snippet.lower()))
+        if (url and url in seen_urls) or (
+            words
+            and any(
+                jaccard(words, seen) >= duplicate_threshold for seen in seen_snippets
+            )
+        ):
+            duplicates += 1
+            continue
+        seen_urls.add(url)
+        if words:
+            seen_snippets.append(words)
+        hits.append(
+            _Hit(
+                rank=rank,
+                title=" ".join((item.get("title") or "").split()),
+                snippet=_truncate(snippet, max_snippet_tokens),
+                url=url,
+                score=_score(query_tokens, item, rank),
+            )
+        )
+
+    lines: List[str] = []
+    used = estimate_tokens(header)
+    dropped = 0
+    for hit in sorted(hits, key=lambda h: -h.score):
+        line = f"{len(lines) + 1}. {hit.title}"
+        if hit.snippet:
+            line += f" — {hit.snippet}"
+        if hit.url:
+            line += f" ({hit.url})"
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            # Fit a shorter snippet if a useful amount of budget is left
+            room = token_budget - used - estimate_tokens(f"{hit.title} ({hit.url})") - 4
+            if lines and room < 12:
+                dropped += 1
+                continue
+            line = f"{len(lines) + 1}. {hit.title}"
+            if hit.snippet and room >= 12:
+                line += f" — {_truncate(hit.snippet, room)}"
+            if hit.url:
+                line += f" ({hit.url})"
+            cost = estimate_tokens(line) + 1
+        lines.append(line)
+        used += cost
+
+    content = header + "\n".join(lines) + "\n" if lines else header + "No results.\n"
+    return CompactedResults(
+        content=content,
+        raw_tokens=raw_tokens,
+        compact_tokens=estimate_tokens(content),
+        kept=len(lines),
+        dropped_duplicates=duplicates,
+        dropped_budget=dropped,
+    )
+
+
+def observe_compaction(compacted: Optional[CompactedResults]) -> None:
+    if compacted is None:
+        return
+    SEARCH_RESULT_TOKENS.observe(compacted.raw_tokens, stage="raw")
+    SEARCH_RESULT_TOKENS.observe(compacted.compact_tokens, stage="compact")
+    SEARCH_RESULT_TOKENS_SAVED.observe(
+        max(0, compacted.raw_tokens - compacted.compact_tokens)
+    )
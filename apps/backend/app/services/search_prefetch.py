@@ -0,0 +1,163 @@
+"""Speculative web search started alongside the first model call."""
+
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from app.services.metrics import registry
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+WEB_SEARCH_PREFIX = "🔍 Web Search:"
+
+SEARCH_PREFETCH = registry.counter(
+    "web_search_prefetch_total",
+    "Speculative web searches by outcome (hit/miss/unused)",
+    ["outcome"],
+)
+SEARCH_PREFETCH_SAVED = registry.histogram(
+    "web_search_prefetch_saved_seconds",
+    "Search latency hidden behind the first model call on prefetch hits",
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# (query, max_results, locale, deadline) -> results
+SearchFn = Callable[[str, int, UserLocale, Optional[float]], Awaitable[Dict[str, Any]]]
+
+
+def query_tokens(query: str) -> FrozenSet[str]:
+    return frozenset(_TOKEN_RE.findall(query.lower()))
+
+
+def query_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the two queries' word sets."""
+    tokens_a, tokens_b = query_tokens(a), query_tokens(b)
+    if not tokens_a or not tokens_b:
+        return 1.0 if tokens_a == tokens_b else 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+class SearchPrefetch:
+    """One in-flight speculative search.
+
+    The model's webSearch call claims it when the query is similar enough.
+    ``keep_if_wanted`` cancels it as soon as the model's first webSearch calls
+    turn out not to match, and ``close`` once the request is done.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        max_results: int,
+        search: SearchFn,
+        min_similarity: float,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ):
+        self.query = query
+        self.max_results = max_results
+        self.locale = locale
+        self.deadline = deadline
+        self.min_similarity = min_similarity
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.claimed = False
+        self.missed = False
+        self.closed = False
+        self.task = asyncio.create_task(self._run(search))
+
+    async def _run(self, search: SearchFn) -> Dict[str, Any]:
+        try:
+            return await search(
+                self.query, self.max_results, self.locale, self.deadline
+            )
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def answers(self, query: str, max_results: int) -> bool:
+        return (
+            max_results <= self.max_results
+            and query_similarity(self.query, query) >= self.min_similarity
+        )
+
+    def keep_if_wanted(self, searches: Iterable[Tuple[str, int]]) -> None:
+        """Cancel the search now unless one of ``searches`` can claim it.
+
+        ``searches`` are the (query, max_results) of one model step's
+        webSearch calls; a later step won't ask for what this one didn't.
+        """
+        searches = list(searches)
+        if self.closed or self.claimed or not searches:
+            return
+        if not any(self.answers(query, n) for query, n in searches):
+            self.missed = True
+            print(f"🔍 DEBUG: Prefetch for '{self.query}' unused, cancelling")
+            self.close()
+
+    async def claim(self, query: str, max_results: int) -> Optional[Dict[str, Any]]:
+        """Result of the prefetch if it answers ``query``, else None."""
+        if self.closed or self.claimed:
+            return None
+        similarity = query_similarity(self.query, query)
+        if not self.answers(query, max_results):
+            print(
+                f"🔍 DEBUG: Prefetch miss: '{self.query}' vs '{query}' "
+                f"(similarity {similarity:.2f})"
+            )
+            self.missed = True
+            return None
+
+        self.claimed = True
+        claimed_at = time.perf_counter()
+        result = await self.task
+        # Whatever ran before the model asked for it is latency the user skipped
+        saved = min(self.finished_at or claimed_at, claimed_at) - self.started_at
+        SEARCH_PREFETCH.inc(outcome="hit")
+        SEARCH_PREFETCH_SAVED.observe(saved)
+        print(f"🔍 DEBUG: Prefetch hit for '{query}', saved {saved * 1000:.0f}ms")
+        if max_results < self.max_results:
+            result = {**result, "results": result.get("results", [])[:max_results]}
+        return result
+
+    def close(self) -> None:
+        """Cancel the search unless it was claimed, and record the outcome."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.claimed:
+            return
+        self.task.cancel()
+        SEARCH_PREFETCH.inc(outcome="miss" if self.missed else "unused")
+
+
+class SearchPrefetcher:
+    """Starts speculative searches for messages with the web search prefix."""
+
+    def __init__(
+        self,
+        search: SearchFn,
+        enabled: bool = True,
+        min_similarity: float = 0.5,
+        max_results: int = 5,
+    ):
+        self.search = search
+        self.enabled = enabled
+        self.min_similarity = min_similarity
+        self.max_results = max_results
+
+    def start(
+        self,
+        user_message: str,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> Optional[SearchPrefetch]:
+        if not self.enabled or not user_message.startswith(WEB_SEARCH_PREFIX):
+            return None
+        query = user_message[len(WEB_SEARCH_PREFIX) :].strip()
+        if not query:
+            return None
+        print(f"🔍 DEBUG: Prefetching web search for '{query}'")
+        return SearchPrefetch(
+            query, self.max_results, self.search, self.min_similarity, locale, deadline
+        )
@@ -0,0 +1,341 @@
+"""Key-value state shared by every worker of a deployment.
+
+Caches and per-user sessions used to live in module-level dicts, which
+fragment as soon as uvicorn runs more than one worker process: a web search
+cached by one worker is a miss on the others, and an agenda synced to one
+worker is invisible to the next request. Services keep that state in a
+``StateStore`` instead:
+
+- ``MemoryStore``: per-process LRU dict, the default for a single worker
+- ``SQLiteStore``: one SQLite database in WAL mode shared by all workers on
+  a host (readers never block the writer, writes are single statements)
+
+Store calls are synchronous and made from the event loop, so a SQLite call
+waits at most ``STATE_STORE_BUSY_TIMEOUT_MS`` for another worker's write
+lock and then degrades to a cache miss: ``get`` returns None, ``set`` and
+``delete`` are dropped, ``add`` stores nothing and ``keys`` is empty. Only
+``incr`` raises, since a counter has no miss to fall back on.
+
+The interface follows Redis (GET/SET EX/SET NX/DEL/INCR/SCAN) so a
+Redis-compatible server can be added as another backend for multi-host
+deployments. Values are JSON-compatible; ``MemoryStore`` keeps them as-is,
+so callers must treat values they read as read-only.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import fast_json
+from app.core.config import settings
+from app.services.metrics import registry
+
+STATE_STORE_BUSY = registry.counter(
+    "state_store_busy_total",
+    "State store calls given up on another worker's SQLite write lock",
+    ["op"],
+)
+
+# Expired SQLite rows are deleted every this many writes per process
+PURGE_EVERY_WRITES = 1000
+
+
+class StateStore(ABC):
+    """Redis-shaped key-value store with JSON values and optional TTLs."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """The value for ``key``, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; it expires after ``ttl`` seconds if given."""
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store ``value`` only if ``key`` is absent; True if it was stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Add to an integer counter and return the new value.
+
+        ``ttl`` applies when the counter is created, so fixed-window rate
+        counters reset on their own.
+        """
+
+    @abstractmethod
+    def keys(self, prefix: str = "") -> List[str]:
+        """Live keys starting with ``prefix``."""
+
+
+class MemoryStore(StateStore):
+    """Per-process store, evicting least recently used keys past ``max_entries``."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        # key -> (expires_at monotonic or None, value)
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def _live(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at = entry[0]
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return entry
+
+    def _put(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def get(self, key: str) -> Any:
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._put(key, value, self._expiry(ttl))
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._put(key, value, self._expiry(ttl))
+        return True
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        entry = self._live(key)
+        if entry is None:
+            value, expires_at = amount, self._expiry(ttl)
+        else:
+            value, expires_at = int(entry[1]) + amount, entry[0]
+        self._put(key, value, expires_at)
+        return value
+
+    def keys(self, prefix: str = "") -> List[str]:
+        return [
+            key
+            for key in list(self._data)
+            if key.startswith(prefix) and self._live(key)
+        ]
+
+
+class SQLiteStore(StateStore):
+    """Store in a SQLite database in WAL mode, shared by processes on one host.
+
+    Each thread gets its own connection in autocommit mode; every operation
+    is a single statement, so concurrent workers never see partial writes.
+    Expiry uses wall-clock time since monotonic clocks aren't shared between
+    processes.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: Optional[int] = None):
+        self.path = path
+        self.busy_timeout_ms = (
+            settings.STATE_STORE_BUSY_TIMEOUT_MS
+            if busy_timeout_ms is None
+            else busy_timeout_ms
+        )
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            # Durable across process crashes, not power loss; fine for caches
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl is not None else None
+
+    def _execute(self, op: str, sql: str, params: Any = ()) -> Optional[sqlite3.Cursor]:
+        """Run one statement, or None if the database stayed locked."""
+        try:
+            return self._conn().execute(sql, params)
+        except sqlite3.OperationalError as exc:
+            if exc.sqlite_errorcode & 0xFF not in (
+                sqlite3.SQLITE_BUSY,
+                sqlite3.SQLITE_LOCKED,
+            ):
+                raise
+            STATE_STORE_BUSY.inc(op=op)
+            return None
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self.purge_expired()
+
+    def get(self, key: str) -> Any:
+        cursor = self._execute(
+            "get",
+            "SELECT value FROM kv WHERE key = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        return fast_json.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        cursor = self._execute(
+            "set",
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = excluded.value, expires_at = excluded.expires_at",
+            (key, fast_json.dumps_str(value), self._expiry(ttl)),
+        )
+        if cursor is not None:
+            self._wrote()
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        cursor = self._execute(
+            "add",
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+            (key, fast_json.dumps_str(value), self._expiry(ttl), now),
+        )
+        if cursor is None:
+            return False
+        self._wrote()
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        self._execute("delete", "DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        row = (
+            self._conn()
+            .execute(
+                "INSERT INTO kv (key, value, expires_at) "
+                "VALUES (:key, :amount, :expires_at) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "value = CASE WHEN kv.expires_at <= :now THEN excluded.value "
+                "ELSE CAST(kv.value AS INTEGER) + :amount END, "
+                "expires_at = CASE WHEN kv.expires_at <= :now "
+                "THEN excluded.expires_at ELSE kv.expires_at END "
+                "RETURNING value",
+                {
+                    "key": key,
+                    "amount": amount,
+                    "expires_at": self._expiry(ttl),
+                    "now": now,
+                },
+            )
+            .fetchone()
+        )
+        self._wrote()
+        return int(row[0])
+
+    def keys(self, prefix: str = "") -> List[str]:
+        cursor = self._execute(
+            "keys",
+            "SELECT key FROM kv WHERE substr(key, 1, ?) = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (len(prefix), prefix, time.time()),
+        )
+        return [row[0] for row in cursor.fetchall()] if cursor is not None else []
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        cursor = self._execute(
+            "purge",
+            "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        return cursor.rowcount if cursor is not None else 0
+
+
+class NamespacedStore(StateStore):
+    """A view of a shared store with every key prefixed by ``namespace:``."""
+
+    def __init__(self, store: StateStore, namespace: str):
+        self.store = store
+        self.prefix = f"{namespace}:"
+
+    def get(self, key: str) -> Any:
+        return self.store.get(self.prefix + key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.store.set(self.prefix + key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return self.store.add(self.prefix + key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.store.delete(self.prefix + key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        return self.store.incr(self.prefix + key, amount, ttl)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        start = len(self.prefix)
+        return [key[start:] for key in self.store.keys(self.prefix + prefix)]
+
+
+def create_store(url: str) -> StateStore:
+    """Build a backend from a URL: ``memory://`` or ``sqlite:///path/to.db``."""
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///") :])
+    raise ValueError(
+        f"Unsupported STATE_STORE_URL '{url}' (expected memory:// or sqlite:///)"
+    )
+
+
+_shared_stores: Dict[str, StateStore] = {}
+
+
+def state_store(namespace: str, max_entries: Optional[int] = None) -> StateStore:
+    """The store a service keeps its state in, per ``STATE_STORE_URL``.
+
+    With the memory backend each namespace gets its own LRU bounded by
+    ``max_entries``; shared backends are bounded by the TTLs callers set.
+    """
+    url = settings.STATE_STORE_URL
+    if url.startswith("memory://"):
+        return MemoryStore(max_entries)
+    store = _shared_stores.get(url)
+    if store is None:
+        store = _shared_stores[url] = create_store(url)
+        print(f"🔍 DEBUG: Shared state store at {url}")
+    return NamespacedStore(store, namespace)
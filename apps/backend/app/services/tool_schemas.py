@@ -0,0 +1,296 @@
+"""Validation and local repair of tool calls against ``CALENDAR_TOOLS``.
+
+Each tool's parameter schema is compiled once, at import, into a validator
+for the JSON Schema subset the declarations use (``type``, ``properties``,
+``required``, ``enum``). Date-time fields must also be RFC3339 with an
+offset, which the schemas only state in prose, and an event must end after
+it starts.
+
+``check_tool_calls`` runs on every model response. Common mistakes are
+fixed without another model call:
+
+- date-times without an offset (or a date only, or ``2025-10-21 14:00``)
+  are read in the event's timezone, else the user's, and written as RFC3339,
+- ``start``/``end`` given as a bare string are wrapped as ``{"dateTime": ...}``,
+- an event ending before it starts, or a confirmation draft without an
+  end, gets the prompt's default duration of one hour; missing time zones
+  and a draft's missing title ("Meeting") take the prompt's defaults too,
+- enum values in the wrong case and numbers sent as strings are coerced.
+
+Calls that still fail are left as they are; ``tool_call_errors`` reports
+why, and the agent loop sends that back to the model.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core import fast_json
+from app.services.metrics import registry
+from app.services.tools import CALENDAR_TOOLS
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale, get_zone
+
+TOOL_CALL_CHECKS = registry.counter(
+    "tool_call_checks_total",
+    "Model tool calls by tool and outcome (valid, repaired, invalid)",
+    ["tool", "outcome"],
+)
+TOOL_CALL_REPAIRS = registry.counter(
+    "tool_call_repairs_total",
+    "Local fixes applied to model tool calls, by tool and kind",
+    ["tool", "repair"],
+)
+
+# (value, path) -> "path: problem" strings
+Validator = Callable[[Any, str], List[str]]
+
+_TYPES = {
+    "object": dict,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+}
+
+RFC3339_RE = re.compile(
+    r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})$"
+)
+DEFAULT_DURATION = timedelta(hours=1)
+DEFAULT_TITLE = "Meeting"
+
+# Where each tool keeps its date-times, and its event body for write tools
+DATETIME_PATHS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "getEvents": (("timeMin",), ("timeMax",)),
+    "handleEventConfirmation": (
+        ("eventDetails", "start", "dateTime"),
+        ("eventDetails", "end", "dateTime"),
+    ),
+    "updateEvent": (("start", "dateTime"), ("end", "dateTime")),
+}
+EVENT_PATHS: Dict[str, Tuple[str, ...]] = {
+    "handleEventConfirmation": ("eventDetails",),
+    "updateEvent": (),
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """Validator for ``schema``, with its checks resolved up front."""
+    expected = schema.get("type")
+    kind = _TYPES[expected] if expected else None
+    # bool is an int subclass; don't let True pass as a number
+    reject_bool = expected not in (None, "boolean")
+    enum = schema.get("enum")
+    required = tuple(schema.get("required", ()))
+    properties = tuple(
+        (name, compile_schema(subschema))
+        for name, subschema in schema.get("properties", {}).items()
+    )
+
+    def validate(value: Any, path: str = "") -> List[str]:
+        if kind is not None and (
+            not isinstance(value, kind) or (reject_bool and isinstance(value, bool))
+        ):
+            return [f"{path}: expected {expected}"]
+        if enum is not None and value not in enum:
+            return [f"{path}: not one of {enum}"]
+        if not isinstance(value, dict):
+            return []
+        errors = [f"{path}.{name}: missing" for name in required if name not in value]
+        for name, check in properties:
+            if name in value:
+                errors.extend(check(value[name], f"{path}.{name}"))
+        return errors
+
+    return validate
+
+
+TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    tool["function"]["name"]: tool["function"]["parameters"] for tool in CALENDAR_TOOLS
+}
+VALIDATORS: Dict[str, Validator] = {
+    name: compile_schema(schema) for name, schema in TOOL_SCHEMAS.items()
+}
+
+
+def _get_path(value: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _argument_errors(name: str, args: Any) -> List[str]:
+    errors = VALIDATORS[name](args, "")
+    times = []
+    for path in DATETIME_PATHS.get(name, ()):
+        value = _get_path(args, path)
+        if not isinstance(value, str):
+            continue
+        if RFC3339_RE.match(value):
+            times.append(datetime.fromisoformat(value))
+        else:
+            errors.append(f".{'.'.join(path)}: not RFC3339 with an offset")
+    if name in EVENT_PATHS and len(times) == 2 and times[1] <= times[0]:
+        errors.append(".end: not after start")
+    return [f"{name}{error}" for error in errors]
+
+
+def _parse_arguments(tool_call: Dict[str, Any]) -> Any:
+    """Decoded arguments; raises ``json.JSONDecodeError``."""
+    return json.loads(tool_call.get("function", {}).get("arguments") or "{}")
+
+
+def tool_call_errors(tool_call: Dict[str, Any]) -> List[str]:
+    """Problems with a tool call's name or arguments; empty when it is valid."""
+    name = tool_call.get("function", {}).get("name", "")
+    if name not in VALIDATORS:
+        return [f"unknown tool {name!r}"]
+    try:
+        args = _parse_arguments(tool_call)
+    except json.JSONDecodeError:
+        return [f"{name}: arguments are not valid JSON"]
+    return _argument_errors(name, args)
+
+
+def parse_datetime(value: str, tz: ZoneInfo) -> Optional[datetime]:
+    """A model-written date or date-time, in ``tz`` if it has no offset."""
+    try:
+        parsed = datetime.fromisoformat(value.strip().upper())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed
+
+
+def _coerce(schema: Dict[str, Any], value: Any) -> Tuple[Any, Optional[str]]:
+    """Fix an enum value's case or a number sent as a string."""
+    enum = schema.get("enum")
+    if enum is not None and isinstance(value, str) and value not in enum:
+        for option in enum:
+            if value.strip().lower() == str(option).lower():
+                return option, "enum_case"
+    if schema.get("type") == "integer" and isinstance(value, str):
+        if value.strip().isdigit():
+            return int(value), "integer"
+    return value, None
+
+
+def _coerce_all(schema: Dict[str, Any], value: Any, repairs: List[str]) -> Any:
+    value, repair = _coerce(schema, value)
+    if repair:
+        repairs.append(repair)
+    if isinstance(value, dict):
+        for name, subschema in schema.get("properties", {}).items():
+            if name in value:
+                value[name] = _coerce_all(subschema, value[name], repairs)
+    return value
+
+
+def _repair_event(
+    event: Dict[str, Any], draft: bool, locale: UserLocale, repairs: List[str]
+) -> None:
+    """Fix the start/end (and, for drafts, title) of an event body in place."""
+    times: Dict[str, datetime] = {}
+    for key in ("start", "end"):
+        if isinstance(event.get(key), str):
+            event[key] = {"dateTime": event[key]}
+            repairs.append("wrap_datetime")
+        block = event.get(key)
+        if not isinstance(block, dict) or not isinstance(block.get("dateTime"), str):
+            continue
+        zone_name = block.get("timeZone")
+        zone = get_zone(zone_name) if isinstance(zone_name, str) else None
+        if zone is None:
+            block["timeZone"] = locale.timezone
+            zone = locale.tz
+            repairs.append("timezone")
+        value = block["dateTime"]
+        parsed = parse_datetime(value, zone)
+        if parsed is None:
+            continue
+        times[key] = parsed
+        if not RFC3339_RE.match(value):
+            block["dateTime"] = parsed.isoformat(timespec="seconds")
+            repairs.append("rfc3339")
+
+    if "start" not in times:
+        return
+    start = times["start"]
+    # Only a draft can be given an end it didn't have
+    if ("end" in times and times["end"] <= start) or (draft and "end" not in times):
+        end = start + DEFAULT_DURATION
+        event["end"] = {
+            "dateTime": end.isoformat(timespec="seconds"),
+            "timeZone": event["start"].get("timeZone", locale.timezone),
+        }
+        repairs.append("default_duration")
+    if draft and not str(event.get("summary") or "").strip():
+        event["summary"] = DEFAULT_TITLE
+        repairs.append("default_title")
+
+
+def repair_arguments(
+    name: str, args: Dict[str, Any], locale: UserLocale = DEFAULT_LOCALE
+) -> List[str]:
+    """Fix ``args`` for tool ``name`` in place; returns the repairs made."""
+    repairs: List[str] = []
+    _coerce_all(TOOL_SCHEMAS[name], args, repairs)
+
+    if name in EVENT_PATHS:
+        event = _get_path(args, EVENT_PATHS[name])
+        if isinstance(event, dict):
+            _repair_event(event, name == "handleEventConfirmation", locale, repairs)
+    else:
+        for (key,) in DATETIME_PATHS.get(name, ()):
+            value = args.get(key)
+            if not isinstance(value, str) or RFC3339_RE.match(value):
+                continue
+            parsed = parse_datetime(value, locale.tz)
+            if parsed is not None:
+                args[key] = parsed.isoformat(timespec="seconds")
+                repairs.append("rfc3339")
+    return repairs
+
+
+def check_tool_call(
+    tool_call: Dict[str, Any], locale: UserLocale = DEFAULT_LOCALE
+) -> Tuple[Dict[str, Any], List[str]]:
+    """The call, repaired if needed, and any errors left after repair."""
+    name = tool_call.get("function", {}).get("name", "")
+    errors = tool_call_errors(tool_call)
+    if not errors:
+        TOOL_CALL_CHECKS.inc(tool=name, outcome="valid")
+        return tool_call, []
+    if name not in VALIDATORS:
+        TOOL_CALL_CHECKS.inc(tool=name or "unknown", outcome="invalid")
+        return tool_call, errors
+
+    try:
+        args = _parse_arguments(tool_call)
+    except json.JSONDecodeError:
+        args = None
+    repairs = repair_arguments(name, args, locale) if isinstance(args, dict) else []
+    remaining = _argument_errors(name, args) if repairs else errors
+    if repairs and not remaining:
+        for repair in repairs:
+            TOOL_CALL_REPAIRS.inc(tool=name, repair=repair)
+        TOOL_CALL_CHECKS.inc(tool=name, outcome="repaired")
+        print(f"🔍 DEBUG: Repaired {name} call ({', '.join(repairs)}): {errors}")
+        function = {**tool_call["function"], "arguments": fast_json.dumps_str(args)}
+        return {**tool_call, "function": function}, []
+
+    TOOL_CALL_CHECKS.inc(tool=name, outcome="invalid")
+    print(f"🔍 DEBUG: Invalid {name} call: {remaining}")
+    return tool_call, remaining
+
+
+def check_tool_calls(
+    tool_calls: List[Dict[str, Any]], locale: UserLocale = DEFAULT_LOCALE
+) -> List[Dict[str, Any]]:
+    """Every call, repaired where possible; see ``check_tool_call``."""
+    return [check_tool_call(call, locale)[0] for call in tool_calls]
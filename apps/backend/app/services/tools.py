@@ -1,6 +1,7 @@
 """Tool definitions for the AI Calendar Assistant."""
 
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 
@@ -227,29 +228,88 @@ CALENDAR_TOOLS = [
 ]
 
 
-def get_tools_for_provider(provider: str) -> List[Dict[str, Any]]:
-    """Get the appropriate tools format for the given provider."""
-    if provider == "openai":
-        return CALENDAR_TOOLS
-    elif provider == "anthropic":
+def _convert_tool(provider: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+    if provider == "anthropic":
         # Anthropic uses a different format
-        return [
-            {
-                "name": tool["function"]["name"],
-                "description": tool["function"]["description"],
-                "input_schema": tool["function"]["parameters"],
-            }
-            for tool in CALENDAR_TOOLS
-        ]
+        return {
+            "name": tool["function"]["name"],
+            "description": tool["function"]["description"],
+            "input_schema": tool["function"]["parameters"],
+        }
     elif provider == "gemini":
         # Gemini uses function declarations
-        return [
-            {
-                "name": tool["function"]["name"],
-                "description": tool["function"]["description"],
-                "parameters": tool["function"]["parameters"],
-            }
-            for tool in CALENDAR_TOOLS
-        ]
+        return {
+            "name": tool["function"]["name"],
+            "description": tool["function"]["description"],
+            "parameters": tool["function"]["parameters"],
+        }
     else:
-        return CALENDAR_TOOLS
+        return tool
+
+
+_CALENDAR_TOOL_NAMES = frozenset(tool["function"]["name"] for tool in CALENDAR_TOOLS)
+
+
+@lru_cache(maxsize=64)
+def _converted_tools(
+    provider: str, names: Optional[Tuple[str, ...]]
+) -> Tuple[Dict[str, Any], ...]:
+    return tuple(
+        _convert_tool(provider, tool)
+        for tool in CALENDAR_TOOLS
+        if names is None or tool["function"]["name"] in names
+    )
+
+
+def get_tools_for_provider(
+    provider: str, names: Optional[Iterable[str]] = None
+) -> List[Dict[str, Any]]:
+    """Get the appropriate tools format for the given provider.
+
+    Conversions are computed once and shared; treat the returned dicts as
+    read-only. ``names`` restricts the result to a subset of tools.
+    """
+    key = tuple(sorted(names)) if names is not None else None
+    return list(_converted_tools(provider, key))
+
+
+def _as_openai_tool(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """A tool in any provider format, in the OpenAI format of CALENDAR_TOOLS."""
+    if "function" in tool:
+        return tool
+    return {
+        "type": "function",
+        "function": {
+            "name": tool["name"],
+            "description": tool.get("description", ""),
+            "parameters": tool.get("input_schema")
+            or tool.get("parameters")
+            or {"type": "object", "properties": {}},
+        },
+    }
+
+
+def translate_tools(
+    tools: Optional[List[Dict[str, Any]]], provider: str
+) -> Optional[List[Dict[str, Any]]]:
+    """The caller's tool list, in any provider format, converted for ``provider``.
+
+    Keeps the caller's selection; calendar tools reuse the cached conversions.
+    """
+    if not tools:
+        return None
+    names = tool_names(tools)
+    if set(names) <= _CALENDAR_TOOL_NAMES:
+        return get_tools_for_provider(provider, names)
+    return [_convert_tool(provider, _as_openai_tool(tool)) for tool in tools]
+
+
+def tool_names(tools: Optional[Iterable[Dict[str, Any]]]) -> Tuple[str, ...]:
+    """Sorted tool names from a tool list in any provider format."""
+    if not tools:
+        return ()
+    return tuple(
+        sorted(
+            tool.get("name") or tool.get("function", {}).get("name") for tool in tools
+        )
+    )
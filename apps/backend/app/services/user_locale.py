@@ -0,0 +1,74 @@
+"""Per-request timezone and locale.
+
+The frontend sends the browser's IANA timezone and language tag with each
+request. Both resolve to a ``UserLocale`` once per distinct pair; zone
+objects and resolved locales are cached, so requests from any zone cost a
+dict lookup. Unknown zones fall back to Australia/Sydney, the app's original
+and still most common zone.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "Australia/Sydney"
+DEFAULT_LANGUAGE = "en"
+DEFAULT_COUNTRY = "au"
+
+# "en", "en-AU", "en_au", "zh-Hant-TW"
+_LOCALE_RE = re.compile(r"^([a-zA-Z]{2,3})(?:[-_][a-zA-Z]{4})?(?:[-_]([a-zA-Z]{2}))?$")
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str) -> Optional[ZoneInfo]:
+    """Cached ``ZoneInfo`` for an IANA name, or None if it isn't one."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+DEFAULT_TZ = get_zone(DEFAULT_TIMEZONE)
+
+
+@dataclass(frozen=True)
+class UserLocale:
+    """A user's timezone plus the language/country used for web search."""
+
+    timezone: str
+    tz: ZoneInfo
+    language: str = DEFAULT_LANGUAGE
+    # Two-letter country for SerpAPI's ``gl``; empty when not known
+    country: str = ""
+
+    @property
+    def locale(self) -> str:
+        if self.country:
+            return f"{self.language}-{self.country.upper()}"
+        return self.language
+
+
+@lru_cache(maxsize=1024)
+def resolve_locale(
+    timezone: Optional[str] = None, locale: Optional[str] = None
+) -> UserLocale:
+    """UserLocale for a request's timezone and BCP 47 locale, with fallbacks."""
+    zone = get_zone(timezone) if timezone else None
+    if zone is None:
+        if timezone:
+            print(f"🔍 DEBUG: Unknown timezone '{timezone}', using {DEFAULT_TIMEZONE}")
+        timezone, zone = DEFAULT_TIMEZONE, DEFAULT_TZ
+
+    language, country = DEFAULT_LANGUAGE, ""
+    match = _LOCALE_RE.match(locale.strip()) if locale else None
+    if match:
+        language = match.group(1).lower()
+        country = (match.group(2) or "").lower()
+    if not country and timezone == DEFAULT_TIMEZONE:
+        country = DEFAULT_COUNTRY
+    return UserLocale(timezone=timezone, tz=zone, language=language, country=country)
+
+
+DEFAULT_LOCALE = resolve_locale()
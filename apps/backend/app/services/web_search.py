@@ -1,9 +1,21 @@
 """Web search service using SerpAPI."""
 
 import asyncio
-from typing import Dict, Any
-from serpapi import GoogleSearch
+from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.services.deadlines import time_left
+from app.services.lazy_imports import LazyModule
+from app.services.metrics import (
+    WEB_SEARCH_CACHE,
+    WEB_SEARCH_LATENCY,
+    WEB_SEARCH_NEAR_DUP_SIMILARITY,
+    Timer,
+)
+from app.services.query_dedup import NearDuplicateIndex
+from app.services.state_store import state_store
+from app.services.user_locale import DEFAULT_LOCALE, UserLocale
+
+serpapi = LazyModule("serpapi")
 
 
 class WebSearchService:
@@ -11,14 +23,64 @@ class WebSearchService:
 
     def __init__(self):
         self.api_key = settings.SERPAPI_API_KEY
-
-    async def search(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+        self.cache_ttl = settings.WEB_SEARCH_CACHE_TTL_SECONDS
+        self.cache_max_entries = settings.WEB_SEARCH_CACHE_MAX_ENTRIES
+        # "normalized query|max_results|region" -> results, shared by workers
+        self._cache = state_store("web_search", self.cache_max_entries)
+        # Catches rephrasings the exact key misses ("man utd vs arsenal" and
+        # "manchester united arsenal match"); per process
+        self.near_duplicates = (
+            NearDuplicateIndex(
+                threshold=settings.WEB_SEARCH_NEAR_DUP_THRESHOLD,
+                max_age=settings.WEB_SEARCH_NEAR_DUP_MAX_AGE_SECONDS,
+                max_entries=self.cache_max_entries,
+            )
+            if settings.WEB_SEARCH_NEAR_DUP_ENABLED
+            else None
+        )
+
+    def _cache_get(self, key: str) -> Dict[str, Any] | None:
+        return self._cache.get(key)
+
+    def _cache_put(self, key: str, results: Dict[str, Any]) -> None:
+        self._cache.set(key, results, ttl=self.cache_ttl)
+
+    def _near_duplicate_get(
+        self, query: str, max_results: int, region: str
+    ) -> Dict[str, Any] | None:
+        if self.near_duplicates is None:
+            return None
+        match = self.near_duplicates.find(query)
+        if match is None:
+            return None
+        matched_query, (stored_max_results, stored_region, results), similarity = match
+        if stored_max_results < max_results or stored_region != region:
+            return None
+        WEB_SEARCH_NEAR_DUP_SIMILARITY.observe(similarity)
+        print(
+            f"🔍 DEBUG: Near-duplicate search hit: '{query}' ~ '{matched_query}' "
+            f"(similarity {similarity:.2f})"
+        )
+        if stored_max_results > max_results:
+            results = {**results, "results": results.get("results", [])[:max_results]}
+        return results
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 5,
+        locale: UserLocale = DEFAULT_LOCALE,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
         Perform a web search using SerpAPI.
 
         Args:
             query: The search query
             max_results: Maximum number of results to return
+            locale: The user's locale; its country and language bias results
+            deadline: The request's ``time.monotonic()`` deadline; bounds the
+                SerpAPI HTTP call so its executor thread is freed by then
 
         Returns:
             Dictionary containing search results
@@ -26,17 +88,45 @@ class WebSearchService:
         if not self.api_key:
             return {"error": "SerpAPI API key not configured", "results": []}
 
+        # Results differ by country and language, so they are cached per locale
+        region = locale.locale
+        cache_key = f"{' '.join(query.lower().split())}|{max_results}|{region}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            WEB_SEARCH_CACHE.inc(result="hit")
+            return cached
+        near = self._near_duplicate_get(query, max_results, region)
+        if near is not None:
+            WEB_SEARCH_CACHE.inc(result="near_hit")
+            return near
+        WEB_SEARCH_CACHE.inc(result="miss")
+        timeout = time_left(deadline)
+        if timeout == 0:
+            return {"error": "Search failed: request deadline exceeded", "results": []}
+
+        timer = Timer()
         try:
             # Run the search in a thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             results = await loop.run_in_executor(
-                None, self._perform_search, query, max_results
+                None, self._perform_search, query, max_results, locale, timeout
             )
+            WEB_SEARCH_LATENCY.observe(timer.elapsed(), outcome="ok")
+            self._cache_put(cache_key, results)
+            if self.near_duplicates is not None:
+                self.near_duplicates.add(query, (max_results, region, results))
             return results
         except Exception as e:
+            WEB_SEARCH_LATENCY.observe(timer.elapsed(), outcome="error")
             return {"error": f"Search failed: {str(e)}", "results": []}
 
-    def _perform_search(self, query: str, max_results: int) -> Dict[str, Any]:
+    def _perform_search(
+        self,
+        query: str,
+        max_results: int,
+        locale: UserLocale = DEFAULT_LOCALE,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Perform the actual search using SerpAPI (synchronous)."""
         try:
             search_params = {
@@ -44,11 +134,15 @@ class WebSearchService:
                 "api_key": self.api_key,
                 "num": max_results,
                 "engine": "google",
-                "gl": "au",  # Australia
-                "hl": "en",  # English
+                "hl": locale.language,
             }
+            if locale.country:
+                search_params["gl"] = locale.country
 
-            search = GoogleSearch(search_params)
+            search = serpapi.GoogleSearch(search_params)
+            if timeout is not None:
+                # Passed to requests.get; the client default is 60000 seconds
+                search.timeout = timeout
             results = search.get_dict()
 
             # Extract organic results
@@ -0,0 +1,482 @@
+"""Load test for /api/v1/chat/generate against local fake upstreams.
+
+Boots the FastAPI app in-process (one app per worker process), replaces the
+Gemini and SerpAPI clients with the fakes from ``benchmarks.fakes`` and drives
+a realistic mix of conversations:
+
+- ``plain``: a single chit-chat turn
+- ``get_events``: getEvents tool call, then the frontend posts tool results
+- ``web_search``: the backend-side two-call webSearch flow
+- ``confirmation``: handleEventConfirmation, then the card short-circuit
+
+Runs fully offline. Example:
+
+    uv run python -m benchmarks.chat_load --workers 2 --concurrency 16 \\
+        --conversations 200 --gemini-latency-ms 300 --max-p95-ms 1500
+
+``--timezones`` spreads requests across user timezones, to compare against a
+single-zone run.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+GENERATE_PATH = "/api/v1/chat/generate"
+
+# Provider/model sent with every request; set per worker from the CLI
+TARGET = {"provider": "gemini", "model": "gemini-2.5-flash"}
+
+DEFAULT_MIX = "plain=0.35,get_events=0.35,web_search=0.15,confirmation=0.15"
+
+# Content the endpoint returns (with HTTP 200) when an upstream call failed
+DEGRADED_MARKERS = (
+    "currently overloaded",
+    "temporarily unavailable",
+    "too many requests",
+    "unexpected error",
+)
+
+PLAIN_PROMPTS = [
+    "Hi there!",
+    "Thanks, that's all for now.",
+    "What can you help me with?",
+    "Good morning Calendara",
+]
+EVENT_PROMPTS = [
+    "What's on my calendar tomorrow?",
+    "Do I have any meetings today?",
+    "Show me my events next week",
+    "What's my next event?",
+]
+SEARCH_TOPICS = [
+    "Manchester United vs Arsenal match tomorrow",
+    "Taylor Swift concert Sydney",
+    "AI conference next month",
+    "Sydney weather this weekend",
+]
+CREATE_PROMPTS = [
+    "Add meeting with John tomorrow 2pm",
+    "Schedule a dentist appointment on Friday at 10am",
+    "Create a focus block this afternoon",
+]
+
+SAMPLE_EVENTS = [
+    {
+        "id": f"evt{i}",
+        "etag": f'"31{i}0000000000"',
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=evt{i}",
+        "summary": title,
+        "location": location,
+        "creator": {"email": "me@example.com", "self": True},
+        "organizer": {"email": "me@example.com", "self": True},
+        "start": {
+            "dateTime": f"2025-10-21T{10 + i * 2:02d}:00:00+11:00",
+            "timeZone": "Australia/Sydney",
+        },
+        "end": {
+            "dateTime": f"2025-10-21T{11 + i * 2:02d}:00:00+11:00",
+            "timeZone": "Australia/Sydney",
+        },
+        "reminders": {"useDefault": True},
+    }
+    for i, (title, location) in enumerate(
+        [("1:1 with Priya", "Zoom"), ("Design review", "Room 5"), ("Standup", "")]
+    )
+]
+
+CONFIRMATION_CARD = """<event_confirmation>
+**Title:** Meeting with John
+**Date & Time:** Tue 21 Oct 2025, 2:00 pm - 3:00 pm
+**Location:**
+**Description:**
+</event_confirmation>"""
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _payload(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "messages": messages,
+        "model_provider": TARGET["provider"],
+        "model_name": TARGET["model"],
+    }
+
+
+def _tool_followup(
+    history: List[Dict[str, Any]], response: Dict[str, Any], content: Any
+) -> List[Dict[str, Any]]:
+    """Build the follow-up the frontend posts after executing tool calls."""
+    results = [
+        {
+            "tool_call_id": call["id"],
+            "content": content if isinstance(content, str) else json.dumps(content),
+            "success": True,
+            "error": "",
+        }
+        for call in response.get("tool_calls") or []
+    ]
+    return history + [
+        {
+            "role": "assistant",
+            "content": response.get("content", ""),
+            "tool_calls": response.get("tool_calls") or [],
+        },
+        {"role": "tool", "content": json.dumps(results)},
+    ]
+
+
+async def scenario_plain(post, rng: random.Random):
+    await post(
+        "plain", _payload([{"role": "user", "content": rng.choice(PLAIN_PROMPTS)}])
+    )
+
+
+async def scenario_get_events(post, rng: random.Random):
+    history = [{"role": "user", "content": rng.choice(EVENT_PROMPTS)}]
+    first = await post("get_events", _payload(history))
+    if first and first.get("tool_calls"):
+        await post(
+            "get_events", _payload(_tool_followup(history, first, SAMPLE_EVENTS))
+        )
+
+
+async def scenario_web_search(post, rng: random.Random, unique: bool = False):
+    topic = rng.choice(SEARCH_TOPICS)
+    if unique:
+        topic = f"{topic} {rng.randrange(1_000_000)}"
+    await post(
+        "web_search",
+        _payload([{"role": "user", "content": f"🔍 Web Search: {topic}"}]),
+    )
+
+
+async def scenario_confirmation(post, rng: random.Random):
+    history = [{"role": "user", "content": rng.choice(CREATE_PROMPTS)}]
+    first = await post("confirmation", _payload(history))
+    if first and first.get("tool_calls"):
+        await post(
+            "confirmation",
+            _payload(_tool_followup(history, first, CONFIRMATION_CARD)),
+        )
+
+
+SCENARIOS = {
+    "plain": scenario_plain,
+    "get_events": scenario_get_events,
+    "web_search": scenario_web_search,
+    "confirmation": scenario_confirmation,
+}
+
+
+async def _drive(args: argparse.Namespace, worker_id: int) -> Dict[str, Any]:
+    import httpx
+
+    from benchmarks.fakes import UpstreamProfile, install_fakes
+
+    install_fakes(
+        gemini=UpstreamProfile(
+            latency_ms=args.gemini_latency_ms,
+            jitter_ms=args.gemini_jitter_ms,
+            error_rate=args.gemini_error_rate,
+            seed=args.seed + worker_id,
+        ),
+        search=UpstreamProfile(
+            latency_ms=args.search_latency_ms,
+            jitter_ms=args.search_jitter_ms,
+            error_rate=args.search_error_rate,
+            seed=args.seed + 1000 + worker_id,
+        ),
+    )
+    from app.main import app
+
+    rng = random.Random(args.seed + worker_id)
+    mix = parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    counters = {"requests": 0, "errors": 0, "degraded": 0}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        zones = [zone for zone in args.timezones.split(",") if zone]
+
+        async def post(scenario: str, payload: Dict[str, Any]) -> Optional[Dict]:
+            if zones:
+                payload = {**payload, "timezone": rng.choice(zones)}
+            start = time.perf_counter()
+            response = await client.post(GENERATE_PATH, json=payload)
+            latencies[scenario].append(time.perf_counter() - start)
+            counters["requests"] += 1
+            if response.status_code != 200:
+                counters["errors"] += 1
+                return None
+            body = response.json()
+            if any(m in body.get("content", "").lower() for m in DEGRADED_MARKERS):
+                counters["degraded"] += 1
+            return body
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(args.conversations):
+            queue.put_nowait(rng.choices(names, weights)[0])
+
+        async def worker():
+            while True:
+                try:
+                    name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if name == "web_search":
+                    await scenario_web_search(post, rng, unique=args.unique_queries)
+                else:
+                    await SCENARIOS[name](post, rng)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    from app.services.search_prefetch import SEARCH_PREFETCH, SEARCH_PREFETCH_SAVED
+
+    prefetch = {
+        outcome: SEARCH_PREFETCH.get(outcome=outcome)
+        for outcome in ("hit", "miss", "unused")
+    }
+    prefetch["saved_s"] = SEARCH_PREFETCH_SAVED.sum()
+
+    from app.services.search_compaction import SEARCH_RESULT_TOKENS
+
+    compaction = {
+        "results": SEARCH_RESULT_TOKENS.count(stage="raw"),
+        "raw_tokens": SEARCH_RESULT_TOKENS.sum(stage="raw"),
+        "compact_tokens": SEARCH_RESULT_TOKENS.sum(stage="compact"),
+    }
+
+    return {
+        "worker": worker_id,
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "prefetch": prefetch,
+        "compaction": compaction,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        **counters,
+    }
+
+
+def run_worker(args: argparse.Namespace, worker_id: int) -> Dict[str, Any]:
+    """Entry point for one worker process."""
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+    os.environ.setdefault("SERPAPI_API_KEY", "benchmark-fake-key")
+    if args.provider == "fake":
+        # The scripted provider replaces the faked Gemini SDK entirely
+        os.environ["FAKE_LLM_ENABLED"] = "1"
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(args.gemini_latency_ms)
+        os.environ["FAKE_LLM_FAULTS"] = args.fake_faults
+        TARGET.update(provider="fake", model="fake-model")
+    if not args.quiet:
+        return asyncio.run(_drive(args, worker_id))
+    # The backend logs debug prints and tracebacks on every request
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        return asyncio.run(_drive(args, worker_id))
+
+
+def _prefetch_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals = {
+        key: sum(r["prefetch"][key] for r in results)
+        for key in ("hit", "miss", "unused", "saved_s")
+    }
+    started = totals["hit"] + totals["miss"] + totals["unused"]
+    return {
+        "started": int(started),
+        "hit_rate": totals["hit"] / started if started else 0.0,
+        "avg_saved_ms": (
+            totals["saved_s"] / totals["hit"] * 1000 if totals["hit"] else 0.0
+        ),
+    }
+
+
+def _compaction_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    totals = {
+        key: sum(r["compaction"][key] for r in results)
+        for key in ("results", "raw_tokens", "compact_tokens")
+    }
+    count = totals["results"]
+    return {
+        "results": int(count),
+        "avg_raw_tokens": totals["raw_tokens"] / count if count else 0.0,
+        "avg_compact_tokens": totals["compact_tokens"] / count if count else 0.0,
+    }
+
+
+def report(results: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    wall = max(r["elapsed"] for r in results)
+    total_requests = sum(r["requests"] for r in results)
+    merged: Dict[str, List[float]] = {}
+    for result in results:
+        for name, samples in result["latencies"].items():
+            merged.setdefault(name, []).extend(samples)
+    everything = [s for samples in merged.values() for s in samples]
+
+    summary = {
+        "workers": len(results),
+        "concurrency_per_worker": args.concurrency,
+        "requests": total_requests,
+        "errors": sum(r["errors"] for r in results),
+        "degraded": sum(r["degraded"] for r in results),
+        "throughput_rps": total_requests / wall if wall else 0.0,
+        "latency_ms": {
+            name: {
+                "count": len(samples),
+                "p50": percentile(samples, 50) * 1000,
+                "p95": percentile(samples, 95) * 1000,
+                "p99": percentile(samples, 99) * 1000,
+            }
+            for name, samples in sorted(merged.items()) + [("all", everything)]
+            if samples
+        },
+        "search_prefetch": _prefetch_summary(results),
+        "search_compaction": _compaction_summary(results),
+        "max_rss_mb_per_worker": [
+            round(r["max_rss_kb"] / 1024, 1)
+            for r in sorted(results, key=lambda r: r["worker"])
+        ],
+    }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"workers={summary['workers']} requests={summary['requests']} "
+        f"errors={summary['errors']} degraded={summary['degraded']} "
+        f"throughput={summary['throughput_rps']:.1f} req/s"
+    )
+    print(f"{'scenario':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in summary["latency_ms"].items():
+        print(
+            f"{name:<14}{stats['count']:>8}{stats['p50']:>10.1f}"
+            f"{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+        )
+    prefetch = summary["search_prefetch"]
+    print(
+        f"search prefetch: started={prefetch['started']} "
+        f"hit_rate={prefetch['hit_rate']:.0%} "
+        f"avg_saved={prefetch['avg_saved_ms']:.1f} ms"
+    )
+    compaction = summary["search_compaction"]
+    print(
+        f"search compaction: results={compaction['results']} "
+        f"avg_tokens={compaction['avg_raw_tokens']:.0f} -> "
+        f"{compaction['avg_compact_tokens']:.0f}"
+    )
+    print(f"max RSS per worker (MB): {summary['max_rss_mb_per_worker']}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--conversations", type=int, default=200, help="per worker")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument(
+        "--provider",
+        choices=["gemini", "fake"],
+        default="gemini",
+        help="gemini: real provider code against a faked SDK; fake: scripted provider",
+    )
+    parser.add_argument(
+        "--fake-faults",
+        default="",
+        help='fault schedule for --provider fake, e.g. "ok,ok,429,ok,503,timeout"',
+    )
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--gemini-latency-ms", type=float, default=200.0)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=150.0)
+    parser.add_argument("--search-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--unique-queries",
+        action="store_true",
+        help="make every web search query unique (defeats the search cache)",
+    )
+    parser.add_argument(
+        "--timezones",
+        default="",
+        help='comma-separated IANA zones to send, e.g. "Europe/London,Asia/Tokyo"',
+    )
+    parser.add_argument("--json", dest="json_path", help="write the summary here")
+    parser.add_argument(
+        "--max-p95-ms",
+        type=float,
+        help="exit non-zero if the overall p95 latency exceeds this budget",
+    )
+    parser.add_argument(
+        "--verbose",
+        dest="quiet",
+        action="store_false",
+        help="keep the backend's debug output and tracebacks",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    parse_mix(args.mix)
+
+    if args.workers == 1:
+        results = [run_worker(args, 0)]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.workers) as pool:
+            results = pool.starmap(
+                run_worker, [(args, worker_id) for worker_id in range(args.workers)]
+            )
+
+    summary = report(results, args)
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(summary, fh, indent=2)
+
+    if args.max_p95_ms is not None:
+        p95 = summary["latency_ms"].get("all", {}).get("p95", 0.0)
+        if p95 > args.max_p95_ms:
+            print(f"FAIL: p95 {p95:.1f} ms exceeds budget {args.max_p95_ms:.1f} ms")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Share of user turns the confirmation state machine answers without the model.
+
+Builds chat sessions the way the app plays them out: calendar reads, web
+searches and chit-chat, and event creation, where the model opens a card
+(rendered as the frontend stores it) and the user then edits it with the
+form ("modify the event with these details: ..."), asks for a change in
+their own words, and finally confirms or cancels. Every user turn goes
+through ``answer_turn``; the report gives the share answered without the
+model, overall and for card replies, the time per turn, and the model
+turns saved:
+
+    uv run python -m benchmarks.confirmation_flow --sessions 500 --turn-ms 1100
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import timeit
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from benchmarks.chat_load import (
+    CREATE_PROMPTS,
+    EVENT_PROMPTS,
+    PLAIN_PROMPTS,
+    SEARCH_TOPICS,
+)
+
+FREE_FORM_EDITS = [
+    "make it 3pm instead",
+    "can you move it to Friday?",
+    "add Sam as well",
+    "yes",
+]
+CANCELS = ["cancel", "no", "nevermind"]
+TITLES = ["Meeting with John", "Dentist appointment", "Focus block", "Lunch with Sam"]
+LOCATIONS = ["Room 5", "Zoom", "Café Nero"]
+
+
+def _draft_card(title: str, start: datetime, end: datetime, location: str) -> str:
+    """A card as tools.ts stores the modify result (RFC 3339 with offset)."""
+    return (
+        f"**Title:** {title}\n"
+        f"**Date & Time:** {start.isoformat()} - {end.isoformat()}\n"
+        f"**Location:** {location or 'None'}\n"
+    )
+
+
+def _form_edit(title: str, start: datetime, end: datetime, location: str) -> str:
+    """The chat page's edit form message (RFC 3339 in UTC)."""
+
+    def when(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    details = [f"**Title:** {title}", f"**Date & Time:** {when(start)} - {when(end)}"]
+    if location:
+        details.append(f"**Location:** {location}")
+    return "modify the event with these details:\n\n" + "\n".join(details)
+
+
+def build_sessions(count: int, seed: int) -> List[List[Tuple[str, str]]]:
+    """Sessions as (role, content) lists; each user turn is answered in order."""
+    rng = random.Random(seed)
+    base = datetime(2025, 10, 20, 9, 0, tzinfo=ZoneInfo("Australia/Sydney"))
+    sessions = []
+    for _ in range(count):
+        session: List[Tuple[str, str]] = []
+        kind = rng.choices(["create", "read", "web", "chat"], [0.4, 0.3, 0.15, 0.15])[0]
+        if kind == "read":
+            session += [("user", rng.choice(EVENT_PROMPTS)), ("assistant", "...")]
+        elif kind == "web":
+            topic = rng.choice(SEARCH_TOPICS)
+            session += [("user", f"🔍 Web Search: {topic}"), ("assistant", "...")]
+        elif kind == "chat":
+            session += [("user", rng.choice(PLAIN_PROMPTS)), ("assistant", "...")]
+        if kind != "create":
+            sessions.append(session)
+            continue
+
+        title, location = rng.choice(TITLES), ""
+        start = base + timedelta(days=rng.randrange(14), hours=rng.randrange(9))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+        session += [("user", rng.choice(CREATE_PROMPTS))]
+        session += [("assistant", _draft_card(title, start, end, location))]
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            if rng.random() < 0.6:
+                start += timedelta(days=rng.randrange(3), hours=rng.randrange(3))
+                end = start + timedelta(hours=1)
+                location = rng.choice(LOCATIONS)
+                session += [("user", _form_edit(title, start, end, location))]
+            else:
+                session += [("user", rng.choice(FREE_FORM_EDITS))]
+            session += [("assistant", _draft_card(title, start, end, location))]
+        last = "confirm" if rng.random() < 0.8 else rng.choice(CANCELS)
+        session += [("user", last)]
+        sessions.append(session)
+    return sessions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--turn-ms",
+        type=float,
+        default=1100.0,
+        help="latency of the model turn an answered turn saves",
+    )
+    args = parser.parse_args(argv)
+
+    from app.services.base_provider import LLMMessage
+    from app.services.confirmation_flow import answer_turn
+    from app.services.user_locale import DEFAULT_LOCALE
+
+    turns = []
+    for session in build_sessions(args.sessions, args.seed):
+        messages = [LLMMessage(role, content) for role, content in session]
+        turns += [
+            messages[: i + 1] for i, msg in enumerate(messages) if msg.role == "user"
+        ]
+
+    outcomes: Counter = Counter()
+    card_replies = card_answered = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for messages in turns:
+            turn = answer_turn(messages, DEFAULT_LOCALE)
+            outcomes[turn.outcome if turn else "model"] += 1
+            after_card = len(messages) > 1 and "**Title:**" in messages[-2].content
+            card_replies += after_card
+            card_answered += after_card and turn is not None
+
+        def answer_all():
+            for messages in turns:
+                answer_turn(messages, DEFAULT_LOCALE)
+
+        best = min(timeit.repeat(answer_all, number=3, repeat=3))
+    per_turn_us = best / (3 * len(turns)) * 1e6
+
+    answered = len(turns) - outcomes["model"]
+    print(f"{args.sessions} sessions, {len(turns)} user turns")
+    for outcome in ("confirm", "modify", "cancel", "model"):
+        print(f"{outcome:<8} {outcomes[outcome]:>6}")
+    print()
+    print(f"answered without the model: {answered / len(turns):.1%} of all turns")
+    print(
+        f"                            {card_answered / max(card_replies, 1):.1%} "
+        f"of the {card_replies} replies to a card"
+    )
+    print(f"state machine {per_turn_us:>8.1f} µs/turn")
+    print(
+        f"model turns saved: {answered} "
+        f"(~{answered * args.turn_ms / 1000:.1f} s at {args.turn_ms:g} ms/turn)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
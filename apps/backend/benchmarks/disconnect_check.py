@@ -0,0 +1,169 @@
+"""Upstream work left running by clients that give up on /chat/generate.
+
+Starts ``uvicorn benchmarks.worker_app:app`` against slow fake upstreams and
+sends web search turns (a search plus two model calls) whose clients hang up
+after ``--abandon-after-ms``, like a user closing the tab. Once the server
+is idle it reports the upstream calls and seconds spent on those requests,
+with cancellation on client disconnect turned off and on, plus the backend's
+``requests_cancelled_total`` and the deadline time it recorded as saved:
+
+    uv run python -m benchmarks.disconnect_check --requests 40 \\
+        --gemini-latency-ms 1500 --search-latency-ms 1000 --abandon-after-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.multi_worker import _free_port, _wait_ready
+
+
+def _metric(text: str, name: str) -> float:
+    match = re.search(rf"^{re.escape(name)}(?:{{[^}}]*}})? (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+async def _abandon(base_url: str, args: argparse.Namespace) -> int:
+    """Send the requests and hang up on each after ``--abandon-after-ms``."""
+    timeout = httpx.Timeout(60.0, read=args.abandon_after_ms / 1000)
+    abandoned = 0
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i: int) -> None:
+            nonlocal abandoned
+            # Distinct queries so the search cache can't answer them
+            query = f"{uuid.uuid4().hex[:8]} fixtures {i}"
+            payload = {
+                "messages": [{"role": "user", "content": f"🔍 Web Search: {query}"}],
+                "model_provider": "gemini",
+                "model_name": "gemini-2.5-flash",
+            }
+            headers = {"Idempotency-Key": str(uuid.uuid4())} if args.with_key else {}
+            async with semaphore:
+                try:
+                    await client.post(
+                        "/api/v1/chat/generate", json=payload, headers=headers
+                    )
+                except httpx.ReadTimeout:
+                    abandoned += 1
+
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+    return abandoned
+
+
+def run_mode(args: argparse.Namespace, cancel: bool) -> Dict[str, Any]:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        counter_db = os.path.join(tmp, "counters.db")
+        env = dict(
+            os.environ,
+            PYTHONPATH=backend_dir,
+            GEMINI_API_KEY="benchmark-fake-key",
+            SERPAPI_API_KEY="benchmark-fake-key",
+            LAZY_PRELOAD_ENABLED="false",
+            WEB_SEARCH_NEAR_DUP_ENABLED="false",
+            CANCEL_ON_DISCONNECT_ENABLED=str(cancel).lower(),
+            IDEMPOTENCY_ORPHAN_GRACE_SECONDS=str(args.orphan_grace),
+            BENCH_COUNTER_DB=counter_db,
+            BENCH_GEMINI_LATENCY_MS=str(args.gemini_latency_ms),
+            BENCH_SEARCH_LATENCY_MS=str(args.search_latency_ms),
+        )
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "benchmarks.worker_app:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=backend_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=None if args.verbose else subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(_wait_ready(base_url, args.startup_timeout))
+            started = time.perf_counter()
+            abandoned = asyncio.run(_abandon(base_url, args))
+            # Let whatever is still running upstream finish
+            time.sleep(
+                (2 * args.gemini_latency_ms + args.search_latency_ms) / 1000
+                + args.orphan_grace
+                + 1
+            )
+            metrics = httpx.get(f"{base_url}/api/v1/metrics").text
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        from app.services.state_store import SQLiteStore
+
+        counters = SQLiteStore(counter_db, busy_timeout_ms=5000)
+        return {
+            "cancel": cancel,
+            "abandoned": abandoned,
+            "elapsed": time.perf_counter() - started,
+            "gemini_calls": counters.get("gemini_calls") or 0,
+            "gemini_s": (counters.get("gemini_ms") or 0) / 1000,
+            "serpapi_calls": counters.get("serpapi_calls") or 0,
+            "serpapi_s": (counters.get("serpapi_ms") or 0) / 1000,
+            "cancelled": _metric(metrics, "requests_cancelled_total"),
+            "saved_s": _metric(metrics, "request_cancelled_saved_seconds_sum"),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--gemini-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--search-latency-ms", type=float, default=1000.0)
+    parser.add_argument("--abandon-after-ms", type=float, default=300.0)
+    parser.add_argument(
+        "--with-key",
+        action="store_true",
+        help="send an Idempotency-Key, as the frontend does",
+    )
+    parser.add_argument("--orphan-grace", type=float, default=2.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'cancel':<7} {'abandoned':>9} {'model calls':>11} {'model s':>8} "
+        f"{'searches':>8} {'search s':>8} {'cancelled':>9} {'saved s':>8}"
+    )
+    for cancel in (False, True):
+        row = run_mode(args, cancel)
+        print(
+            f"{'on' if cancel else 'off':<7} {row['abandoned']:>9} "
+            f"{row['gemini_calls']:>11} {row['gemini_s']:>8.1f} "
+            f"{row['serpapi_calls']:>8} {row['serpapi_s']:>8.1f} "
+            f"{row['cancelled']:>9.0f} {row['saved_s']:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
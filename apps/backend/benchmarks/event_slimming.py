@@ -0,0 +1,135 @@
+"""Prompt size and preparation time of getEvents results, raw vs slimmed.
+
+Builds a conversation whose last turn posts back a getEvents result with
+``--events`` raw Google Calendar events (etags, links, creator/organizer,
+attendees, reminders, conference data), then compares the flattened Gemini
+prompt with and without ``slim_tool_results``:
+
+    uv run python -m benchmarks.event_slimming --events 50,200,500
+
+Model latency isn't measured offline. Prefill time saved is estimated at
+``--prefill-tok-per-s``.
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.services.base_provider import LLMMessage
+from app.services.event_compaction import slim_tool_results
+from app.services.gemini_provider import GeminiProvider
+from app.services.search_compaction import estimate_tokens
+from app.services.user_locale import DEFAULT_TZ
+
+TITLES = ["Standup", "1:1 with Priya", "Design review", "Client call", "Lunch"]
+PLACES = ["Zoom", "Room 2B", "Boardroom", "Café Nero, 12 George St", None]
+
+
+def raw_event(rng: random.Random, index: int, start: datetime) -> Dict[str, Any]:
+    end = start + timedelta(minutes=rng.choice([15, 30, 60, 90]))
+    attendees = [
+        {
+            "email": f"person{n}@example.com",
+            "responseStatus": rng.choice(["accepted", "needsAction", "tentative"]),
+        }
+        for n in range(rng.randrange(0, 8))
+    ]
+    event = {
+        "kind": "calendar#event",
+        "etag": f'"33{index:013d}"',
+        "id": f"evt{index:06d}{rng.getrandbits(40):x}",
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=ZXZ0{index:08d}",
+        "created": "2025-09-01T01:02:03.000Z",
+        "updated": "2025-10-01T04:05:06.789Z",
+        "summary": rng.choice(TITLES),
+        "description": "Agenda: updates, blockers, next steps. " * rng.randrange(0, 4),
+        "creator": {"email": "me@example.com", "self": True},
+        "organizer": {"email": "me@example.com", "self": True},
+        "start": {"dateTime": start.isoformat(), "timeZone": "Australia/Sydney"},
+        "end": {"dateTime": end.isoformat(), "timeZone": "Australia/Sydney"},
+        "iCalUID": f"evt{index:06d}@google.com",
+        "sequence": 0,
+        "attendees": attendees,
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+    location = rng.choice(PLACES)
+    if location:
+        event["location"] = location
+    if location == "Zoom":
+        event["conferenceData"] = {
+            "entryPoints": [
+                {"entryPointType": "video", "uri": "https://zoom.us/j/123456789"}
+            ],
+            "conferenceSolution": {"name": "Zoom Meeting"},
+        }
+    return event
+
+
+def conversation(count: int, seed: int = 3) -> List[LLMMessage]:
+    rng = random.Random(seed)
+    day = datetime(2025, 10, 20, 8, tzinfo=DEFAULT_TZ)
+    events = [
+        raw_event(rng, i, day + timedelta(hours=i // 6 * 24 + (i % 6) * 1.5))
+        for i in range(count)
+    ]
+    call = {
+        "id": "call-1",
+        "type": "function",
+        "function": {"name": "getEvents", "arguments": json.dumps({"timeMin": "x"})},
+    }
+    result = {
+        "tool_call_id": "call-1",
+        "content": json.dumps({"items": events}),
+        "success": True,
+    }
+    return [
+        LLMMessage(role="system", content="(system prompt)"),
+        LLMMessage(role="user", content="What's on this month?"),
+        LLMMessage(role="assistant", content="", tool_calls=[call]),
+        LLMMessage(role="tool", content=json.dumps([result])),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", default="10,50,200,500")
+    parser.add_argument("--max-events", type=int, default=30)
+    parser.add_argument("--prefill-tok-per-s", type=float, default=5000.0)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'events':>6} {'raw tok':>9} {'slim tok':>9} {'saved':>7} "
+        f"{'slim µs':>9} {'est. prefill saved':>19}"
+    )
+    for count in (int(n) for n in args.events.split(",")):
+        messages = conversation(count)
+        raw_prompt = GeminiProvider.build_prompt(messages)
+
+        def slim():
+            slimmed, _ = slim_tool_results(messages, max_events=args.max_events)
+            return GeminiProvider.build_prompt(slimmed)
+
+        slim_prompt = slim()
+        seconds = min(timeit.repeat(slim, number=args.iterations, repeat=3))
+        raw_tokens, slim_tokens = (
+            estimate_tokens(raw_prompt),
+            estimate_tokens(slim_prompt),
+        )
+        saved_ms = (raw_tokens - slim_tokens) / args.prefill_tok_per_s * 1000
+        print(
+            f"{count:>6} {raw_tokens:>9} {slim_tokens:>9} "
+            f"{1 - slim_tokens / raw_tokens:>7.0%} "
+            f"{seconds / args.iterations * 1e6:>9.0f} {saved_ms:>16.0f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Local stand-ins for the Gemini and SerpAPI upstreams.
+
+Both fakes mimic just enough of the real SDK surface for the backend code
+paths to run unchanged: ``genai.Client(...).models.generate_content`` and
+``serpapi.GoogleSearch(params).get_dict()``. Latency, jitter and error rates
+are configurable so benchmarks can reproduce slow or flaky upstreams offline.
+Both honour the timeouts the backend sets, like the real HTTP clients.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class UpstreamProfile:
+    """Latency and failure characteristics of a fake upstream."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def _delay(self, timeout: Optional[float]) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        delay = max(0.0, self.latency_ms + jitter) / 1000.0
+        return delay if timeout is None else min(delay, timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Sleep for the configured latency (called from executor threads);
+        raise like an HTTP client if it exceeds ``timeout`` seconds."""
+        delay = self._delay(timeout)
+        if delay:
+            time.sleep(delay)
+        if timeout is not None and delay >= timeout:
+            raise TimeoutError("Read timed out")
+
+    async def wait_async(self, timeout: Optional[float] = None) -> None:
+        """``wait`` for async clients."""
+        delay = self._delay(timeout)
+        if delay:
+            await asyncio.sleep(delay)
+        if timeout is not None and delay >= timeout:
+            raise TimeoutError("Read timed out")
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+def _last_turn(prompt: str) -> str:
+    """Return the last role-prefixed block of a flattened Gemini prompt."""
+    blocks = prompt.split("\n\n")
+    for block in reversed(blocks):
+        if block.startswith(("User:", "Tool:", "Assistant:")):
+            return block
+    return blocks[-1] if blocks else ""
+
+
+def _function_call(name: str, args: Dict[str, Any]):
+    return SimpleNamespace(
+        text=None, function_call=SimpleNamespace(name=name, args=args, id=None)
+    )
+
+
+def _text(text: str):
+    return SimpleNamespace(text=text, function_call=None)
+
+
+def scripted_gemini_parts(prompt: str) -> List[SimpleNamespace]:
+    """Decide what the fake model answers based on the last conversation turn."""
+    turn = _last_turn(prompt)
+    lowered = turn.lower()
+
+    if turn.startswith("Tool:"):
+        if "web search results" in lowered:
+            return [
+                _text(
+                    "Manchester United play Arsenal tomorrow at 8:00 pm at Old "
+                    "Trafford. Create an event from this?"
+                )
+            ]
+        return [
+            _text(
+                "Tomorrow you have 2 events: 10:00–11:00 **1:1 with Priya** (Zoom), "
+                "2:30–3:00 **Design review** (Room 5). Want me to help you with "
+                "anything else?"
+            )
+        ]
+
+    if "web search:" in lowered or "search the web" in lowered:
+        query = turn.split(":", 2)[-1].strip() or "latest news"
+        return [_function_call("webSearch", {"query": query})]
+
+    if any(word in lowered for word in ("add ", "create ", "schedule ")):
+        return [
+            _function_call(
+                "handleEventConfirmation",
+                {
+                    "action": "modify",
+                    "eventDetails": {
+                        "summary": "Meeting with John",
+                        "start": {
+                            "dateTime": "2025-10-21T14:00:00+11:00",
+                            "timeZone": "Australia/Sydney",
+                        },
+                        "end": {
+                            "dateTime": "2025-10-21T15:00:00+11:00",
+                            "timeZone": "Australia/Sydney",
+                        },
+                    },
+                },
+            )
+        ]
+
+    if any(word in lowered for word in ("calendar", "events", "schedule", "meeting")):
+        return [
+            _function_call(
+                "getEvents",
+                {
+                    "timeMin": "2025-10-21T00:00:00+11:00",
+                    "timeMax": "2025-10-22T00:00:00+11:00",
+                },
+            )
+        ]
+
+    return [_text("Hi! I'm Calendara. How can I help with your schedule today?")]
+
+
+def _gemini_timeout(config: Any) -> Optional[float]:
+    """Seconds from ``config.http_options.timeout`` (milliseconds), if set."""
+    http_options = getattr(config, "http_options", None)
+    timeout_ms = getattr(http_options, "timeout", None)
+    return timeout_ms / 1000.0 if timeout_ms else None
+
+
+class FakeGeminiModels:
+    """Implements ``client.models.generate_content``."""
+
+    def __init__(self, profile: UpstreamProfile):
+        self.profile = profile
+
+    def generate_content(self, model: str, contents: Any, config: Any = None):
+        self.profile.wait(_gemini_timeout(config))
+        return self._respond(contents)
+
+    def _respond(self, contents: Any):
+        if self.profile.should_fail():
+            raise Exception(
+                "503 UNAVAILABLE. {'error': {'message': 'The model is overloaded.'}}"
+            )
+        prompt = contents if isinstance(contents, str) else str(contents)
+        parts = scripted_gemini_parts(prompt)
+        completion_tokens = sum(
+            len(p.text or json.dumps(p.function_call.args)) // 4 for p in parts
+        )
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=len(prompt) // 4,
+                candidates_token_count=completion_tokens,
+                total_token_count=len(prompt) // 4 + completion_tokens,
+            ),
+        )
+
+
+class FakeAsyncGeminiModels(FakeGeminiModels):
+    """Implements ``client.aio.models.generate_content``."""
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None):
+        await self.profile.wait_async(_gemini_timeout(config))
+        return self._respond(contents)
+
+
+class FakeGeminiClient:
+    """Drop-in replacement for ``google.genai.Client``."""
+
+    profile = UpstreamProfile()
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs: Any):
+        self.api_key = api_key
+        self.models = FakeGeminiModels(self.profile)
+        self.aio = SimpleNamespace(models=FakeAsyncGeminiModels(self.profile))
+
+
+class FakeGoogleSearch:
+    """Drop-in replacement for ``serpapi.GoogleSearch``."""
+
+    profile = UpstreamProfile()
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.timeout: Optional[float] = None
+
+    def get_dict(self) -> Dict[str, Any]:
+        self.profile.wait(self.timeout)
+        if self.profile.should_fail():
+            raise Exception("SerpAPI returned HTTP 503")
+        query = self.params.get("q", "")
+        num = int(self.params.get("num", 5))
+        return {
+            "organic_results": [
+                {
+                    "position": i + 1,
+                    "title": f"{query} — result {i + 1}",
+                    "snippet": (
+                        f"Everything you need to know about {query}. Kick-off "
+                        f"times, venue details and ticket information ({i + 1})."
+                    ),
+                    "link": f"https://example.com/{i + 1}?utm_source=serp",
+                }
+                for i in range(num)
+            ],
+            "search_metadata": {"total_time_taken": 0.01, "status": "Success"},
+        }
+
+
+def install_fakes(
+    gemini: Optional[UpstreamProfile] = None, search: Optional[UpstreamProfile] = None
+) -> None:
+    """Patch the backend modules to talk to the fakes instead of the network."""
+    from app.services import gemini_provider, web_search
+
+    FakeGeminiClient.profile = gemini or UpstreamProfile()
+    FakeGoogleSearch.profile = search or UpstreamProfile()
+    gemini_provider.genai.Client = FakeGeminiClient
+    web_search.serpapi.GoogleSearch = FakeGoogleSearch
@@ -0,0 +1,271 @@
+"""Model call latency per request class, with the generation policy off and on.
+
+Sends a fixed set of turns from each class (tool-only turns, getEvents
+summaries, web answers, chit-chat) through ``LLMService.generate_response``,
+once with the old fixed settings (``GENERATION_POLICY_ENABLED=false``) and
+once with the per-class policy. For each class it reports latency, output
+tokens and how many answers stopped at the output cap.
+
+``--live`` calls Gemini with ``GEMINI_API_KEY``. Offline, the fake Gemini
+upstream models decoding: ``--ttft-ms`` before the first token, then
+``--decode-ms-per-token`` for each output token. Each turn has the output
+length the model would produce without a cap, and ``max_output_tokens``
+cuts it short. Offline numbers therefore show what the caps do to that
+length distribution; only a live run measures the model itself:
+
+    uv run python -m benchmarks.generation_policy --repeats 5
+    GEMINI_API_KEY=... uv run python -m benchmarks.generation_policy --live
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.chat_load import CREATE_PROMPTS, EVENT_PROMPTS, SAMPLE_EVENTS
+
+CHAT_PROMPTS = [
+    "Hi there!",
+    "What can you help me with?",
+    "Thanks, that's all for now.",
+    "Can you explain how you decide what goes on my calendar?",
+    "Tell me about yourself",
+]
+SEARCH_TOPICS = [
+    "Manchester United vs Arsenal match tomorrow",
+    "AI conference next month",
+    "Sydney weather this weekend",
+]
+
+
+def _week_of_events(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            **SAMPLE_EVENTS[i % len(SAMPLE_EVENTS)],
+            "id": f"evt{i}",
+            "summary": f"{SAMPLE_EVENTS[i % len(SAMPLE_EVENTS)]['summary']} #{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def _after_tool(
+    user: str, name: str, args: Dict[str, Any], content: Any
+) -> List[Dict[str, Any]]:
+    call = {
+        "id": f"call-{name}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args)},
+    }
+    result = {
+        "tool_call_id": call["id"],
+        "content": content if isinstance(content, str) else json.dumps(content),
+        "success": True,
+    }
+    return [
+        {"role": "user", "content": user},
+        {"role": "assistant", "content": "", "tool_calls": [call]},
+        {"role": "tool", "content": json.dumps([result])},
+    ]
+
+
+def build_corpus(rng: random.Random) -> List[Tuple[str, List[Dict[str, Any]], int]]:
+    """(expected class, messages, uncapped output tokens) per turn."""
+    corpus = []
+    for prompt in CREATE_PROMPTS + EVENT_PROMPTS + ["confirm"]:
+        corpus.append(("tool_call", [{"role": "user", "content": prompt}], 60))
+    # Up to GET_EVENTS_MAX_EVENTS, the most the chat endpoint passes on
+    for count in (1, 3, 8, 15, 30):
+        # Roughly 40 tokens per event line plus an opening and a follow-up
+        corpus.append(
+            (
+                "events_summary",
+                _after_tool(
+                    "What's on this week?",
+                    "getEvents",
+                    {"timeMin": "2025-10-20", "timeMax": "2025-10-27"},
+                    _week_of_events(count),
+                ),
+                40 + 40 * count,
+            )
+        )
+    for topic in SEARCH_TOPICS:
+        snippets = "\n".join(
+            f"{i}. {topic} - result {i}: details, times and venue." for i in range(5)
+        )
+        corpus.append(
+            (
+                "web_answer",
+                _after_tool(
+                    f"🔍 Web Search: {topic}", "webSearch", {"query": topic}, snippets
+                ),
+                rng.randint(250, 700),
+            )
+        )
+    for prompt in CHAT_PROMPTS:
+        # Mostly short, with the occasional ramble
+        corpus.append(
+            (
+                "chat",
+                [{"role": "user", "content": prompt}],
+                int(min(1500, rng.lognormvariate(5.0, 0.9))),
+            )
+        )
+    return corpus
+
+
+def install_decode_model(ttft_ms: float, decode_ms_per_token: float):
+    """Patch the fake Gemini so latency and output follow the decode model.
+
+    Returns a setter for the next call's uncapped output length.
+    """
+    from benchmarks.fakes import FakeAsyncGeminiModels, install_fakes
+
+    install_fakes()
+    natural = {"tokens": 0}
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None):
+        cap = getattr(config, "max_output_tokens", None) or 8192
+        tokens = min(natural["tokens"], cap)
+        await asyncio.sleep((ttft_ms + tokens * decode_ms_per_token) / 1000)
+        prompt_tokens = len(str(contents)) // 4
+        return SimpleNamespace(
+            candidates=[
+                SimpleNamespace(
+                    content=SimpleNamespace(
+                        parts=[SimpleNamespace(text="word " * tokens)]
+                    ),
+                    finish_reason="MAX_TOKENS" if tokens == cap else "STOP",
+                )
+            ],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=tokens,
+                total_token_count=prompt_tokens + tokens,
+            ),
+        )
+
+    FakeAsyncGeminiModels.generate_content = generate_content
+
+    def set_natural_tokens(tokens: int) -> None:
+        natural["tokens"] = tokens
+
+    return set_natural_tokens
+
+
+async def run(
+    args: argparse.Namespace,
+    corpus: List[Tuple[str, List[Dict[str, Any]], int]],
+    set_natural_tokens,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from app.api.v1.endpoints.chat import Message, to_llm_messages
+    from app.core.config import settings
+    from app.services.generation_policy import classify_turn
+    from app.services.llm_service import LLMService
+    from app.services.tools import get_tools_for_provider
+
+    service = LLMService()
+    tools = get_tools_for_provider("gemini")
+    turns = [
+        (expected, to_llm_messages([Message(**m) for m in messages]), natural)
+        for expected, messages, natural in corpus
+    ]
+    misclassified = sum(
+        classify_turn(messages, True) != expected for expected, messages, _ in turns
+    )
+    if misclassified:
+        print(
+            f"warning: {misclassified} turns classified differently than labelled",
+            file=sys.stderr,
+        )
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for enabled in (False, True):
+        settings.GENERATION_POLICY_ENABLED = enabled
+        samples: Dict[str, List[Tuple[float, int, bool]]] = defaultdict(list)
+        for _ in range(args.repeats):
+            for expected, messages, natural in turns:
+                if set_natural_tokens is not None:
+                    set_natural_tokens(natural)
+                started = time.perf_counter()
+                response = await service.generate_response(
+                    "gemini", messages, args.model, tools
+                )
+                samples[expected].append(
+                    (
+                        time.perf_counter() - started,
+                        response.usage.get("completion_tokens") or 0,
+                        response.truncated,
+                    )
+                )
+        results["on" if enabled else "off"] = {
+            name: {
+                "p50_ms": statistics.median(s[0] for s in rows) * 1000,
+                "mean_ms": statistics.fmean(s[0] for s in rows) * 1000,
+                "tokens": statistics.fmean(s[1] for s in rows),
+                "truncated": sum(s[2] for s in rows) / len(rows),
+            }
+            for name, rows in samples.items()
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call Gemini")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--decode-ms-per-token", type=float, default=4.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LAZY_PRELOAD_ENABLED", "false")
+    corpus = build_corpus(random.Random(args.seed))
+    with contextlib.redirect_stdout(io.StringIO()):
+        set_natural_tokens = None
+        if not args.live:
+            os.environ["GEMINI_API_KEY"] = "benchmark-fake-key"
+            set_natural_tokens = install_decode_model(
+                args.ttft_ms, args.decode_ms_per_token
+            )
+        results = asyncio.run(run(args, corpus, set_natural_tokens))
+
+    from app.services.generation_policy import DEFAULT_POLICY, POLICIES
+
+    upstream = (
+        "live Gemini"
+        if args.live
+        else f"fake, {args.ttft_ms:g} ms + {args.decode_ms_per_token:g} ms/token"
+    )
+    print(f"{len(corpus)} turns x {args.repeats}, {args.model} ({upstream})")
+    print(
+        f"{'class':<15} {'policy':<22} {'p50 ms':>8} {'mean ms':>8} "
+        f"{'tokens':>7} {'capped':>7}"
+    )
+    for name in POLICIES:
+        for mode in ("off", "on"):
+            row = results[mode].get(name)
+            if row is None:
+                continue
+            policy = POLICIES[name] if mode == "on" else DEFAULT_POLICY
+            label = f"{policy.max_output_tokens} tok, t={policy.temperature:g}"
+            print(
+                f"{name:<15} {mode + ' (' + label + ')':<22} {row['p50_ms']:>8.0f} "
+                f"{row['mean_ms']:>8.0f} {row['tokens']:>7.0f} "
+                f"{row['truncated']:>7.0%}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Retries of /chat/generate with and without an Idempotency-Key.
+
+Runs the app in-process with the fake provider and, per conversation, posts
+the original request, a retry while it is still running and a retry after
+it finished, the way a client that times out and retries would. Reports
+upstream model calls and retry latency with and without the header:
+
+    uv run python -m benchmarks.idempotency_check --conversations 50 \\
+        --latency-ms 300 --retry-after-ms 100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+PROMPTS = [
+    "Hi there!",
+    "What can you help me with?",
+    "What's on my calendar tomorrow?",
+    "Add meeting with John tomorrow 2pm",
+]
+
+
+async def _run(args: argparse.Namespace, use_key: bool) -> Dict[str, Any]:
+    import httpx
+
+    from app.main import app
+    from app.services.metrics import LLM_CALL_LATENCY
+
+    calls_before = LLM_CALL_LATENCY.count(provider="fake", model="fake", outcome="ok")
+    retry_latencies: Dict[str, List[float]] = {"in_flight": [], "completed": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+
+        async def post(payload: Dict[str, Any], headers: Dict[str, str]) -> float:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chat/generate", json=payload, headers=headers
+            )
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        async def conversation(i: int) -> None:
+            payload = {
+                "messages": [{"role": "user", "content": PROMPTS[i % len(PROMPTS)]}],
+                "model_provider": "fake",
+                "model_name": "fake",
+                "user_id": f"user{i}",
+            }
+            headers = {"Idempotency-Key": str(uuid.uuid4())} if use_key else {}
+            original = asyncio.create_task(post(payload, headers))
+            await asyncio.sleep(args.retry_after_ms / 1000)
+            retry_latencies["in_flight"].append(await post(payload, headers))
+            await original
+            retry_latencies["completed"].append(await post(payload, headers))
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(i: int) -> None:
+            async with semaphore:
+                await conversation(i)
+
+        await asyncio.gather(*(bounded(i) for i in range(args.conversations)))
+
+    calls = LLM_CALL_LATENCY.count(provider="fake", model="fake", outcome="ok")
+    return {
+        "model_calls": int(calls - calls_before),
+        **{
+            f"{name}_retry_ms": statistics.median(samples) * 1000
+            for name, samples in retry_latencies.items()
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--retry-after-ms", type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    os.environ["FAKE_LLM_ENABLED"] = "1"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("LAZY_PRELOAD_ENABLED", "false")
+
+    sink = io.StringIO()
+    results = {}
+    for use_key in (False, True):
+        with contextlib.redirect_stdout(sink):
+            results[use_key] = asyncio.run(_run(args, use_key))
+
+    requests = args.conversations * 3
+    print(f"{args.conversations} conversations, 3 requests each ({requests} total)")
+    print(f"{'':<22} {'model calls':>12} {'in-flight retry':>16} {'late retry':>11}")
+    for use_key, label in ((False, "no Idempotency-Key"), (True, "Idempotency-Key")):
+        row = results[use_key]
+        print(
+            f"{label:<22} {row['model_calls']:>12} "
+            f"{row['in_flight_retry_ms']:>13.1f} ms {row['completed_retry_ms']:>8.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
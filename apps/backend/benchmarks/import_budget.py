@@ -0,0 +1,95 @@
+"""Cold-start import budget for the backend.
+
+Imports ``main`` (what ``uvicorn main:app`` does) in fresh interpreters with
+``-X importtime``, reports the best total and the top-level packages with the
+most self time, and checks that the SDKs behind ``LazyModule`` proxies were
+not imported:
+
+    uv run python -m benchmarks.import_budget --runs 5 --budget-ms 800
+
+Exits non-zero if the best run is over budget or a deferred SDK was imported
+eagerly, so it can gate CI.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# "import time: self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+CHECK_DEFERRED = """
+import sys
+import main
+from app.services.lazy_imports import HEAVY_MODULES
+print("EAGER:" + ",".join(m for m in HEAVY_MODULES if m in sys.modules))
+"""
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """(total ms, self ms per top-level package) from ``-X importtime`` output."""
+    total_us = 0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, indent, name = match.groups()
+        # Self times attributed to top-level packages; depth-0 cumulative
+        # times sum to the whole import
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if len(indent) == 1:
+            total_us += int(cumulative)
+    return total_us / 1000, dict(packages)
+
+
+def run_once(backend_dir: str) -> Tuple[float, Dict[str, float], List[str]]:
+    """(total ms, self ms per top-level package, eagerly imported SDKs)."""
+    env = dict(os.environ, PYTHONPATH=backend_dir)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK_DEFERRED],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms, packages = parse_importtime(proc.stderr)
+    eager = [m for m in proc.stdout.split("EAGER:", 1)[-1].strip().split(",") if m]
+    return total_ms, packages, eager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = [run_once(backend_dir) for _ in range(args.runs)]
+    best_total, packages, eager = min(runs, key=lambda run: run[0])
+
+    print(f"import main: best {best_total:.0f} ms over {args.runs} runs")
+    print(f"{'package':<24} {'ms':>8}")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<24} {ms:>8.1f}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: deferred SDKs imported at startup: {', '.join(eager)}")
+        failed = True
+    if best_total > args.budget_ms:
+        print(f"FAIL: {best_total:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print(f"OK: within the {args.budget_ms:.0f} ms budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""JSON encode/decode cost on the /chat/generate path.
+
+Builds long conversations (``--messages`` entries, getEvents tool results
+nested as JSON strings) and times each JSON stage the request goes through,
+the stdlib way it used to be done against the current ``fast_json`` path:
+
+- decode the request body
+- parse the tool-result payloads (previously once per consumer, now once)
+- encode the response
+
+It then posts the same payloads end to end through the ASGI app with the
+offline fake provider, once with ``FAST_JSON_ENABLED`` off and once on, each
+in a fresh interpreter:
+
+    uv run python -m benchmarks.json_path --messages 200 --requests 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Dict, List, Optional
+
+# Stdlib tool-result parses per request before LLMMessage cached them: chat.py
+# (collect_tool_results), event slimming, agenda digests and prompt building
+LEGACY_TOOL_PARSES = 4
+
+
+def _event(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"evt{i:05d}",
+        "summary": f"Meeting {i} with the team",
+        "start": {"dateTime": "2025-03-10T09:00:00+11:00"},
+        "end": {"dateTime": "2025-03-10T10:00:00+11:00"},
+        "location": "Level 3, 100 George St, Sydney",
+        "attendees": [{"email": f"person{j}@example.com"} for j in range(3)],
+        "etag": '"3181161784712000"',
+        "htmlLink": "https://www.google.com/calendar/event?eid=abc",
+    }
+
+
+def build_messages(count: int, end_with_tools: bool) -> List[Dict[str, Any]]:
+    """A conversation of ``count`` messages, a getEvents round every 10 turns."""
+    messages: List[Dict[str, Any]] = []
+    i = 0
+    while len(messages) < count - 3:
+        messages.append({"role": "user", "content": f"What's on day {i}?"})
+        if i % 10 == 0:
+            call_id = f"call_{i}"
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": "",
+                    "tool_calls": [
+                        {
+                            "id": call_id,
+                            "type": "function",
+                            "function": {
+                                "name": "getEvents",
+                                "arguments": json.dumps(
+                                    {"timeMin": "2025-03-10", "timeMax": "2025-03-11"}
+                                ),
+                            },
+                        }
+                    ],
+                }
+            )
+            events = json.dumps({"events": [_event(j) for j in range(5)]})
+            messages.append(
+                {
+                    "role": "tool",
+                    "content": json.dumps(
+                        [
+                            {
+                                "tool_call_id": call_id,
+                                "content": events,
+                                "success": True,
+                                "error": "",
+                            }
+                        ]
+                    ),
+                }
+            )
+        else:
+            messages.append({"role": "assistant", "content": f"Day {i} is free."})
+        i += 1
+    if end_with_tools:
+        return messages[: count - 3] + messages[-3:]
+    messages.append({"role": "user", "content": "Anything tomorrow morning?"})
+    return messages
+
+
+def _payload(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"messages": messages, "model_provider": "fake", "model_name": "fake"}
+
+
+def stage_timings(body: bytes, number: int) -> Dict[str, Dict[str, float]]:
+    """Per-stage microseconds, legacy (stdlib, repeated) vs current."""
+    from fastapi.encoders import jsonable_encoder
+
+    from app.api.v1.endpoints.chat import GenerateResponse
+    from app.core import fast_json
+    from app.services.base_provider import LLMMessage
+
+    payload = json.loads(body)
+    tool_contents = [m["content"] for m in payload["messages"] if m["role"] == "tool"]
+    response = GenerateResponse(
+        content="You have 3 meetings tomorrow morning.",
+        provider="fake",
+        model="fake",
+        usage={"input_tokens": 21000, "output_tokens": 12},
+    )
+
+    def legacy_parse_tools():
+        for _ in range(LEGACY_TOOL_PARSES):
+            for content in tool_contents:
+                json.loads(content)
+
+    def current_parse_tools():
+        for content in tool_contents:
+            LLMMessage(role="tool", content=content).tool_results
+
+    stages = {
+        "decode body": (lambda: json.loads(body), lambda: fast_json.loads(body)),
+        "tool results": (legacy_parse_tools, current_parse_tools),
+        "encode response": (
+            lambda: json.dumps(jsonable_encoder(response)).encode(),
+            lambda: fast_json.dumps(response.model_dump()),
+        ),
+    }
+    results = {}
+    for name, (legacy, current) in stages.items():
+        results[name] = {
+            "legacy": min(timeit.repeat(legacy, number=number, repeat=5))
+            / number
+            * 1e6,
+            "current": min(timeit.repeat(current, number=number, repeat=5))
+            / number
+            * 1e6,
+        }
+    return results
+
+
+async def _end_to_end(bodies: List[bytes], requests: int) -> Dict[str, float]:
+    import httpx
+
+    from app.core import fast_json
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    samples: List[float] = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        headers = {"content-type": "application/json"}
+        for i in range(requests):
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chat/generate",
+                content=bodies[i % len(bodies)],
+                headers=headers,
+            )
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    samples = samples[len(samples) // 10 :]
+    return {
+        "backend": fast_json.BACKEND,
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": statistics.median(samples) * 1000,
+    }
+
+
+def run_child(messages: int, requests: int) -> Dict[str, float]:
+    bodies = [
+        json.dumps(_payload(build_messages(messages, end_with_tools))).encode()
+        for end_with_tools in (False, True)
+    ]
+    return asyncio.run(_end_to_end(bodies, requests))
+
+
+def end_to_end(args: argparse.Namespace, fast: bool) -> Dict[str, float]:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(
+        os.environ,
+        PYTHONPATH=backend_dir,
+        FAST_JSON_ENABLED="true" if fast else "false",
+        FAKE_LLM_ENABLED="1",
+        FAKE_LLM_LATENCY_MS="0",
+        LAZY_PRELOAD_ENABLED="false",
+    )
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.json_path",
+            "--child",
+            "--messages",
+            str(args.messages),
+            "--requests",
+            str(args.requests),
+        ],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.messages, args.requests)))
+        return 0
+
+    for end_with_tools in (False, True):
+        body = json.dumps(
+            _payload(build_messages(args.messages, end_with_tools))
+        ).encode()
+        label = "ending in tool results" if end_with_tools else "ending in a user turn"
+        print(f"{args.messages} messages {label}, {len(body) / 1024:.0f} KB body")
+        print(f"  {'stage':<18} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+        for name, row in stage_timings(body, args.number).items():
+            print(
+                f"  {name:<18} {row['legacy']:>10.0f} {row['current']:>11.0f} "
+                f"{row['legacy'] / row['current']:>7.1f}x"
+            )
+
+    print(f"end to end, {args.requests} requests (fake provider, no latency)")
+    for fast in (False, True):
+        result = end_to_end(args, fast)
+        print(
+            f"  {result['backend']:<8} mean {result['mean_ms']:.2f} ms  "
+            f"p50 {result['p50_ms']:.2f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Latency and output quality of the model cascade against single models.
+
+Sends a mix of turns (event creation, calendar reads, web searches,
+chit-chat) through ``LLMService.generate_response`` three ways: always the
+fast tier, always the strong tier, and ``provider="cascade"``. For each it
+reports latency, the share of answers that fail the cascade's checks and,
+for the cascade, the escalation rate.
+
+``--live`` calls Gemini with ``GEMINI_API_KEY``. Offline, the fake Gemini
+answers in ``--fast-ms`` on the first tier and ``--strong-ms`` on the last,
+and spoils ``--fast-bad-rate`` of the fast tier's answers (tool arguments
+missing a required field, an empty reply or a broken card). Offline numbers
+therefore follow from those settings; only a live run measures how often the
+fast model really needs help:
+
+    uv run python -m benchmarks.model_cascade --repeats 5
+    GEMINI_API_KEY=... uv run python -m benchmarks.model_cascade --live
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from benchmarks.chat_load import CREATE_PROMPTS, EVENT_PROMPTS, SEARCH_TOPICS
+from benchmarks.generation_policy import CHAT_PROMPTS
+
+BROKEN_CARD = (
+    "<event_confirmation>\n**Title:** Meeting with John\n**Location:**\n"
+    "(date to follow)"
+)
+
+
+def build_turns() -> List[str]:
+    return (
+        CREATE_PROMPTS
+        + EVENT_PROMPTS
+        + [f"🔍 Web Search: {topic}" for topic in SEARCH_TOPICS]
+        + CHAT_PROMPTS
+    )
+
+
+def install_tier_model(
+    fast_model: str, fast_ms: float, strong_ms: float, bad_rate: float, seed: int
+) -> None:
+    """Patch the fake Gemini with per-model latency and a flaky fast model."""
+    from benchmarks.fakes import FakeAsyncGeminiModels, _text, install_fakes
+
+    install_fakes()
+    rng = random.Random(seed)
+    respond = FakeAsyncGeminiModels._respond
+
+    def spoil(response: Any) -> Any:
+        parts = response.candidates[0].content.parts
+        call = parts[0].function_call
+        if call is not None and call.args.get("eventDetails"):
+            details = dict(call.args["eventDetails"])
+            details.pop("start", None)
+            call = SimpleNamespace(
+                name=call.name, args={**call.args, "eventDetails": details}, id=None
+            )
+            parts = [SimpleNamespace(text=None, function_call=call)]
+        elif call is not None:
+            parts = [_text("")]
+        else:
+            parts = [_text(BROKEN_CARD)]
+        response.candidates[0].content.parts = parts
+        return response
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None):
+        fast = model == fast_model
+        await asyncio.sleep((fast_ms if fast else strong_ms) / 1000)
+        response = respond(self, contents)
+        if fast and rng.random() < bad_rate:
+            response = spoil(response)
+        return response
+
+    FakeAsyncGeminiModels.generate_content = generate_content
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    from app.services.base_provider import LLMMessage
+    from app.services.llm_service import LLMService
+    from app.services.model_cascade import CascadeTier, check_response
+    from app.services.tools import get_tools_for_provider
+
+    service = LLMService()
+    service.cascade.tiers = [
+        CascadeTier("gemini", args.fast_model),
+        CascadeTier("gemini", args.strong_model),
+    ]
+    tools = get_tools_for_provider("gemini")
+    turns = build_turns()
+
+    results = {}
+    for label, provider, model in (
+        ("fast", "gemini", args.fast_model),
+        ("strong", "gemini", args.strong_model),
+        ("cascade", "cascade", None),
+    ):
+        latencies, failed, escalated = [], 0, 0
+        for _ in range(args.repeats):
+            for turn in turns:
+                started = time.perf_counter()
+                response = await service.generate_response(
+                    provider, [LLMMessage("user", turn)], model, tools
+                )
+                latencies.append(time.perf_counter() - started)
+                failed += check_response(response) is not None
+                escalated += response.model != args.fast_model
+        latencies.sort()
+        results[label] = {
+            "calls": len(latencies),
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+            "mean_ms": statistics.fmean(latencies) * 1000,
+            "failed": failed / len(latencies),
+            "escalated": escalated / len(latencies) if provider == "cascade" else None,
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call Gemini")
+    parser.add_argument("--fast-model", default="gemini-2.0-flash-lite")
+    parser.add_argument("--strong-model", default="gemini-2.5-flash")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--fast-ms", type=float, default=350.0)
+    parser.add_argument("--strong-ms", type=float, default=1100.0)
+    parser.add_argument("--fast-bad-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LAZY_PRELOAD_ENABLED", "false")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not args.live:
+            os.environ["GEMINI_API_KEY"] = "benchmark-fake-key"
+            install_tier_model(
+                args.fast_model,
+                args.fast_ms,
+                args.strong_ms,
+                args.fast_bad_rate,
+                args.seed,
+            )
+        results = asyncio.run(run(args))
+
+    upstream = (
+        "live Gemini"
+        if args.live
+        else f"fake, {args.fast_ms:g}/{args.strong_ms:g} ms, "
+        f"{args.fast_bad_rate:.0%} bad fast answers"
+    )
+    print(f"{args.fast_model} -> {args.strong_model} ({upstream})")
+    print(
+        f"{'mode':<8} {'calls':>5} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} "
+        f"{'failed':>7} {'escalated':>9}"
+    )
+    for label, row in results.items():
+        escalated = "" if row["escalated"] is None else f"{row['escalated']:.0%}"
+        print(
+            f"{label:<8} {row['calls']:>5} {row['p50_ms']:>8.0f} "
+            f"{row['p95_ms']:>8.0f} {row['mean_ms']:>8.0f} "
+            f"{row['failed']:>7.0%} {escalated:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
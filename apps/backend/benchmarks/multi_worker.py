@@ -0,0 +1,299 @@
+"""Multi-worker benchmark: uvicorn with 1, 2, 4 and 8 workers on one host.
+
+For each state backend (``--states``) and worker count (``--workers``) this
+starts ``uvicorn benchmarks.worker_app:app --workers N`` against the fake
+upstreams and drives a conversation mix over real TCP. Every request opens
+a new connection, like a load balancer spreading one user's requests over
+workers. Besides throughput and latency it reports what per-process state
+costs once there are several workers:
+
+- SerpAPI calls: upstream searches for a fixed set of topics, counted across
+  workers; with ``memory`` each worker warms its own cache
+- agenda hit rate: "what's on today?" answered from the digest synced by the
+  previous request, which may have landed on another worker
+
+    uv run python -m benchmarks.multi_worker --workers 1,2,4,8 \\
+        --states memory,sqlite --conversations 400 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from app.core.user_signature import USER_SIGNATURE_HEADER, sign_user_id
+from benchmarks.chat_load import (
+    SAMPLE_EVENTS,
+    SEARCH_TOPICS,
+    _payload,
+    percentile,
+    scenario_confirmation,
+    scenario_get_events,
+    scenario_plain,
+)
+
+DEFAULT_MIX = "plain=0.3,get_events=0.25,web_search=0.25,agenda=0.2"
+SCENARIOS = ("plain", "get_events", "confirmation", "web_search", "agenda")
+AGENDA_ZONE = ZoneInfo("Australia/Sydney")
+# Workers only trust signed user ids, as they would behind the frontend
+SIGNING_SECRET = "benchmark-signing-secret"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _agenda_snapshot(user_id: str) -> Dict[str, Any]:
+    """A today+tomorrow /chat/agenda/sync snapshot with one event today."""
+    today = datetime.now(AGENDA_ZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    event = {
+        **SAMPLE_EVENTS[0],
+        "start": {"dateTime": (today + timedelta(hours=9)).isoformat()},
+        "end": {"dateTime": (today + timedelta(hours=10)).isoformat()},
+    }
+    return {
+        "user_id": user_id,
+        "timezone": AGENDA_ZONE.key,
+        "timeMin": today.isoformat(),
+        "timeMax": (today + timedelta(days=2)).isoformat(),
+        "events": [event],
+    }
+
+
+async def _drive(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: List[float] = []
+    counters = {"requests": 0, "errors": 0, "agenda_asks": 0, "agenda_hits": 0}
+
+    # No keep-alive: each request may be accepted by a different worker
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60.0, limits=limits
+    ) as client:
+
+        async def request(
+            path: str,
+            payload: Dict[str, Any],
+            headers: Optional[Dict[str, str]] = None,
+        ) -> Optional[Dict]:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            counters["requests"] += 1
+            if response.status_code != 200:
+                counters["errors"] += 1
+                return None
+            return response.json()
+
+        async def post(scenario: str, payload: Dict[str, Any]) -> Optional[Dict]:
+            return await request("/api/v1/chat/generate", payload)
+
+        async def scenario_web_search():
+            topic = rng.choice(SEARCH_TOPICS)
+            await post(
+                "web_search",
+                _payload([{"role": "user", "content": f"🔍 Web Search: {topic}"}]),
+            )
+
+        async def scenario_agenda():
+            user_id = f"user{rng.randrange(args.users)}"
+            signed = {USER_SIGNATURE_HEADER: sign_user_id(user_id, SIGNING_SECRET)}
+            await request("/api/v1/chat/agenda/sync", _agenda_snapshot(user_id), signed)
+            body = await request(
+                "/api/v1/chat/generate",
+                {
+                    **_payload([{"role": "user", "content": "What's on today?"}]),
+                    "user_id": user_id,
+                    "timezone": AGENDA_ZONE.key,
+                },
+                signed,
+            )
+            counters["agenda_asks"] += 1
+            trace = (body or {}).get("agent_trace") or {}
+            if trace.get("stop_reason") == "agenda_digest":
+                counters["agenda_hits"] += 1
+
+        scenarios = {
+            "plain": lambda: scenario_plain(post, rng),
+            "get_events": lambda: scenario_get_events(post, rng),
+            "confirmation": lambda: scenario_confirmation(post, rng),
+            "web_search": scenario_web_search,
+            "agenda": scenario_agenda,
+        }
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(args.conversations):
+            queue.put_nowait(rng.choices(names, weights)[0])
+
+        async def worker():
+            while True:
+                try:
+                    name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await scenarios[name]()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed": elapsed,
+        "throughput": counters["requests"] / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        **counters,
+    }
+
+
+async def _wait_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/api/v1/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"server at {base_url} did not start")
+            await asyncio.sleep(0.2)
+
+
+def run_config(args: argparse.Namespace, state: str, workers: int) -> Dict[str, Any]:
+    """Start uvicorn with ``workers`` processes and one state backend, then drive it."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        counter_db = os.path.join(tmp, "counters.db")
+        state_url = (
+            f"sqlite:///{os.path.join(tmp, 'state.db')}"
+            if state == "sqlite"
+            else "memory://"
+        )
+        env = dict(
+            os.environ,
+            PYTHONPATH=backend_dir,
+            WEB_CONCURRENCY=str(workers),
+            STATE_STORE_URL=state_url,
+            USER_ID_SIGNING_SECRET=SIGNING_SECRET,
+            GEMINI_API_KEY="benchmark-fake-key",
+            SERPAPI_API_KEY="benchmark-fake-key",
+            BENCH_COUNTER_DB=counter_db,
+            BENCH_GEMINI_LATENCY_MS=str(args.gemini_latency_ms),
+            BENCH_GEMINI_JITTER_MS=str(args.gemini_latency_ms / 4),
+            BENCH_SEARCH_LATENCY_MS=str(args.search_latency_ms),
+            BENCH_SEARCH_JITTER_MS=str(args.search_latency_ms / 4),
+        )
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "benchmarks.worker_app:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=backend_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=None if args.verbose else subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(_wait_ready(base_url, args.startup_timeout))
+            # Let the remaining workers finish importing before measuring
+            time.sleep(args.settle_seconds)
+            result = asyncio.run(_drive(base_url, args))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        from app.services.state_store import SQLiteStore
+
+        result["serpapi_calls"] = (
+            SQLiteStore(counter_db, busy_timeout_ms=5000).get("serpapi_calls") or 0
+        )
+    return {"state": state, "workers": workers, **result}
+
+
+def print_row(row: Dict[str, Any]) -> None:
+    asks = row["agenda_asks"]
+    hit_rate = f"{row['agenda_hits'] / asks:.0%}" if asks else "-"
+    print(
+        f"{row['state']:<8} {row['workers']:>7} {row['throughput']:>8.1f} "
+        f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['errors']:>6} "
+        f"{row['serpapi_calls']:>8} {hit_rate:>8}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--states", default="memory,sqlite")
+    parser.add_argument("--conversations", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--gemini-latency-ms", type=float, default=100.0)
+    parser.add_argument("--search-latency-ms", type=float, default=150.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--settle-seconds", type=float, default=3.0)
+    parser.add_argument("--json", dest="json_path", help="write the rows here")
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    args = parser.parse_args(argv)
+    parse_mix(args.mix)
+
+    print(f"host CPUs: {os.cpu_count()}")
+    print(
+        f"{'state':<8} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'errors':>6} {'searches':>8} {'agenda':>8}"
+    )
+    rows = []
+    for state in args.states.split(","):
+        for workers in (int(n) for n in args.workers.split(",")):
+            row = run_config(args, state, workers)
+            print_row(row)
+            rows.append(row)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(rows, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
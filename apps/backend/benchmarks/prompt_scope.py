@@ -0,0 +1,169 @@
+"""Prompt size per turn with intent-scoped prompts off and on.
+
+Builds requests for a mix of turns (calendar reads and writes, replies to a
+confirmation card, web searches, tool-result rounds, small talk and turns
+the classifier should leave alone) through ``LLMService.prepare_request``,
+once with ``PROMPT_SCOPE_ENABLED=false`` and once with it on. Reports the
+estimated tokens of the system prompt plus tool declarations per scope and
+the average saved per call:
+
+    uv run python -m benchmarks.prompt_scope --provider gemini
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.chat_load import (
+    CONFIRMATION_CARD,
+    CREATE_PROMPTS,
+    EVENT_PROMPTS,
+    PLAIN_PROMPTS,
+    SAMPLE_EVENTS,
+    SEARCH_TOPICS,
+)
+from benchmarks.generation_policy import _after_tool
+
+CARD_REPLIES = ["confirm", "make it 3pm instead", "cancel", "yes", "move it to Friday"]
+# Nothing the rules recognise; these must get the full prompt
+UNCLASSIFIED = [
+    "yes please",
+    "Who won the football last night?",
+    "Can you explain how you decide what goes on my calendar?",
+    "hmm",
+]
+
+
+def build_corpus() -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """(expected scope, messages) per turn."""
+    corpus = []
+    for prompt in EVENT_PROMPTS:
+        corpus.append(("events", [{"role": "user", "content": prompt}]))
+    corpus.append(
+        (
+            "events",
+            _after_tool(
+                EVENT_PROMPTS[0],
+                "getEvents",
+                {"timeMin": "2025-10-21", "timeMax": "2025-10-22"},
+                SAMPLE_EVENTS,
+            ),
+        )
+    )
+    for prompt in CREATE_PROMPTS:
+        corpus.append(("write", [{"role": "user", "content": prompt}]))
+    for reply in CARD_REPLIES:
+        corpus.append(
+            (
+                "write",
+                [
+                    {"role": "user", "content": CREATE_PROMPTS[0]},
+                    {"role": "assistant", "content": CONFIRMATION_CARD},
+                    {"role": "user", "content": reply},
+                ],
+            )
+        )
+    for topic in SEARCH_TOPICS:
+        corpus.append(("web", [{"role": "user", "content": f"🔍 Web Search: {topic}"}]))
+    corpus.append(
+        (
+            "web",
+            _after_tool(
+                f"🔍 Web Search: {SEARCH_TOPICS[0]}",
+                "webSearch",
+                {"query": SEARCH_TOPICS[0]},
+                "1. Kick-off 8pm at Old Trafford.",
+            ),
+        )
+    )
+    for prompt in PLAIN_PROMPTS + ["What day is it?", "what time is it now"]:
+        corpus.append(("chat", [{"role": "user", "content": prompt}]))
+    for prompt in UNCLASSIFIED:
+        corpus.append(("full", [{"role": "user", "content": prompt}]))
+    return corpus
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, List[int]]]:
+    from app.api.v1.endpoints.chat import Message, to_llm_messages
+    from app.core.config import settings
+    from app.services.llm_service import LLMService
+    from app.services.prompt_scope import classify_scope
+    from app.services.search_compaction import estimate_tokens
+    from app.services.tools import get_tools_for_provider
+
+    service = LLMService()
+    tools = get_tools_for_provider(args.provider)
+    turns = [
+        (expected, to_llm_messages([Message(**m) for m in messages]))
+        for expected, messages in build_corpus()
+    ]
+
+    sizes: Dict[str, Dict[str, List[int]]] = {
+        "off": defaultdict(list),
+        "on": defaultdict(list),
+    }
+    for enabled in (False, True):
+        settings.PROMPT_SCOPE_ENABLED = enabled
+        for expected, messages in turns:
+            scope = classify_scope(messages)
+            if scope.confidence < settings.PROMPT_SCOPE_MIN_CONFIDENCE:
+                scope_name = "full"
+            else:
+                scope_name = scope.name
+            if enabled and scope_name != expected:
+                print(
+                    f"warning: {messages[-1].content[:40]!r} scoped {scope_name},"
+                    f" labelled {expected}",
+                    file=sys.stderr,
+                )
+            _, with_system, request_tools, _ = service.prepare_request(
+                args.provider, messages, args.model, tools
+            )
+            tokens = estimate_tokens(with_system[0].content) + estimate_tokens(
+                json.dumps(request_tools, default=str)
+            )
+            sizes["on" if enabled else "off"][expected].append(tokens)
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--provider", default="gemini")
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LAZY_PRELOAD_ENABLED", "false")
+    for key in ("GEMINI_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+        os.environ.setdefault(key, "benchmark-fake-key")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sizes = run(args)
+
+    print(f"{'scope':<8} {'turns':>5} {'full tok':>9} {'scoped tok':>10} {'saved':>7}")
+    saved_all = []
+    for name in ("events", "write", "web", "chat", "full"):
+        off, on = sizes["off"].get(name), sizes["on"].get(name)
+        if not off:
+            continue
+        saved = [a - b for a, b in zip(off, on)]
+        saved_all.extend(saved)
+        print(
+            f"{name:<8} {len(off):>5} {statistics.fmean(off):>9.0f} "
+            f"{statistics.fmean(on):>10.0f} {statistics.fmean(saved):>7.0f}"
+        )
+    baseline = statistics.fmean(t for rows in sizes["off"].values() for t in rows)
+    average = statistics.fmean(saved_all)
+    print(
+        f"average saved per call: {average:.0f} tokens "
+        f"({average / baseline:.0%} of {baseline:.0f})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Precision/recall and speed of near-duplicate web search query detection.
+
+Replays a labelled query log through ``NearDuplicateIndex``: every query is
+looked up before being added, and a hit counts as correct when the matched
+query carries the same label (asks for the same thing). Precision, recall and
+the hit rate of an exact-key cache are reported per threshold, followed by
+add/find timings on a larger synthetic log:
+
+    uv run python -m benchmarks.query_dedup --thresholds 0.6,0.7,0.8,0.9
+
+``--log`` takes a TSV file of ``label<TAB>query`` lines instead of the
+built-in sample.
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from app.services.query_dedup import NearDuplicateIndex
+
+# Queries sharing a label would return the same results. Neighbouring labels
+# differ by one entity, date or number to catch false merges.
+SAMPLE_LOG: List[Tuple[str, str]] = [
+    ("mun-ars-tmrw", "Man Utd vs Arsenal tomorrow"),
+    ("mun-ars-tmrw", "manchester united arsenal match tomorrow"),
+    ("mun-ars-tmrw", "man united v arsenal tmrw"),
+    ("mun-ars-tmrw", "What time is the Man United vs Arsenal game tomorrow?"),
+    ("mun-ars-tmrw", "manchester united against arsenal tomorrow"),
+    ("mci-ars-tmrw", "Man City vs Arsenal tomorrow"),
+    ("mci-ars-tmrw", "manchester city arsenal match tomorrow"),
+    ("mun-che-tmrw", "Man Utd vs Chelsea tomorrow"),
+    ("mun-ars-sat", "Man Utd vs Arsenal saturday"),
+    ("syd-weather-tmrw", "weather sydney tomorrow"),
+    ("syd-weather-tmrw", "Sydney weather forecast tomorrow"),
+    ("syd-weather-tmrw", "syd forecast tmrw"),
+    ("syd-weather-tmrw", "what's the weather in Sydney tomorrow"),
+    ("mel-weather-tmrw", "weather melbourne tomorrow"),
+    ("mel-weather-tmrw", "melb weather forecast tomorrow"),
+    ("syd-weather-today", "sydney weather today"),
+    ("syd-weather-wkend", "sydney weather this weekend"),
+    ("syd-weather-wkend", "weather in syd this wkend"),
+    ("iphone16-price", "iPhone 16 price Australia"),
+    ("iphone16-price", "iphone 16 prices australia"),
+    ("iphone15-price", "iPhone 15 price Australia"),
+    ("opera-hours", "Sydney Opera House opening hours"),
+    ("opera-hours", "opening hours sydney opera house"),
+    ("opera-hours", "Sydney Opera House hours"),
+    ("opera-tickets", "Sydney Opera House tickets"),
+    ("vivid-2025", "Vivid Sydney 2025 dates"),
+    ("vivid-2025", "vivid sydney dates 2025"),
+    ("vivid-2026", "Vivid Sydney 2026 dates"),
+    ("nye-fireworks", "NYE fireworks Sydney times"),
+    ("nye-fireworks", "new years eve fireworks sydney time"),
+    ("nye-tickets", "NYE fireworks Sydney tickets"),
+    ("swans-fixture", "Sydney Swans next game"),
+    ("swans-fixture", "sydney swans next match"),
+    ("giants-fixture", "GWS Giants next game"),
+    ("taylor-swift-syd", "Taylor Swift Sydney concert dates"),
+    ("taylor-swift-syd", "taylor swift concert dates sydney"),
+    ("taylor-swift-mel", "Taylor Swift Melbourne concert dates"),
+    ("cafe-nero-hours", "Cafe Nero Sydney CBD hours"),
+    ("cafe-nero-hours", "cafe nero sydney cbd opening hours"),
+    ("public-holidays-nsw", "NSW public holidays 2025"),
+    ("public-holidays-nsw", "public holidays NSW 2025"),
+    ("public-holidays-vic", "VIC public holidays 2025"),
+    ("spurs-ars", "Spurs vs Arsenal"),
+    ("spurs-ars", "tottenham hotspur v arsenal"),
+    ("spurs-che", "Spurs vs Chelsea"),
+]
+
+
+def load_log(path: Optional[str]) -> List[Tuple[str, str]]:
+    if not path:
+        return SAMPLE_LOG
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            label, _, query = line.rstrip("\n").partition("\t")
+            if query:
+                entries.append((label, query))
+    return entries
+
+
+def evaluate(log: List[Tuple[str, str]], threshold: float) -> dict:
+    index = NearDuplicateIndex(threshold=threshold, max_age=3600)
+    seen_labels, seen_exact = set(), set()
+    tp = fp = fn = exact = 0
+    false_merges = []
+    for label, query in log:
+        # Reusable if an earlier query asked the same thing
+        reusable = label in seen_labels
+        match = index.find(query)
+        if match is not None:
+            matched_label = match[1]
+            if matched_label == label:
+                tp += 1
+            else:
+                fp += 1
+                false_merges.append((query, match[0]))
+        elif reusable:
+            fn += 1
+        key = " ".join(query.lower().split())
+        exact += key in seen_exact
+        seen_exact.add(key)
+        seen_labels.add(label)
+        index.add(query, label)
+    reusable_total = tp + fn
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / reusable_total if reusable_total else 1.0,
+        "hits": tp + fp,
+        "exact_hits": exact,
+        "reusable": reusable_total,
+        "false_merges": false_merges,
+    }
+
+
+def synthetic_log(size: int, seed: int = 1) -> List[str]:
+    """Queries over a few thousand made-up entity names, a quarter of them
+    rephrasings of an earlier query."""
+    rng = random.Random(seed)
+    entities = [
+        "".join(
+            rng.choice("bcdfghjklmnprstvwz") + rng.choice("aeiou") for _ in range(3)
+        )
+        for _ in range(3000)
+    ]
+    topics = ["weather", "events", "restaurants", "concerts", "tickets", "hours"]
+    days = ["today", "tomorrow", "this weekend", "friday", "saturday", "next week"]
+    fillers = ["", "what's the ", "best ", "latest ", "show me "]
+    queries: List[str] = []
+    for _ in range(size):
+        if queries and rng.random() < 0.25:
+            words = rng.choice(queries).split()
+            rng.shuffle(words)
+            queries.append(rng.choice(fillers) + " ".join(words))
+            continue
+        queries.append(
+            f"{rng.choice(fillers)}{rng.choice(topics)} {rng.choice(entities)} "
+            f"{rng.choice(entities)} {rng.choice(days)}"
+        )
+    return queries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--log", help="TSV query log (label<TAB>query)")
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9,1.0")
+    parser.add_argument("--speed-queries", type=int, default=20000)
+    parser.add_argument("--min-precision", type=float, default=None)
+    parser.add_argument("--verbose", action="store_true", help="List false merges")
+    args = parser.parse_args(argv)
+
+    log = load_log(args.log)
+    print(f"query log: {len(log)} queries, {len({label for label, _ in log})} labels")
+    print(f"{'threshold':>9} {'precision':>10} {'recall':>8} {'hits':>6} {'exact':>6}")
+    worst_precision = 1.0
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        result = evaluate(log, threshold)
+        print(
+            f"{threshold:>9.2f} {result['precision']:>10.3f} {result['recall']:>8.3f} "
+            f"{result['hits']:>6} {result['exact_hits']:>6}"
+        )
+        if args.verbose:
+            for query, matched in result["false_merges"]:
+                print(f"{'':>11}false merge: '{query}' ~ '{matched}'")
+        worst_precision = min(worst_precision, result["precision"])
+    print(f"(of {evaluate(log, 1.0)['reusable']} reusable lookups)")
+
+    queries = synthetic_log(args.speed_queries)
+    index = NearDuplicateIndex(max_age=3600, max_entries=args.speed_queries)
+    started = time.perf_counter()
+    for query in queries:
+        index.add(query, None)
+    add_us = (time.perf_counter() - started) / len(queries) * 1e6
+    started = time.perf_counter()
+    hits = sum(index.find(query) is not None for query in reversed(queries))
+    find_us = (time.perf_counter() - started) / len(queries) * 1e6
+    print(
+        f"speed: add {add_us:.1f} µs/query, find {find_us:.1f} µs/query "
+        f"over {len(queries)} indexed queries ({index.stats()['buckets']} buckets, "
+        f"{hits} found)"
+    )
+
+    if args.min_precision is not None and worst_precision < args.min_precision:
+        print(f"FAIL: precision {worst_precision:.3f} < {args.min_precision}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Micro-benchmark of per-request preparation overhead.
+
+Compares the previous per-call work (convert tool schemas, build a Gemini
+GenerateContentConfig/ThinkingConfig, render the system prompt with
+str.replace) against cloning a prebuilt RequestTemplate. The template is also
+timed with requests spread over ``--timezones``, whose localised prompts are
+built on first use, to check that per-user zones add no per-request cost:
+
+    uv run python -m benchmarks.request_prep --iterations 20000
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import timeit
+from typing import List, Optional
+
+import google.genai as genai
+
+from app.services.gemini_provider import GeminiProvider
+from app.services.request_templates import RequestTemplateRegistry
+from app.services.system_prompts import (
+    CALENDAR_SYSTEM_PROMPT,
+    TIME_PLACEHOLDER,
+    format_current_time,
+    localize_prompt,
+)
+from app.services.tools import CALENDAR_TOOLS, tool_names
+from app.services.user_locale import resolve_locale
+
+DEFAULT_ZONES = (
+    "Australia/Sydney,Australia/Perth,Pacific/Auckland,Asia/Tokyo,Asia/Kolkata,"
+    "Europe/London,Europe/Berlin,America/New_York,America/Los_Angeles"
+)
+
+
+def legacy_prepare():
+    """Per-request work as done before request templates existed."""
+    tools = [
+        {
+            "name": tool["function"]["name"],
+            "description": tool["function"]["description"],
+            "parameters": tool["function"]["parameters"],
+        }
+        for tool in CALENDAR_TOOLS
+    ]
+    prompt = localize_prompt(CALENDAR_SYSTEM_PROMPT).replace(
+        TIME_PLACEHOLDER, format_current_time()
+    )
+    config = genai.types.GenerateContentConfig(
+        max_output_tokens=1000,
+        temperature=0.6,
+        thinking_config=genai.types.ThinkingConfig(thinking_budget=0),
+    )
+    config.tools = [{"function_declarations": tools}]
+    return prompt, config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--timezones", default=DEFAULT_ZONES)
+    args = parser.parse_args(argv)
+
+    provider = GeminiProvider(api_key="benchmark-fake-key", model="gemini-2.5-flash")
+    registry = RequestTemplateRegistry()
+    names = tool_names(CALENDAR_TOOLS)
+
+    def template_prepare():
+        template = registry.get(provider, "gemini", "gemini-2.5-flash", names)
+        return template.render_system_prompt(), template.new_config()
+
+    locales = itertools.cycle(
+        [resolve_locale(zone) for zone in args.timezones.split(",") if zone]
+    )
+
+    def multi_zone_prepare():
+        locale = next(locales)
+        template = registry.get(provider, "gemini", "gemini-2.5-flash", names)
+        return template.render_system_prompt(locale=locale), template.new_config()
+
+    # Build the template outside the timed loop (first request pays this once)
+    with contextlib.redirect_stdout(io.StringIO()):
+        template_prepare()
+
+    results = {}
+    for label, fn in (
+        ("legacy", legacy_prepare),
+        ("template", template_prepare),
+        ("zones", multi_zone_prepare),
+    ):
+        best = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        results[label] = best / args.iterations * 1e6
+
+    for label, micros in results.items():
+        print(f"{label:<10}{micros:>10.2f} µs/request")
+    print(f"speedup   {results['legacy'] / results['template']:>10.1f}x")
+    print(f"zones/1   {results['zones'] / results['template']:>10.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Exercise the provider router against local OpenAI/Anthropic stub servers.
+
+Checks, end to end through the real SDK clients:
+
+1. the faster backend wins once latencies are measured,
+2. traffic fails over when that backend starts erroring,
+3. a per-request cost ceiling excludes expensive backends,
+4. a per-request provider allow-list is honoured.
+
+Exits non-zero when an expectation fails. Runs offline:
+
+    uv run python -m benchmarks.router_check
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+from collections import Counter
+
+from benchmarks.stub_servers import StubBehaviour, StubServer
+
+
+async def _run(rounds: int) -> int:
+    from app.services.base_provider import LLMMessage
+    from app.services.llm_service import LLMService
+    from app.services.provider_router import RouteOptions, RouteTarget
+
+    service = LLMService()
+    service.router.targets = [
+        RouteTarget("openai", "gpt-4o-mini", 0.15, 0.60),
+        RouteTarget("anthropic", "claude-3-5-haiku-latest", 0.80, 4.00),
+    ]
+    service.router.failure_cooldown = 60.0
+    messages = [LLMMessage("user", "Hi there")]
+    failures = []
+
+    async def send(n: int, options=None) -> Counter:
+        picked = Counter()
+        for _ in range(n):
+            try:
+                response = await service.generate_response(
+                    "auto", messages, routing=options
+                )
+                picked[response.provider] += 1
+            except Exception:
+                picked["error"] += 1
+        return picked
+
+    def expect(label: str, condition: bool, detail) -> None:
+        print(f"{'ok  ' if condition else 'FAIL'} {label}: {detail}")
+        if not condition:
+            failures.append(label)
+
+    # 1. Warm up both backends, then the faster one (anthropic stub) should win
+    picked = await send(rounds)
+    expect(
+        "fastest backend preferred",
+        picked["anthropic"] > picked["openai"],
+        dict(picked),
+    )
+
+    # 2. Break the fast backend; traffic should move to openai without errors
+    ANTHROPIC.behaviour.error_rate = 1.0
+    picked = await send(rounds)
+    expect(
+        "fails over when unhealthy",
+        picked["openai"] >= rounds - 1 and picked["error"] == 0,
+        dict(picked),
+    )
+    ANTHROPIC.behaviour.error_rate = 0.0
+
+    # 3. Cost ceiling below the anthropic price keeps everything on openai
+    picked = await send(rounds, RouteOptions(max_cost_per_mtok=0.5))
+    expect("cost ceiling respected", set(picked) == {"openai"}, dict(picked))
+
+    # 4. Provider allow-list
+    picked = await send(5, RouteOptions(providers=["openai"]))
+    expect("provider override respected", set(picked) == {"openai"}, dict(picked))
+
+    for row in service.router.snapshot():
+        print(
+            f"     {row['provider']}/{row['model']}: ewma={row['ewma_latency_ms']} ms "
+            f"err={row['ewma_error_rate']} healthy={row['healthy']} n={row['samples']}"
+        )
+    return 1 if failures else 0
+
+
+OPENAI = StubServer(StubBehaviour(latency_ms=60, seed=1))
+ANTHROPIC = StubServer(StubBehaviour(latency_ms=15, seed=2))
+
+
+def main() -> int:
+    OPENAI.start()
+    ANTHROPIC.start()
+    os.environ.update(
+        OPENAI_API_KEY="stub",
+        OPENAI_BASE_URL=f"{OPENAI.url}/v1",
+        ANTHROPIC_API_KEY="stub",
+        ANTHROPIC_BASE_URL=ANTHROPIC.url,
+        LLM_CLIENT_MAX_RETRIES="0",
+    )
+    os.environ.pop("GEMINI_API_KEY", None)
+    try:
+        # Silence the backend's debug prints; keep our own report
+        sink = io.StringIO()
+        with contextlib.redirect_stdout(sink):
+            import app.services.llm_service  # noqa: F401
+        code = asyncio.run(_quiet(_run(rounds=20)))
+    finally:
+        OPENAI.stop()
+        ANTHROPIC.stop()
+    return code
+
+
+async def _quiet(coro):
+    """Drop DEBUG prints from the backend while keeping check results."""
+    real_stdout = sys.stdout
+
+    class Filter(io.TextIOBase):
+        def __init__(self):
+            self.pending = ""
+
+        def write(self, text):
+            self.pending += text
+            *lines, self.pending = self.pending.split("\n")
+            for line in lines:
+                if "DEBUG" not in line:
+                    real_stdout.write(line + "\n")
+            return len(text)
+
+    with contextlib.redirect_stdout(Filter()):
+        return await coro
+
+
+if __name__ == "__main__":
+    sys.exit(main())
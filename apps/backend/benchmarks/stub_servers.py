@@ -0,0 +1,127 @@
+"""Local HTTP stub servers speaking the OpenAI and Anthropic wire formats.
+
+Point the SDKs at them with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1`` and
+``ANTHROPIC_BASE_URL=http://127.0.0.1:<port>``. Latency and error rate can be
+changed while the server runs to simulate a backend degrading.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class StubBehaviour:
+    """Mutable latency/error settings shared with the request handler."""
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next(self) -> bool:
+        """Count a request; return True when it should fail."""
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.error_rate
+
+
+def _openai_body(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": "Hello from the OpenAI stub.",
+                },
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 8, "total_tokens": 108},
+    }
+
+
+def _anthropic_body(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:12]}",
+        "type": "message",
+        "role": "assistant",
+        "model": payload.get("model", "stub"),
+        "content": [{"type": "text", "text": "Hello from the Anthropic stub."}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 100, "output_tokens": 8},
+    }
+
+
+ROUTES = {
+    "/v1/chat/completions": _openai_body,
+    "/v1/messages": _anthropic_body,
+}
+
+
+class StubServer:
+    """Runs a stub API in a background thread."""
+
+    def __init__(self, behaviour: Optional[StubBehaviour] = None):
+        self.behaviour = behaviour or StubBehaviour()
+        behaviour = self.behaviour
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                build = ROUTES.get(self.path)
+                if build is None:
+                    self.send_error(404)
+                    return
+                fail = behaviour.next()
+                if behaviour.latency_ms:
+                    time.sleep(behaviour.latency_ms / 1000.0)
+                if fail:
+                    status, body = (
+                        503,
+                        {
+                            "error": {
+                                "type": "overloaded_error",
+                                "message": "stub overloaded",
+                            }
+                        },
+                    )
+                else:
+                    status, body = 200, build(payload)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,156 @@
+"""Local repair of malformed tool calls: how many avoid another model turn.
+
+Runs a corpus of tool calls with the mistakes models make (date-times
+without an offset, date-only bounds, an end before the start, ``start`` as a
+bare string, a draft without an end or title, enum values in the wrong case,
+numbers as strings) plus some that can't be fixed (no start, no eventId, no
+query), and a share of valid calls, through ``check_tool_call``. Reports
+how many were valid, repaired or left invalid, the per-call check time, and
+the model turns avoided: without validation every malformed call reaches
+the frontend, fails and costs another full turn; with it only the
+unrepairable ones do, as a re-prompt:
+
+    uv run python -m benchmarks.tool_repair --iterations 2000 --turn-ms 1100
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import timeit
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+START = "2025-10-24T13:00:00+11:00"
+END = "2025-10-24T14:00:00+11:00"
+
+
+def _call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"call-{name}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args)},
+    }
+
+
+def _draft(**details: Any) -> Dict[str, Any]:
+    event = {
+        "summary": "Lunch with Sam",
+        "start": {"dateTime": START, "timeZone": "Australia/Sydney"},
+        "end": {"dateTime": END, "timeZone": "Australia/Sydney"},
+    }
+    event.update(details)
+    return _call(
+        "handleEventConfirmation",
+        {"action": "modify", "eventDetails": {k: v for k, v in event.items() if v}},
+    )
+
+
+# (label, call); labels starting with "ok" are valid as sent
+CORPUS: List[Tuple[str, Dict[str, Any]]] = [
+    ("ok getEvents", _call("getEvents", {"timeMin": START, "timeMax": END})),
+    ("ok draft", _draft()),
+    ("ok webSearch", _call("webSearch", {"query": "AI conference next month"})),
+    (
+        "no offset",
+        _call(
+            "getEvents",
+            {"timeMin": "2025-10-24T00:00:00", "timeMax": "2025-10-25T00:00:00"},
+        ),
+    ),
+    (
+        "date only",
+        _call("getEvents", {"timeMin": "2025-10-24", "timeMax": "2025-10-25"}),
+    ),
+    (
+        "space separator",
+        _draft(
+            start={"dateTime": "2025-10-24 13:00"}, end={"dateTime": "2025-10-24 14:00"}
+        ),
+    ),
+    ("end before start", _draft(end={"dateTime": "2025-10-24T12:00:00+11:00"})),
+    ("no end", _draft(end=None)),
+    ("no title", _draft(summary=None)),
+    ("bare start", _draft(start="2025-10-24T13:00:00+11:00")),
+    (
+        "enum case",
+        _call(
+            "handleEventConfirmation",
+            {
+                "action": "Confirm",
+                "eventDetails": {
+                    "summary": "Lunch with Sam",
+                    "start": {"dateTime": START},
+                    "end": {"dateTime": END},
+                },
+            },
+        ),
+    ),
+    (
+        "number as string",
+        _call("getEvents", {"timeMin": START, "timeMax": END, "maxResults": "20"}),
+    ),
+    ("no start", _draft(start=None)),
+    (
+        "no eventId",
+        _call("updateEvent", {"start": {"dateTime": START}, "end": {"dateTime": END}}),
+    ),
+    ("no query", _call("webSearch", {"maxResults": 5})),
+]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--turn-ms",
+        type=float,
+        default=1100.0,
+        help="latency of the model turn a malformed call costs",
+    )
+    args = parser.parse_args(argv)
+
+    from app.services.tool_schemas import check_tool_call
+
+    outcomes: Counter = Counter()
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, call in CORPUS:
+            repaired, errors = check_tool_call(call)
+            outcome = (
+                "invalid" if errors else "repaired" if repaired is not call else "valid"
+            )
+            outcomes[outcome] += 1
+            rows.append((label, outcome, errors))
+
+        calls = [call for _, call in CORPUS]
+
+        def check_all():
+            for call in calls:
+                check_tool_call(call)
+
+        best = min(timeit.repeat(check_all, number=args.iterations, repeat=3))
+    per_call_us = best / (args.iterations * len(calls)) * 1e6
+
+    for label, outcome, errors in rows:
+        detail = f"  {errors[0]}" if errors else ""
+        print(f"{label:<18} {outcome:<9}{detail}")
+    malformed = outcomes["repaired"] + outcomes["invalid"]
+    print()
+    print(
+        f"{len(CORPUS)} calls: {outcomes['valid']} valid, {outcomes['repaired']} "
+        f"repaired, {outcomes['invalid']} invalid"
+    )
+    print(f"check      {per_call_us:>8.1f} µs/call")
+    print(
+        f"extra model turns: {malformed} without validation, "
+        f"{outcomes['invalid']} with it "
+        f"(~{outcomes['repaired'] * args.turn_ms / 1000:.1f} s saved at "
+        f"{args.turn_ms:g} ms/turn)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
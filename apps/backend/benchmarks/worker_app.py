@@ -0,0 +1,81 @@
+"""The backend with fake upstreams, for ``uvicorn --workers`` benchmarks.
+
+``benchmarks.multi_worker`` serves this module as
+``uvicorn benchmarks.worker_app:app --workers N``. Each worker process
+imports it, installs the fakes from ``benchmarks.fakes`` with latencies from
+``BENCH_*`` environment variables and counts upstream calls and the
+milliseconds spent in them (including calls cut short by a timeout or a
+cancellation) across all workers in the SQLite database at
+``BENCH_COUNTER_DB``.
+"""
+
+import os
+import time
+from typing import Any, Dict
+
+from app.services.state_store import SQLiteStore
+from benchmarks.fakes import (
+    FakeAsyncGeminiModels,
+    FakeGeminiClient,
+    FakeGoogleSearch,
+    UpstreamProfile,
+    install_fakes,
+)
+
+# Upstream call counts must not be dropped as misses when workers contend
+counter = SQLiteStore(os.environ["BENCH_COUNTER_DB"], busy_timeout_ms=5000)
+
+
+def _profile(name: str) -> UpstreamProfile:
+    return UpstreamProfile(
+        latency_ms=float(os.getenv(f"BENCH_{name}_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv(f"BENCH_{name}_JITTER_MS", "0")),
+        seed=os.getpid(),
+    )
+
+
+def _record(name: str, started: float) -> None:
+    counter.incr(f"{name}_calls")
+    counter.incr(f"{name}_ms", int((time.perf_counter() - started) * 1000))
+
+
+class CountingGoogleSearch(FakeGoogleSearch):
+    """Fake SerpAPI that records every upstream call in a shared counter."""
+
+    def get_dict(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return super().get_dict()
+        finally:
+            _record("serpapi", started)
+
+
+class CountingAsyncGeminiModels(FakeAsyncGeminiModels):
+    async def generate_content(self, model: str, contents: Any, config: Any = None):
+        started = time.perf_counter()
+        try:
+            return await super().generate_content(model, contents, config)
+        finally:
+            _record("gemini", started)
+
+
+class CountingGeminiClient(FakeGeminiClient):
+    """Fake Gemini whose async calls are recorded in the shared counter."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.aio.models = CountingAsyncGeminiModels(self.profile)
+
+
+install_fakes(gemini=_profile("GEMINI"), search=_profile("SEARCH"))
+
+from app.services import gemini_provider  # noqa: E402
+
+gemini_provider.genai.Client = CountingGeminiClient
+
+from app.main import app  # noqa: E402
+from app.services import web_search  # noqa: E402
+
+web_search.serpapi.GoogleSearch = CountingGoogleSearch
+
+__all__ = ["app"]
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.calendar_intent import classify_calendar_intent
+from app.services.user_locale import DEFAULT_TZ
+
+NOW = datetime(2025, 10, 20, 9, 0, tzinfo=DEFAULT_TZ)
+
+
+@pytest.mark.parametrize(
+    "message, kind",
+    [
+        # Reads
+        ("What's on my calendar tomorrow?", "read"),
+        ("what's on tomorrow?", "read"),
+        ("any meetings today?", "read"),
+        ("Do I have anything on Friday?", "read"),
+        ("meetings tomorrow?", "read"),
+        ("anything on friday", "read"),
+        ("What's my next event?", "read"),
+        ("how busy am I this week", "read"),
+        ("Show me my agenda for next week", "read"),
+        # Writes
+        ("Add meeting with John tomorrow 2pm", "write"),
+        ("Schedule a dentist appointment on Friday at 10am", "write"),
+        ("Create a focus block this afternoon", "write"),
+        ("add lunch with Sam on Friday", "write"),
+        ("Please set up a call with the team", "write"),
+        ("Cancel my 3pm", "write"),
+        ("Move the standup to 10:30", "write"),
+        ("Add a reminder to call mum", "write"),
+        ("Cancel the meeting with Alex", "write"),
+        # Not calendar
+        ("what is the weather tomorrow", "none"),
+        ("whats the score of the game today", "none"),
+        ("check the news today", "none"),
+        ("What's the price of bitcoin this week?", "none"),
+        ("Who won the match on Sunday?", "none"),
+        ("add milk to my shopping list", "none"),
+        ("put the kettle on", "none"),
+        ("change my password", "none"),
+        ("Cancel", "none"),
+        ("Tell me a joke", "none"),
+        ("🔍 Web Search: meetings tomorrow in Sydney", "none"),
+    ],
+)
+def test_classify_calendar_intent(message, kind):
+    assert classify_calendar_intent(message, NOW).kind == kind
+
+
+@pytest.mark.parametrize(
+    "message, confidence",
+    [
+        ("What's on my calendar tomorrow?", 0.9),
+        ("What's my next event?", 0.6),
+        ("meetings tomorrow?", 0.7),
+        ("Add meeting with John tomorrow 2pm", 0.8),
+    ],
+)
+def test_confidence(message, confidence):
+    assert classify_calendar_intent(message, NOW).confidence == confidence
+
+
+def test_window_is_resolved_for_reads_and_writes():
+    read = classify_calendar_intent("any meetings tomorrow?", NOW)
+    write = classify_calendar_intent("Add meeting with John tomorrow 2pm", NOW)
+    assert read.window == write.window
+    assert read.window.label == "tomorrow"
+    assert read.window.start == datetime(2025, 10, 21, tzinfo=DEFAULT_TZ)
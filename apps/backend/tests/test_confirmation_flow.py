@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.base_provider import LLMMessage
+from app.services.confirmation_flow import answer_turn
+from app.services.user_locale import resolve_locale
+
+SYDNEY = resolve_locale("Australia/Sydney")
+NEW_YORK = resolve_locale("America/New_York")
+
+# 2pm-3pm on Tue 21 Oct 2025 in Sydney (AEDT, +11:00)
+SYDNEY_CARD = (
+    "**Title:** Meeting with John\n"
+    "**Date & Time:** 2025-10-21T14:00:00+11:00 - 2025-10-21T15:00:00+11:00\n"
+    "**Location:** None\n"
+)
+# The same meeting as a New York user's card (EDT, -04:00)
+NEW_YORK_CARD = (
+    "**Title:** Meeting with John\n"
+    "**Date & Time:** 2025-10-20T23:00:00-04:00 - 2025-10-21T00:00:00-04:00\n"
+    "**Location:** None\n"
+)
+START = datetime(2025, 10, 21, 3, 0, tzinfo=timezone.utc)
+
+
+def _thread(card: str, reply: str):
+    return [
+        LLMMessage("user", "Add meeting with John tomorrow 2pm"),
+        LLMMessage("assistant", card),
+        LLMMessage("user", reply),
+    ]
+
+
+def _event(turn):
+    (call,) = turn.tool_calls
+    details = json.loads(call["function"]["arguments"])["eventDetails"]
+    return (
+        datetime.fromisoformat(details["start"]["dateTime"]),
+        datetime.fromisoformat(details["end"]["dateTime"]),
+        details["start"]["timeZone"],
+    )
+
+
+@pytest.mark.parametrize("card", [SYDNEY_CARD, NEW_YORK_CARD])
+@pytest.mark.parametrize("locale", [SYDNEY, NEW_YORK])
+def test_confirm_books_the_card_instant_in_any_timezone(card, locale):
+    turn = answer_turn(_thread(card, "confirm"), locale)
+    assert turn.outcome == "confirm"
+    start, end, zone = _event(turn)
+    assert start == START
+    assert (end - start).total_seconds() == 3600
+    assert zone == locale.timezone
+
+
+def test_form_edit_in_utc_keeps_the_instant():
+    edit = (
+        "modify the event with these details:\n\n"
+        "**Date & Time:** 2025-10-21T04:30:00.000Z - 2025-10-21T05:30:00.000Z"
+    )
+    turn = answer_turn(_thread(NEW_YORK_CARD, edit), NEW_YORK)
+    assert turn.outcome == "modify"
+    start, end, _ = _event(turn)
+    assert start == datetime(2025, 10, 21, 4, 30, tzinfo=timezone.utc)
+    assert end == datetime(2025, 10, 21, 5, 30, tzinfo=timezone.utc)
+    details = json.loads(turn.tool_calls[0]["function"]["arguments"])
+    assert details["eventDetails"]["summary"] == "Meeting with John"
+
+
+@pytest.mark.parametrize(
+    "when",
+    [
+        # Display text: the zone it was rendered in is unknown
+        "Tue, Oct 21, 2:00 PM - Tue, Oct 21, 3:00 PM",
+        "Tuesday 21 October 2025 at 02:00 pm - Tuesday 21 October 2025 at 03:00 pm",
+        # A wall time without an offset
+        "2025-10-21T14:00:00 - 2025-10-21T15:00:00",
+    ],
+)
+def test_card_without_an_offset_goes_to_the_model(when):
+    card = f"**Title:** Meeting with John\n**Date & Time:** {when}\n"
+    assert answer_turn(_thread(card, "confirm"), NEW_YORK) is None
+
+
+def test_cancel_needs_an_open_card():
+    assert answer_turn(_thread(SYDNEY_CARD, "cancel"), NEW_YORK).outcome == "cancel"
+    messages = [LLMMessage("user", "hi"), LLMMessage("user", "cancel")]
+    assert answer_turn(messages, NEW_YORK) is None
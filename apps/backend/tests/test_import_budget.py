@@ -0,0 +1,47 @@
+"""``import main`` must stay fast and leave the provider SDKs unimported.
+
+The budget is deliberately loose for shared CI machines; tighten it locally
+with ``IMPORT_BUDGET_MS``. ``benchmarks.import_budget`` shows where the time
+goes when this fails.
+"""
+
+import os
+import subprocess
+import sys
+
+from benchmarks.import_budget import parse_importtime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+RUNS = int(os.getenv("IMPORT_BUDGET_RUNS", "3"))
+DEFERRED = ("google.genai", "serpapi", "openai", "anthropic")
+
+SCRIPT = f"""
+import sys
+import main
+print("EAGER:" + ",".join(m for m in {DEFERRED!r} if m in sys.modules))
+"""
+
+
+def _import_main():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, PYTHONPATH=BACKEND_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms, _ = parse_importtime(proc.stderr)
+    eager = proc.stdout.split("EAGER:", 1)[-1].strip().split(",")
+    return total_ms, [name for name in eager if name]
+
+
+def test_import_main_within_budget_without_provider_sdks():
+    runs = [_import_main() for _ in range(RUNS)]
+    for _, eager in runs:
+        assert eager == [], f"imported at startup: {', '.join(eager)}"
+    best_ms = min(total_ms for total_ms, _ in runs)
+    assert 0 < best_ms <= BUDGET_MS, (
+        f"import main took {best_ms:.0f} ms, over the {BUDGET_MS:.0f} ms budget"
+    )
@@ -0,0 +1,44 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.services.state_store import SQLiteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / "state.db"), busy_timeout_ms=20)
+
+
+@pytest.fixture
+def other_writer(store):
+    """Another worker's connection, for holding the write lock."""
+    other = sqlite3.connect(store.path, isolation_level=None)
+    yield other
+    other.close()
+
+
+def test_round_trip(store):
+    store.set("a", {"x": 1}, ttl=60)
+    assert store.get("a") == {"x": 1}
+    assert not store.add("a", 2)
+    assert store.incr("n") == 1
+    assert sorted(store.keys()) == ["a", "n"]
+
+
+def test_a_held_write_lock_is_a_quick_miss(store, other_writer):
+    store.set("a", 1)
+    other_writer.execute("BEGIN IMMEDIATE")
+    started = time.perf_counter()
+    store.set("a", 2)
+    assert store.add("b", 1) is False
+    store.delete("a")
+    assert time.perf_counter() - started < 1.0
+    with pytest.raises(sqlite3.OperationalError):
+        store.incr("n")
+    # WAL readers are never blocked, and the dropped writes left no trace
+    assert store.get("a") == 1
+    other_writer.execute("ROLLBACK")
+    assert store.get("a") == 1
+    assert store.get("b") is None
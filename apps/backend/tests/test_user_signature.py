@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.user_signature import (
+    USER_SIGNATURE_HEADER,
+    sign_user_id,
+    verified_user_id,
+)
+from main import app
+
+SECRET = "test-secret"
+SYNC = {
+    "user_id": "user-1",
+    "timezone": "America/New_York",
+    "timeMin": "2025-10-20T00:00:00-04:00",
+    "timeMax": "2025-10-22T00:00:00-04:00",
+    "events": [],
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "USER_ID_SIGNING_SECRET", SECRET)
+    return TestClient(app)
+
+
+def test_verified_user_id():
+    signature = sign_user_id("user-1", SECRET)
+    assert verified_user_id("user-1", signature, SECRET) == "user-1"
+    assert verified_user_id("user-1", signature.upper(), SECRET) == "user-1"
+    assert verified_user_id("user-2", signature, SECRET) is None
+    assert verified_user_id("user-1", None, SECRET) is None
+    assert verified_user_id("user-1", "é", SECRET) is None
+    # Nothing is trusted without a secret
+    assert verified_user_id("user-1", sign_user_id("user-1", ""), "") is None
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {},
+        {USER_SIGNATURE_HEADER: sign_user_id("someone-else", SECRET)},
+        {USER_SIGNATURE_HEADER: sign_user_id("user-1", "wrong-secret")},
+    ],
+)
+def test_agenda_sync_rejects_unsigned_user_ids(client, headers):
+    response = client.post("/api/v1/chat/agenda/sync", json=SYNC, headers=headers)
+    assert response.status_code == 401
+
+
+def test_agenda_sync_accepts_a_signed_user_id(client):
+    headers = {USER_SIGNATURE_HEADER: sign_user_id("user-1", SECRET)}
+    response = client.post("/api/v1/chat/agenda/sync", json=SYNC, headers=headers)
+    assert response.status_code == 200
+    assert "digests" in response.json()
+
+
+@pytest.mark.parametrize("signed, synced", [(False, False), (True, True)])
+def test_generate_uses_digests_only_for_a_signed_user_id(client, signed, synced):
+    headers = {USER_SIGNATURE_HEADER: sign_user_id("user-1", SECRET)} if signed else {}
+    body = {
+        "messages": [{"role": "user", "content": "hello"}],
+        "model_provider": "fake",
+        "model_name": "fake-model",
+        "user_id": "user-1",
+    }
+    response = client.post("/api/v1/chat/generate", json=body, headers=headers)
+    assert response.status_code == 200
+    assert (response.json()["agenda_sync"] is not None) == synced
@@ -14,7 +14,10 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    const { toolCalls }: { toolCalls: ToolCall[] } = await request.json();
+    const {
+      toolCalls,
+      timeZone,
+    }: { toolCalls: ToolCall[]; timeZone?: string } = await request.json();
 
     if (!toolCalls || !Array.isArray(toolCalls)) {
       return NextResponse.json(
@@ -23,7 +26,7 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    const executor = new ToolExecutor(session.user.id);
+    const executor = new ToolExecutor(session.user.id, timeZone);
     const results = [];
 
     for (const toolCall of toolCalls) {
@@ -6,7 +6,7 @@ import { useChat } from "~/hooks/useChat";
 import { useAIResponse } from "~/hooks/useAIResponse";
 import { useCalendar } from "~/hooks/useCalendar";
 import { useLocalStorage } from "~/hooks/useLocalStorage";
-import { showToast } from "~/utils/chat";
+import { browserLocale, showToast } from "~/utils/chat";
 import ThreadSidebar from "~/components/chat/ThreadSidebar";
 import CalendarPane from "~/components/chat/CalendarPane";
 import MessagesList from "~/components/chat/MessagesList";
@@ -103,15 +103,13 @@ export default function ChatPage() {
         const [startTime, endTime] = dateTimeText.split(" - ");
         if (startTime && endTime) {
           try {
-            // Parse the human-readable Australian date format
-            // Format: "Monday, 20 January 2025 at 2:00 PM"
-            const parseAustralianDate = (dateStr: string) => {
+            // Cards carry RFC3339 with an offset; older ones may still hold
+            // display text such as "Monday, 20 January 2025 at 2:00 PM"
+            const parseCardDate = (dateStr: string) => {
               try {
                 // Remove "at" and clean up the string
                 const cleanStr = dateStr.trim().replace(" at ", " ");
 
-                // Try to parse using Intl.DateTimeFormat with Australian locale
-                // This should handle the Australian date format properly
                 const date = new Date(cleanStr);
 
                 if (!isNaN(date.getTime())) {
@@ -133,18 +131,18 @@ export default function ChatPage() {
               }
             };
 
-            const startDate = parseAustralianDate(startTime.trim());
-            const endDate = parseAustralianDate(endTime.trim());
+            const startDate = parseCardDate(startTime.trim());
+            const endDate = parseCardDate(endTime.trim());
 
             if (!isNaN(startDate.getTime()) && !isNaN(endDate.getTime())) {
               // Always convert to ISO format for backend
               eventDetails.start = {
                 dateTime: startDate.toISOString(),
-                timeZone: "Australia/Sydney",
+                timeZone: browserLocale().timeZone,
               };
               eventDetails.end = {
                 dateTime: endDate.toISOString(),
-                timeZone: "Australia/Sydney",
+                timeZone: browserLocale().timeZone,
               };
             } else {
               throw new Error("Invalid date format");
@@ -156,11 +154,11 @@ export default function ChatPage() {
             const endTime = new Date(now.getTime() + 60 * 60 * 1000);
             eventDetails.start = {
               dateTime: now.toISOString(),
-              timeZone: "Australia/Sydney",
+              timeZone: browserLocale().timeZone,
             };
             eventDetails.end = {
               dateTime: endTime.toISOString(),
-              timeZone: "Australia/Sydney",
+              timeZone: browserLocale().timeZone,
             };
           }
         }
@@ -205,7 +203,7 @@ export default function ChatPage() {
                   hour: "numeric",
                   minute: "2-digit",
                   hour12: true,
-                  timeZone: "Australia/Sydney", // Always display in Australia/Sydney timezone
+                  timeZone: browserLocale().timeZone,
                 });
               };
 
@@ -247,7 +245,7 @@ export default function ChatPage() {
     const endDate = new Date(endDateTime);
 
     const formatDateTime = (date: Date) => {
-      // Always display in Australia/Sydney timezone for consistency
+      // Display in the user's timezone, the one sent to the backend
       return date.toLocaleString("en-US", {
         weekday: "short",
         month: "short",
@@ -255,7 +253,7 @@ export default function ChatPage() {
         hour: "numeric",
         minute: "2-digit",
         hour12: true,
-        timeZone: "Australia/Sydney", // Always display in Australia/Sydney timezone
+        timeZone: browserLocale().timeZone,
       });
     };
 
@@ -271,32 +269,21 @@ export default function ChatPage() {
     return message;
   };
 
-  // Format event details for modify messages (consistent with edit confirmations)
+  // Format event details for modify messages. Times go out as RFC 3339 in
+  // UTC so the backend never has to guess the zone of a display string;
+  // the message list renders them in local time
   const formatEventDetailsForModify = (eventDetails: any) => {
     const startDateTime = eventDetails.start?.dateTime || eventDetails.start;
     const endDateTime = eventDetails.end?.dateTime || eventDetails.end;
 
-    const startDate = new Date(startDateTime);
-    const endDate = new Date(endDateTime);
-
-    const formatDateTime = (date: Date) => {
-      return date.toLocaleString("en-US", {
-        weekday: "short",
-        month: "short",
-        day: "numeric",
-        hour: "numeric",
-        minute: "2-digit",
-        hour12: true,
-        timeZone: "Australia/Sydney",
-      });
-    };
-
     const details = [];
     if (eventDetails.summary)
       details.push(`**Title:** ${eventDetails.summary}`);
     if (eventDetails.start) {
-      const startTime = formatDateTime(startDate);
-      const endTime = eventDetails.end ? formatDateTime(endDate) : "TBD";
+      const startTime = new Date(startDateTime).toISOString();
+      const endTime = eventDetails.end
+        ? new Date(endDateTime).toISOString()
+        : "TBD";
       details.push(`**Date & Time:** ${startTime} - ${endTime}`);
     }
     if (eventDetails.location)
@@ -651,6 +638,7 @@ export default function ChatPage() {
       message: userMessage,
       modelProvider: "gemini",
       modelName: model,
+      ...browserLocale(),
     });
   };
 
@@ -731,6 +719,7 @@ export default function ChatPage() {
       message: userMessage,
       modelProvider: "gemini",
       modelName: model,
+      ...browserLocale(),
     });
   };
 
@@ -804,6 +793,7 @@ export default function ChatPage() {
         message: `🔍 Web Search: ${searchQuery}`,
         modelProvider: "gemini",
         modelName: model,
+        ...browserLocale(),
       });
     } finally {
       setIsWebSearching(false);
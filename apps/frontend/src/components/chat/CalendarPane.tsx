@@ -1,5 +1,6 @@
 import { useState } from "react";
 import type { Event } from "~/types/chat";
+import { browserLocale } from "~/utils/chat";
 import EventEditModal from "./EventEditModal";
 import CalendarRangePicker, { type CalendarRange } from "./CalendarRangePicker";
 
@@ -252,7 +253,7 @@ export default function CalendarPane({
                               hour: "numeric",
                               minute: "2-digit",
                               hour12: true,
-                              timeZone: "Australia/Sydney", // Always display in Australia/Sydney timezone
+                              timeZone: browserLocale().timeZone,
                             })}
                           </p>
                           {event.location && (
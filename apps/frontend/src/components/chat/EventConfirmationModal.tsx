@@ -2,6 +2,7 @@
 
 import { useState, useEffect, useCallback, useMemo } from "react";
 import type { Event } from "~/types/chat";
+import { browserLocale } from "~/utils/chat";
 
 interface EventConfirmationModalProps {
   isOpen: boolean;
@@ -125,7 +126,7 @@ export default function EventConfirmationModal({
     e.preventDefault();
 
     // Use the original timezone from event details
-    const timeZone = eventDetails.start?.timeZone || "Australia/Sydney";
+    const timeZone = eventDetails.start?.timeZone || browserLocale().timeZone;
 
     // Parse the datetime-local values as local time
     const startDateTime = new Date(formData.start);
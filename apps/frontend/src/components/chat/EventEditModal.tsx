@@ -34,9 +34,9 @@ export default function EventEditModal({
       const startDate = new Date(event.start);
       const endDate = new Date(event.end);
 
-      // Format dates for datetime-local input (convert from Australia/Sydney to local for display)
+      // Format dates for datetime-local input, which is in the browser's
+      // local time
       const formatDateTime = (date: Date) => {
-        // Convert from Australia/Sydney timezone to local time for the input
         const localDate = new Date(
           date.toLocaleString("en-US", {
             timeZone: Intl.DateTimeFormat().resolvedOptions().timeZone,
@@ -124,24 +124,14 @@ export default function EventEditModal({
     e.preventDefault();
     if (!event?.id) return;
 
-    // Convert local time to Australia/Sydney timezone for consistency
-    const convertToAustraliaTime = (localDate: Date) => {
-      // Create a new date in Australia/Sydney timezone
-      const ausTime = new Date(
-        localDate.toLocaleString("en-US", {
-          timeZone: "Australia/Sydney",
-        }),
-      );
-      return ausTime.toISOString();
-    };
-
     const updatedEvent: Partial<Event> = {
       id: event.id,
       summary: formData.summary,
       description: formData.description,
       location: formData.location,
-      start: convertToAustraliaTime(new Date(formData.start)),
-      end: convertToAustraliaTime(new Date(formData.end)),
+      // datetime-local values parse as local time, so this is the instant
+      start: new Date(formData.start).toISOString(),
+      end: new Date(formData.end).toISOString(),
     };
 
     await onSave(updatedEvent);
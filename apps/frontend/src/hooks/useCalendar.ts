@@ -1,5 +1,5 @@
 import { useSession } from "next-auth/react";
-import { showToast } from "~/utils/chat";
+import { browserLocale, showToast } from "~/utils/chat";
 import type { Event } from "~/types/chat";
 
 interface UseCalendarProps {
@@ -54,6 +54,7 @@ export const useCalendar = ({
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
+          timeZone: browserLocale().timeZone,
           toolCalls: [
             {
               id: "fetch-events",
@@ -170,6 +171,7 @@ export const useCalendar = ({
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
+          timeZone: browserLocale().timeZone,
           toolCalls: [
             {
               id: "update-event",
@@ -278,6 +280,7 @@ export const useCalendar = ({
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
+          timeZone: browserLocale().timeZone,
           toolCalls: [
             {
               id: "delete-event",
@@ -21,26 +21,23 @@ export interface ToolResult {
 
 export class ToolExecutor {
   private userId: string;
+  // IANA zone the user's browser resolved; times without an offset are in it
+  private timeZone: string;
 
-  constructor(userId: string) {
+  constructor(userId: string, timeZone?: string) {
     this.userId = userId;
+    this.timeZone =
+      timeZone || Intl.DateTimeFormat().resolvedOptions().timeZone;
   }
 
   private convertTimeReference(timeRef: string): string {
-    // Create a date in Australian timezone for consistency
     const now = new Date();
-    // Always use Australian timezone for debugging
-    const userTimezone = "Australia/Sydney";
+    const userTimezone = this.timeZone;
 
-    // Convert current time to Australian timezone
-    // Use a more reliable method to get Australian time
-    const ausTime = new Date(
-      now.toLocaleString("en-US", { timeZone: "Australia/Sydney" }),
-    );
-
-    // Alternative method using Intl.DateTimeFormat for more reliable timezone conversion
+    // The user's wall clock as a local Date, so the date arithmetic below
+    // works in their timezone
     const formatter = new Intl.DateTimeFormat("en-US", {
-      timeZone: "Australia/Sydney",
+      timeZone: userTimezone,
       year: "numeric",
       month: "2-digit",
       day: "2-digit",
@@ -50,31 +47,19 @@ export class ToolExecutor {
       hour12: false,
     });
     const parts = formatter.formatToParts(now);
-    const ausTimeAlt = new Date(
+    const zonedNow = new Date(
       parseInt(parts.find((p) => p.type === "year")?.value || "0"),
       parseInt(parts.find((p) => p.type === "month")?.value || "1") - 1,
       parseInt(parts.find((p) => p.type === "day")?.value || "1"),
-      parseInt(parts.find((p) => p.type === "hour")?.value || "0"),
+      parseInt(parts.find((p) => p.type === "hour")?.value || "0") % 24,
       parseInt(parts.find((p) => p.type === "minute")?.value || "0"),
       parseInt(parts.find((p) => p.type === "second")?.value || "0"),
     );
 
-    // Use the more reliable timezone conversion
-    const finalAusTime = ausTimeAlt;
-
-    // Additional debugging for today calculation
-    if (timeRef.toLowerCase() === "today") {
-      const todayStart = new Date(
-        finalAusTime.getFullYear(),
-        finalAusTime.getMonth(),
-        finalAusTime.getDate(),
-      );
-    }
-
     // Handle complex time references like "tomorrow 2pm", "next week monday 3pm", etc.
     if (timeRef.includes("tomorrow")) {
-      const tomorrow = new Date(finalAusTime);
-      tomorrow.setDate(finalAusTime.getDate() + 1);
+      const tomorrow = new Date(zonedNow);
+      tomorrow.setDate(zonedNow.getDate() + 1);
 
       // Extract time if present
       const timeMatch = /(\d{1,2}):?(\d{0,2})\s*(am|pm)?/i.exec(timeRef);
@@ -97,7 +82,7 @@ export class ToolExecutor {
 
     // Handle "today" with time
     if (timeRef.includes("today")) {
-      const today = new Date(finalAusTime);
+      const today = new Date(zonedNow);
 
       const timeMatch = /(\d{1,2}):?(\d{0,2})\s*(am|pm)?/i.exec(timeRef);
       if (timeMatch) {
@@ -119,8 +104,8 @@ export class ToolExecutor {
 
     // Handle "next week" references
     if (timeRef.includes("next week")) {
-      const nextWeek = new Date(finalAusTime);
-      nextWeek.setDate(finalAusTime.getDate() + 7);
+      const nextWeek = new Date(zonedNow);
+      nextWeek.setDate(zonedNow.getDate() + 7);
 
       // Extract day of week if present
       const dayMatch =
@@ -170,8 +155,8 @@ export class ToolExecutor {
       const daysMatch = /(\d+)\s+days?\s+ago/i.exec(timeRef);
       if (daysMatch?.[1]) {
         const daysAgo = parseInt(daysMatch[1]);
-        const pastDate = new Date(finalAusTime);
-        pastDate.setDate(finalAusTime.getDate() - daysAgo);
+        const pastDate = new Date(zonedNow);
+        pastDate.setDate(zonedNow.getDate() - daysAgo);
         pastDate.setHours(0, 0, 0, 0);
         return this.formatDateTimeForCalendar(pastDate, userTimezone);
       }
@@ -182,8 +167,8 @@ export class ToolExecutor {
       const daysMatch = /(\d+)\s+days?\s+from\s+now/i.exec(timeRef);
       if (daysMatch?.[1]) {
         const daysFromNow = parseInt(daysMatch[1]);
-        const futureDate = new Date(finalAusTime);
-        futureDate.setDate(finalAusTime.getDate() + daysFromNow);
+        const futureDate = new Date(zonedNow);
+        futureDate.setDate(zonedNow.getDate() + daysFromNow);
         futureDate.setHours(23, 59, 59, 999);
         return this.formatDateTimeForCalendar(futureDate, userTimezone);
       }
@@ -191,26 +176,26 @@ export class ToolExecutor {
 
     switch (timeRef.toLowerCase()) {
       case "now":
-        return this.formatDateTimeForCalendar(finalAusTime, userTimezone);
+        return this.formatDateTimeForCalendar(zonedNow, userTimezone);
       case "today":
         const todayStart = new Date(
-          finalAusTime.getFullYear(),
-          finalAusTime.getMonth(),
-          finalAusTime.getDate(),
+          zonedNow.getFullYear(),
+          zonedNow.getMonth(),
+          zonedNow.getDate(),
         );
         return this.formatDateTimeForCalendar(todayStart, userTimezone);
       case "tomorrow":
         const tomorrowStart = new Date(
-          finalAusTime.getFullYear(),
-          finalAusTime.getMonth(),
-          finalAusTime.getDate() + 1,
+          zonedNow.getFullYear(),
+          zonedNow.getMonth(),
+          zonedNow.getDate() + 1,
         );
         return this.formatDateTimeForCalendar(tomorrowStart, userTimezone);
       case "yesterday":
         const yesterdayStart = new Date(
-          finalAusTime.getFullYear(),
-          finalAusTime.getMonth(),
-          finalAusTime.getDate() - 1,
+          zonedNow.getFullYear(),
+          zonedNow.getMonth(),
+          zonedNow.getDate() - 1,
         );
         return this.formatDateTimeForCalendar(yesterdayStart, userTimezone);
       default:
@@ -223,13 +208,13 @@ export class ToolExecutor {
           return timeRef;
         }
         // Otherwise, assume it's a relative reference and return current time
-        return finalAusTime.toISOString();
+        return now.toISOString();
     }
   }
 
   private formatDateTimeForCalendar(date: Date, timezone: string): string {
-    // Format the date as RFC3339 with Australian timezone
-    // This ensures Google Calendar interprets the time correctly in Australian timezone
+    // RFC3339 with the offset ``timezone`` has at that wall time, so Google
+    // Calendar reads it in the user's timezone
     const year = date.getFullYear();
     const month = String(date.getMonth() + 1).padStart(2, "0");
     const day = String(date.getDate()).padStart(2, "0");
@@ -237,14 +222,10 @@ export class ToolExecutor {
     const minutes = String(date.getMinutes()).padStart(2, "0");
     const seconds = String(date.getSeconds()).padStart(2, "0");
 
-    // Use Australian timezone offset (AEST/AEDT)
-    // Australia/Sydney is UTC+10 (AEST) or UTC+11 (AEDT)
-    // For simplicity, we'll use UTC+10 (AEST) - you can make this dynamic if needed
-    const offsetHours = 10;
-    const offsetMinutes = 0;
-    const offsetSign = "+";
-
-    return `${year}-${month}-${day}T${hours}:${minutes}:${seconds}${offsetSign}${String(offsetHours).padStart(2, "0")}:${String(offsetMinutes).padStart(2, "0")}`;
+    return withOffset(
+      `${year}-${month}-${day}T${hours}:${minutes}:${seconds}`,
+      timezone,
+    );
   }
 
   async executeToolCall(toolCall: ToolCall): Promise<ToolResult> {
@@ -286,53 +267,117 @@ export class ToolExecutor {
     }
   }
 
+  // Speculative getEvents fetch for the window the backend's intent detector
+  // predicted; started while the model is still deciding on its tool call
+  private eventsPrefetch: {
+    timeMin: number;
+    timeMax: number;
+    items: Promise<any[] | null>;
+  } | null = null;
+
+  prefetchEvents(timeMin: string, timeMax: string): void {
+    const params = new URLSearchParams({ timeMin, timeMax });
+    this.eventsPrefetch = {
+      timeMin: Date.parse(timeMin),
+      timeMax: Date.parse(timeMax),
+      items: this.fetchEventItems("primary", params).catch(() => null),
+    };
+  }
+
+  private async fetchEventItems(
+    calendarId: string,
+    params: URLSearchParams,
+  ): Promise<any[]> {
+    const url = `https://www.googleapis.com/calendar/v3/calendars/${encodeURIComponent(calendarId)}/events?${params.toString()}`;
+
+    const response = await makeGoogleApiCall(
+      url,
+      {
+        headers: {},
+      },
+      this.userId,
+    );
+
+    if (!response.ok) {
+      const errorText = await response.text().catch(() => "Unknown error");
+      throw new Error(
+        `Google Calendar API error: ${response.status} ${response.statusText} - ${errorText}`,
+      );
+    }
+
+    const data = await response.json();
+    return data.items || [];
+  }
+
+  // Full snapshot of a window with recurring events expanded, for the
+  // backend's precomputed agenda digests
+  async listEventsForSync(timeMin: string, timeMax: string): Promise<any[]> {
+    const params = new URLSearchParams({
+      timeMin,
+      timeMax,
+      singleEvents: "true",
+      orderBy: "startTime",
+    });
+    const items = await this.fetchEventItems("primary", params);
+    return items
+      .filter((event: any) => event.status !== "cancelled")
+      .map(formatEvent);
+  }
+
+  // Events from the prefetch when it covers the requested window, else null
+  private async prefetchedEvents(
+    args: any,
+    timeMin: string | undefined,
+    timeMax: string | undefined,
+  ): Promise<any[] | null> {
+    const prefetch = this.eventsPrefetch;
+    if (!prefetch || !timeMin || !timeMax || args.query) return null;
+    if (args.calendarId && args.calendarId !== "primary") return null;
+
+    const start = Date.parse(timeMin);
+    const end = Date.parse(timeMax);
+    if (!(start >= prefetch.timeMin && end <= prefetch.timeMax)) return null;
+
+    const items = await prefetch.items;
+    if (!items) return null;
+
+    const overlapping = items.filter((event: any) => {
+      // Recurring series masters carry no instance times; keep them like the API would
+      if (event.recurrence) return true;
+      const eventStart = Date.parse(event.start?.dateTime || event.start?.date);
+      const eventEnd = Date.parse(event.end?.dateTime || event.end?.date);
+      return eventStart < end && eventEnd > start;
+    });
+    console.log(
+      `getEvents served from prefetch (${overlapping.length}/${items.length} events)`,
+    );
+    return args.maxResults ? overlapping.slice(0, args.maxResults) : overlapping;
+  }
+
   private async getEvents(args: any): Promise<ToolResult> {
     try {
       const params = new URLSearchParams();
 
       // Convert relative time references to proper RFC3339 timestamps
-      if (args.timeMin) {
-        const timeMin = this.convertTimeReference(args.timeMin);
-        params.append("timeMin", timeMin);
-      }
-      if (args.timeMax) {
-        const timeMax = this.convertTimeReference(args.timeMax);
-        params.append("timeMax", timeMax);
-      }
+      const timeMin = args.timeMin
+        ? this.convertTimeReference(args.timeMin)
+        : undefined;
+      const timeMax = args.timeMax
+        ? this.convertTimeReference(args.timeMax)
+        : undefined;
+      if (timeMin) params.append("timeMin", timeMin);
+      if (timeMax) params.append("timeMax", timeMax);
       if (args.query) params.append("q", args.query);
       if (args.maxResults)
         params.append("maxResults", args.maxResults.toString());
 
       const calendarId = args.calendarId || "primary";
-      const url = `https://www.googleapis.com/calendar/v3/calendars/${encodeURIComponent(calendarId)}/events?${params.toString()}`;
-
-      const response = await makeGoogleApiCall(
-        url,
-        {
-          headers: {},
-        },
-        this.userId,
-      );
-
-      if (!response.ok) {
-        const errorText = await response.text().catch(() => "Unknown error");
-        throw new Error(
-          `Google Calendar API error: ${response.status} ${response.statusText} - ${errorText}`,
-        );
-      }
-
-      const data = await response.json();
-      const events = data.items || [];
+      const events =
+        (await this.prefetchedEvents(args, timeMin, timeMax)) ??
+        (await this.fetchEventItems(calendarId, params));
 
       // Format events for display
-      const formattedEvents = events.map((event: any) => ({
-        id: event.id,
-        summary: event.summary || "No title",
-        start: event.start?.dateTime || event.start?.date,
-        end: event.end?.dateTime || event.end?.date,
-        location: event.location,
-        description: event.description,
-      }));
+      const formattedEvents = events.map(formatEvent);
 
       return {
         tool_call_id: "",
@@ -380,8 +425,7 @@ export class ToolExecutor {
         throw new Error("Invalid end time format");
       }
 
-      // Always use Australian timezone for debugging
-      const userTimezone = "Australia/Sydney";
+      const userTimezone = this.timeZone;
 
       const eventData = {
         summary: args.summary,
@@ -484,8 +528,7 @@ export class ToolExecutor {
         throw new Error("Invalid end time format");
       }
 
-      // Always use Australian timezone for debugging
-      const userTimezone = "Australia/Sydney";
+      const userTimezone = this.timeZone;
 
       const eventData: any = {};
       if (summary) eventData.summary = summary;
@@ -633,23 +676,16 @@ export class ToolExecutor {
           // If eventDetails are provided, present them for confirmation
           const { summary, start, end, location, description } = eventDetails;
 
-          // Format the event details for display
-          const formatDateTime = (dateTime: string) => {
-            const date = new Date(dateTime);
-            return date.toLocaleString("en-AU", {
-              timeZone: "Australia/Sydney",
-              weekday: "long",
-              year: "numeric",
-              month: "long",
-              day: "numeric",
-              hour: "2-digit",
-              minute: "2-digit",
-              hour12: true,
-            });
-          };
+          // The card keeps RFC 3339 with an offset; the chat page renders it
+          // in the user's timezone and the backend confirms from it as is
+          const cardTime = (value: any) =>
+            withOffset(
+              value?.dateTime || value,
+              value?.timeZone || this.timeZone,
+            );
 
           let content = `**Title:** ${summary || "Untitled Event"}\n`;
-          content += `**Date & Time:** ${formatDateTime(start?.dateTime || start)} - ${formatDateTime(end?.dateTime || end)}\n`;
+          content += `**Date & Time:** ${cardTime(start)} - ${cardTime(end)}\n`;
           content += `**Location:** ${location || "None"}\n`;
           if (description) {
             content += `**Description:** ${description}\n`;
@@ -683,6 +719,35 @@ export class ToolExecutor {
   }
 }
 
+// A wall time without an offset gets the one its timezone has at that time
+function withOffset(dateTime: string, timeZone?: string): string {
+  if (!timeZone || /(?:Z|[+-]\d{2}:?\d{2})$/i.test(dateTime)) {
+    return dateTime;
+  }
+  const instant = new Date(`${dateTime}Z`);
+  if (isNaN(instant.getTime())) return dateTime;
+  const zoneName = new Intl.DateTimeFormat("en-US", {
+    timeZone,
+    timeZoneName: "longOffset",
+  })
+    .formatToParts(instant)
+    .find((part) => part.type === "timeZoneName")?.value;
+  const offset = /GMT([+-]\d{2}:\d{2})?/.exec(zoneName ?? "");
+  return offset ? `${dateTime}${offset[1] ?? "Z"}` : dateTime;
+}
+
+function formatEvent(event: any) {
+  return {
+    id: event.id,
+    summary: event.summary || "No title",
+    start: event.start?.dateTime || event.start?.date,
+    end: event.end?.dateTime || event.end?.date,
+    location: event.location,
+    description: event.description,
+    attendeeCount: event.attendees?.length,
+  };
+}
+
 export async function executeToolCalls(
   toolCalls: ToolCall[],
 ): Promise<ToolResult[]> {
@@ -700,13 +765,12 @@ export async function executeToolCalls(
   }
 
   const executor = new ToolExecutor(session.user.id);
-  const results: ToolResult[] = [];
-
-  for (const toolCall of toolCalls) {
-    const result = await executor.executeToolCall(toolCall);
-    result.tool_call_id = toolCall.id;
-    results.push(result);
-  }
 
-  return results;
+  return Promise.all(
+    toolCalls.map(async (toolCall) => {
+      const result = await executor.executeToolCall(toolCall);
+      result.tool_call_id = toolCall.id;
+      return result;
+    }),
+  );
 }
@@ -1,3 +1,4 @@
+import { createHash, createHmac } from "crypto";
 import { z } from "zod";
 
 import {
@@ -7,6 +8,28 @@ import {
 } from "~/server/api/trpc";
 import { ToolExecutor, type ToolCall } from "~/lib/tools";
 
+// Retries of the same turn send the same key, so the backend runs the model
+// once and replays the response instead of billing another call
+function idempotencyKey(threadId: string, body: string): string {
+  return createHash("sha256")
+    .update(threadId)
+    .update("\n")
+    .update(body)
+    .digest("hex");
+}
+
+// The backend keys agenda digests by user id and only trusts one signed with
+// the shared secret, so another caller can't read or overwrite this user's
+function userSignature(userId: string): Record<string, string> {
+  const secret = process.env.USER_ID_SIGNING_SECRET;
+  if (!secret) return {};
+  return {
+    "X-User-Signature": createHmac("sha256", secret)
+      .update(userId)
+      .digest("hex"),
+  };
+}
+
 export const aiRouter = createTRPCRouter({
   // Generate AI response for a chat message
   generateResponse: protectedProcedure
@@ -16,9 +39,11 @@ export const aiRouter = createTRPCRouter({
         message: z.string(),
         modelProvider: z.enum(["gemini"]),
         modelName: z.string(),
+        timeZone: z.string().optional(),
+        locale: z.string().optional(),
       }),
     )
-    .mutation(async ({ ctx, input }) => {
+    .mutation(async ({ ctx, input, signal }) => {
       // Get the thread to verify ownership
       const thread = await ctx.db.chatThread.findFirst({
         where: {
@@ -53,17 +78,56 @@ export const aiRouter = createTRPCRouter({
       // Call the FastAPI backend for LLM processing
       const backendUrl = process.env.BACKEND_URL ?? "http://localhost:8000";
 
+      const executor = new ToolExecutor(ctx.session.user.id, input.timeZone);
+
+      // Ask the backend which calendar window this message is about and start
+      // fetching it while the model decides on its tool call; getEvents calls
+      // inside that window are then answered from the prefetch
+      void fetch(`${backendUrl}/api/v1/chat/intent`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          message: input.message,
+          timezone: input.timeZone,
+        }),
+      })
+        .then((res) => (res.ok ? res.json() : null))
+        .then(
+          (intent: {
+            kind: string;
+            window?: { timeMin: string; timeMax: string } | null;
+          } | null) => {
+            if (intent?.kind === "read" && intent.window) {
+              executor.prefetchEvents(
+                intent.window.timeMin,
+                intent.window.timeMax,
+              );
+            }
+          },
+        )
+        .catch(() => undefined);
+
       try {
+        const generateBody = JSON.stringify({
+          messages: conversationHistory,
+          model_provider: input.modelProvider,
+          model_name: input.modelName,
+          user_id: ctx.session.user.id,
+          timezone: input.timeZone,
+          locale: input.locale,
+        });
         const response = await fetch(`${backendUrl}/api/v1/chat/generate`, {
           method: "POST",
           headers: {
             "Content-Type": "application/json",
+            "Idempotency-Key": idempotencyKey(input.threadId, generateBody),
+            ...userSignature(ctx.session.user.id),
           },
-          body: JSON.stringify({
-            messages: conversationHistory,
-            model_provider: input.modelProvider,
-            model_name: input.modelName,
-          }),
+          body: generateBody,
+          // Closing the tab aborts this, and the backend cancels the model call
+          signal,
         });
 
         if (!response.ok) {
@@ -80,19 +144,66 @@ export const aiRouter = createTRPCRouter({
               arguments: string;
             };
           }>;
+          tool_results?: Array<{
+            tool_call_id: string;
+            content: string;
+            success: boolean;
+            error?: string;
+          }>;
+          agenda_sync?: { timeMin: string; timeMax: string } | null;
         };
 
-        // If there are tool calls, execute them
-        if (aiResponse.tool_calls && aiResponse.tool_calls.length > 0) {
-          // Execute tool calls directly
-          const executor = new ToolExecutor(ctx.session.user.id);
-          const results = [];
+        // Calls the backend agent loop already ran (e.g. webSearch)
+        const backendResults = new Map(
+          (aiResponse.tool_results ?? []).map((r) => [r.tool_call_id, r]),
+        );
+        const pendingCalls = (aiResponse.tool_calls ?? []).filter(
+          (toolCall) => !backendResults.has(toolCall.id),
+        );
 
-          for (const toolCall of aiResponse.tool_calls) {
-            const result = await executor.executeToolCall(toolCall as ToolCall);
-            result.tool_call_id = toolCall.id;
-            results.push(result);
-          }
+        // Keep the backend's today/tomorrow agenda digest warm so the next
+        // "what's on tomorrow?" is answered without a model call. Skipped on
+        // turns with tool calls so a snapshot can't race an edit
+        const agendaSync = aiResponse.agenda_sync;
+        if (agendaSync && pendingCalls.length === 0) {
+          void executor
+            .listEventsForSync(agendaSync.timeMin, agendaSync.timeMax)
+            .then((events) =>
+              fetch(`${backendUrl}/api/v1/chat/agenda/sync`, {
+                method: "POST",
+                headers: {
+                  "Content-Type": "application/json",
+                  ...userSignature(ctx.session.user.id),
+                },
+                body: JSON.stringify({
+                  user_id: ctx.session.user.id,
+                  timezone: input.timeZone,
+                  timeMin: agendaSync.timeMin,
+                  timeMax: agendaSync.timeMax,
+                  events,
+                }),
+              }),
+            )
+            .catch(() => undefined);
+        }
+
+        // If there are tool calls left for us, execute them
+        if (aiResponse.tool_calls && pendingCalls.length > 0) {
+          // Execute independent tool calls concurrently; results keep the
+          // order of the calls and are matched back by tool_call_id
+          const results = await Promise.all(
+            aiResponse.tool_calls.map(async (toolCall) => {
+              const backendResult = backendResults.get(toolCall.id);
+              if (backendResult) {
+                return { ...backendResult };
+              }
+              const result = await executor.executeToolCall(
+                toolCall as ToolCall,
+              );
+              result.tool_call_id = toolCall.id;
+              return result;
+            }),
+          );
 
           // Send tool results back to LLM for final response
           const finalMessages = [
@@ -118,18 +229,25 @@ export const aiRouter = createTRPCRouter({
             },
           ];
 
+          const finalBody = JSON.stringify({
+            messages: finalMessages,
+            model_provider: input.modelProvider,
+            model_name: input.modelName,
+            user_id: ctx.session.user.id,
+            timezone: input.timeZone,
+            locale: input.locale,
+          });
           const finalResponse = await fetch(
             `${backendUrl}/api/v1/chat/generate`,
             {
               method: "POST",
               headers: {
                 "Content-Type": "application/json",
+                "Idempotency-Key": idempotencyKey(input.threadId, finalBody),
+                ...userSignature(ctx.session.user.id),
               },
-              body: JSON.stringify({
-                messages: finalMessages,
-                model_provider: input.modelProvider,
-                model_name: input.modelName,
-              }),
+              body: finalBody,
+              signal,
             },
           );
 
@@ -162,7 +280,7 @@ export const aiRouter = createTRPCRouter({
             toolResults: results,
           };
         } else {
-          // No tool calls, save the regular response
+          // Nothing left for the frontend to run, save the response
           const savedMessage = await ctx.db.chatMessage.create({
             data: {
               threadId: input.threadId,
@@ -175,6 +293,8 @@ export const aiRouter = createTRPCRouter({
           return {
             message: savedMessage,
             content: aiResponse.content,
+            toolCalls: aiResponse.tool_calls,
+            toolResults: aiResponse.tool_results,
           };
         }
       } catch (error) {
@@ -62,3 +62,10 @@ export const showToast = (
     setToastMessage(null);
   }, 3000);
 };
+
+// The user's IANA timezone and language tag, so the assistant answers in
+// their local time
+export const browserLocale = () => {
+  const { timeZone, locale } = Intl.DateTimeFormat().resolvedOptions();
+  return { timeZone, locale };
+};